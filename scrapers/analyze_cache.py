@@ -1,77 +1,43 @@
 #!/usr/bin/env python3
 """
-Analyze HTML cache structure using build_html_index logic from old scraper
+Analyze HTML cache structure using the persistent cache index (src/html_index.py)
 Reports: folder structure, card ID distribution, and cache statistics
 """
 
 import os
-import re
+import sys
+import time
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from html_index import HtmlCacheIndex
 
 def build_html_index(root_dir):
     """Build a dictionary mapping web_card_id to file path for fast lookup"""
-    print(f"Building HTML file index from: {root_dir}")
-    id_to_path = {}
-    expansion_stats = defaultdict(int)
-    
-    # Collect all HTML files
-    html_files = []
-    for dirpath, dirs, files in os.walk(root_dir):
-        for fname in files:
-            if fname.endswith('.html'):
-                fpath = os.path.join(dirpath, fname)
-                html_files.append(fpath)
+    print(f"Loading HTML file index for: {root_dir}")
+    index = HtmlCacheIndex(root_dir)
     
-    print(f"Found {len(html_files)} HTML files to index")
+    # Incremental refresh: only changed directories/files are re-read
+    started = time.perf_counter()
+    stats = index.refresh()
+    elapsed = time.perf_counter() - started
+    print(f"Index refreshed in {elapsed:.2f}s ({stats['dirsListed']} directories listed, "
+          f"{stats['added']} added, {stats['updated']} updated, {stats['removed']} removed)")
     
-    # Function to process a single file
-    def process_file(fpath):
-        local_id_to_path = {}
-        local_expansion = None
-        try:
-            # Extract expansion from folder name
-            rel_path = os.path.relpath(fpath, root_dir)
-            path_parts = rel_path.split(os.sep)
-            if len(path_parts) > 1:
-                local_expansion = path_parts[0]
-            
-            with open(fpath, 'r', encoding='utf-8') as fh:
-                # Read first 2KB to find card ID (usually in URL near top)
-                header = fh.read(2048)
-                id_match = re.search(r'/detail/(\d+)/', header)
-                if id_match:
-                    card_id = id_match.group(1)
-                    local_id_to_path[card_id] = fpath
-                    return card_id, fpath, local_expansion
-                else:
-                    # Try extracting from filename
-                    basename = os.path.basename(fpath)
-                    filename_match = re.match(r'^(\d+)\.html$', basename)
-                    if filename_match:
-                        card_id = filename_match.group(1)
-                        local_id_to_path[card_id] = fpath
-                        return card_id, fpath, local_expansion
-        except Exception as e:
-            pass
-        return None, None, None
-    
-    # Process files in parallel using threads
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(process_file, fpath) for fpath in html_files]
-        processed = 0
-        for future in as_completed(futures):
-            card_id, fpath, expansion = future.result()
-            if card_id:
-                id_to_path[card_id] = fpath
-                if expansion:
-                    expansion_stats[expansion] += 1
-            processed += 1
-            if processed % 500 == 0:
-                print(f"Processed {processed}/{len(html_files)} files, found {len(id_to_path)} IDs so far")
-    
-    print(f"\nIndexed {len(id_to_path)} cards from {len(html_files)} HTML files")
+    id_to_path = {}
+    expansion_stats = defaultdict(int)
+    language_stats = Counter()
+    for entry in index.entries():
+        id_to_path[entry.card_id] = str(entry.path)
+        if entry.folder:
+            expansion_stats[entry.folder] += 1
+        language_stats[entry.language or 'unknown'] += 1
+    
+    print(f"\nIndexed {len(id_to_path)} cards")
+    print(f"Languages: {dict(language_stats)}")
     return id_to_path, expansion_stats
 
 def analyze_cache_structure(root_dir):
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Extraction Benchmark
+Measures card extraction speed on a frozen corpus of cached pages and checks
+every record against golden JSON, so parser and extractor optimizations are
+judged on real numbers without regressing fields
+
+Features:
+- A small hand-made corpus (one page per layout and region) and its golden
+  records are committed in benchmark/, so `run` works on a fresh checkout.
+  It is a correctness fixture, not a performance baseline: its pages lack
+  most of the site chrome, so the gains of trimming, partial parse and lxml
+  look far larger than on real pages. `run` warns while it is in use, and
+  freeze replaces it with real cached pages
+- freeze: copies a sample of cached pages per layout (Pokémon, trainer,
+  energy, rule box such as VSTAR / ex, TERA, secret rare) from the HTML cache
+  to benchmark/corpus/{region}/ and writes their records to
+  benchmark/golden/{region}.json
+- run: parses and extracts the corpus --repeat times (best repeat reported),
+  cards/sec for the parse, `_extract_card_info` and both together, per layout,
+  and a per-method breakdown of the `_extract_*` helpers
+- Every record is compared with its golden record (scrapedAt aside); any
+  difference is listed by field and the exit code is 1, as it is when a
+  region's golden file or corpus pages are missing
+- --parser / --partial-parse benchmark the parse variants on the same corpus;
+  --json saves the results and --compare shows the change against saved ones
+- --update-golden accepts the current output after an intended extraction change
+
+Sample usage:
+    python scrapers/benchmark_extraction.py freeze --region japan --per-layout 10
+    python scrapers/benchmark_extraction.py run --parser lxml --json bench-lxml.json
+    python scrapers/benchmark_extraction.py run --region hongkong --partial-parse --compare bench-lxml.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+import logging
+
+# Add src to path to reuse scraper classes
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from cache_reprocessor import scan_pages
+from parser_backend import DEFAULT_PARSER_BACKEND, PARSER_BACKENDS, parse_html
+from scrape_metrics import EXTRACT_METHOD, StageMetrics, instrument_scraper
+from scrape_regions import REGIONS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BENCHMARK_DIR = Path(__file__).parent / 'benchmark'
+
+LAYOUTS = ('pokemon', 'trainer', 'energy', 'rule-box', 'tera', 'secret-rare')
+
+# variantType / rarity values of cards printed beyond the set number
+SECRET_VARIANTS = {'SR', 'SAR', 'SSR', 'UR', 'MUR', 'SECRET_RARE'}
+SECRET_RARITIES = {'SPECIAL_ILLUSTRATION_RARE', 'HYPER_RARE'}
+
+# Set per extraction, so never equal to the golden value
+VOLATILE_FIELDS = ('scrapedAt',)
+
+
+class CorpusPage(NamedTuple):
+    card_id: str
+    url: str
+    layout: str
+    html: str
+    golden: Dict[str, Any]
+
+
+def classify_layout(record: Dict[str, Any]) -> str:
+    """Page layout a record was extracted from"""
+    supertype = record.get('supertype')
+    if supertype == 'TRAINER':
+        return 'trainer'
+    if supertype == 'ENERGY':
+        return 'energy'
+    if record.get('variantType') in SECRET_VARIANTS or record.get('rarity') in SECRET_RARITIES:
+        return 'secret-rare'
+    if record.get('ruleBox') == 'TERA':
+        return 'tera'
+    if record.get('ruleBox'):
+        return 'rule-box'
+    return 'pokemon'
+
+
+def stable_record(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if record is not None:
+        record = {key: value for key, value in record.items() if key not in VOLATILE_FIELDS}
+    return record
+
+
+def create_scraper(region: str, data_root: Optional[Path] = None) -> Any:
+    config = REGIONS[region]
+    scraper = config.scraper_cls(data_root)
+    scraper.quiet = True
+    logging.getLogger(config.module.__name__).setLevel(logging.CRITICAL)
+    return scraper
+
+
+def golden_path(benchmark_dir: Path, region: str) -> Path:
+    return Path(benchmark_dir) / 'golden' / f'{region}.json'
+
+
+def write_golden(benchmark_dir: Path, region: str, scraper: Any, cards: Dict[str, Dict[str, Any]],
+                 fixture: bool = False) -> Path:
+    path = golden_path(benchmark_dir, region)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    golden = {
+        'region': region,
+        'extractorVersion': scraper.EXTRACTOR_VERSION,
+        'fixture': fixture,
+        'frozenAt': datetime.now().isoformat(),
+        'layouts': dict(Counter(card['layout'] for card in cards.values())),
+        'cards': cards,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(golden, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def is_fixture_corpus(benchmark_dir: Path, region: str) -> bool:
+    """True if a region's corpus is the hand-made fixture rather than frozen cached pages"""
+    try:
+        with open(golden_path(benchmark_dir, region), 'r', encoding='utf-8') as f:
+            return bool(json.load(f).get('fixture'))
+    except (OSError, ValueError):
+        return False
+
+
+def load_corpus(benchmark_dir: Path, region: str) -> Optional[List[CorpusPage]]:
+    """Corpus pages with their golden records, or None if the golden file or any page is missing"""
+    path = golden_path(benchmark_dir, region)
+    if not path.exists():
+        logger.error(f"{region}: no golden records at {path} (run freeze first)")
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+    corpus_dir = Path(benchmark_dir) / 'corpus' / region
+    pages = []
+    missing = 0
+    for card_id, card in golden['cards'].items():
+        html_path = corpus_dir / f'{card_id}.html'
+        if not html_path.exists():
+            logger.error(f"{region} {card_id}: golden record without {html_path}")
+            missing += 1
+            continue
+        pages.append(CorpusPage(card_id, card['url'], card['layout'],
+                                html_path.read_text(encoding='utf-8'), card['record']))
+    if missing or not pages:
+        logger.error(f"{region}: corpus in {corpus_dir} is incomplete ({len(pages)} of {len(golden['cards'])} pages)")
+        return None
+    return pages
+
+
+def freeze_region(
+    region: str,
+    benchmark_dir: Path,
+    data_root: Optional[Path] = None,
+    per_layout: int = 5,
+    card_ids: Optional[List[str]] = None,
+    scan_limit: Optional[int] = None,
+    force: bool = False
+) -> int:
+    """
+    Copy a per-layout sample of cached pages into the corpus and record their golden output
+
+    Pages are taken newest ID first until every layout has `per_layout` pages
+    (or the cache / `scan_limit` runs out); `card_ids` are always included
+
+    Returns:
+        Pages frozen
+    """
+    if golden_path(benchmark_dir, region).exists() and not force and not is_fixture_corpus(benchmark_dir, region):
+        logger.error(f"{region}: corpus already frozen ({golden_path(benchmark_dir, region)}); use --force to replace it")
+        return 0
+    config = REGIONS[region]
+    scraper = create_scraper(region, data_root)
+    cache = scraper.html_cache
+
+    wanted = list(card_ids or [])
+    # Every cached page, including HK expansion folders and shards
+    cached = sorted((page.card_id for page in scan_pages(scraper)), key=int, reverse=True)
+    candidates = wanted + [card_id for card_id in cached[:scan_limit] if card_id not in wanted]
+
+    corpus_dir = Path(benchmark_dir) / 'corpus' / region
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    for stale in corpus_dir.glob('*.html'):
+        stale.unlink()
+
+    counts = Counter()
+    cards = {}
+    for card_id in candidates:
+        if card_id not in wanted and all(counts[layout] >= per_layout for layout in LAYOUTS):
+            break
+        html_text = cache.read(card_id)
+        if html_text is None:
+            if card_id in wanted:
+                logger.warning(f"{region} {card_id}: not in the HTML cache")
+            continue
+        card_url = cache.read_meta(card_id).get('url') or config.module.build_card_url(int(card_id))
+        record = stable_record(scraper._extract_card_info(parse_html(html_text, 'bs4'), card_url))
+        if not (record and scraper._is_valid_card_data(record)):
+            continue
+        layout = classify_layout(record)
+        if card_id not in wanted and counts[layout] >= per_layout:
+            continue
+        counts[layout] += 1
+        (corpus_dir / f'{card_id}.html').write_text(html_text, encoding='utf-8')
+        cards[card_id] = {'url': card_url, 'layout': layout, 'record': record}
+
+    path = write_golden(benchmark_dir, region, scraper, cards)
+    missing = [layout for layout in LAYOUTS if not counts[layout]]
+    logger.info(f"{region}: froze {len(cards)} pages ({dict(counts)}) → {path}")
+    if missing:
+        logger.warning(f"{region}: no cached pages of layout {', '.join(missing)}")
+    return len(cards)
+
+
+def record_diff(expected: Optional[Dict[str, Any]], actual: Optional[Dict[str, Any]]) -> List[str]:
+    """Fields whose values differ"""
+    expected, actual = expected or {}, actual or {}
+    return sorted(key for key in set(expected) | set(actual) if expected.get(key) != actual.get(key))
+
+
+def benchmark_region(
+    region: str,
+    benchmark_dir: Path,
+    data_root: Optional[Path] = None,
+    parser_backend: str = DEFAULT_PARSER_BACKEND,
+    partial_parse: bool = False,
+    repeat: int = 3,
+    show: int = 5,
+    update_golden: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Benchmark a region's corpus and check it against its golden records
+
+    Returns:
+        Results (throughput, per layout and per method), or None if the corpus or golden file is missing
+    """
+    pages = load_corpus(benchmark_dir, region)
+    if pages is None:
+        return None
+    fixture = is_fixture_corpus(benchmark_dir, region)
+    if fixture:
+        logger.warning(f"{region}: benchmarking the hand-made fixture corpus, a correctness check and not a "
+                       f"performance baseline; its pages lack most of the site chrome, so trimming, partial parse "
+                       f"and lxml look faster than on real pages (run freeze for real cached pages)")
+    scraper = create_scraper(region, data_root)
+    parse_only = scraper.PARSE_ONLY if partial_parse else None
+
+    # Timed runs; the extractors may modify the tree, so each repeat parses again
+    runs = []
+    outputs = {}
+    for run in range(max(repeat, 1)):
+        parse_time = extract_time = 0.0
+        layout_time = Counter()
+        for page in pages:
+            start = time.perf_counter()
+            soup = parse_html(page.html, parser_backend, parse_only)
+            parsed = time.perf_counter()
+            record = scraper._extract_card_info(soup, page.url)
+            extracted = time.perf_counter()
+            parse_time += parsed - start
+            extract_time += extracted - parsed
+            layout_time[page.layout] += extracted - start
+            if run == 0:
+                outputs[page.card_id] = stable_record(record)
+        runs.append((parse_time + extract_time, parse_time, extract_time, layout_time))
+    total_time, parse_time, extract_time, layout_time = min(runs, key=lambda x: x[0])
+
+    # Per-method breakdown, on a separate pass so the wrappers do not slow the timed runs
+    metrics = StageMetrics()
+    metrics.enable()
+    instrument_scraper(scraper, metrics)
+    for page in pages:
+        scraper._extract_card_info(parse_html(page.html, parser_backend, parse_only), page.url)
+    methods = {
+        entry['labels']['method']: {
+            'calls': entry['count'],
+            'totalSeconds': entry['sum'],
+            'meanMicros': entry['mean'] * 1e6,
+        }
+        for entry in metrics.snapshot()['stages'].get(EXTRACT_METHOD, [])
+    }
+
+    # Golden check
+    mismatches = {}
+    for page in pages:
+        diff = record_diff(page.golden, outputs[page.card_id])
+        if diff:
+            mismatches[page.card_id] = diff
+            if len(mismatches) <= show:
+                logger.error(f"{region} {page.card_id} ({page.layout}) differs from golden in: {', '.join(diff)}")
+    if update_golden:
+        cards = {page.card_id: {'url': page.url, 'layout': classify_layout(outputs[page.card_id] or {}),
+                                'record': outputs[page.card_id]} for page in pages}
+        logger.info(f"{region}: golden records rewritten → {write_golden(benchmark_dir, region, scraper, cards, fixture)}")
+
+    layout_pages = Counter(page.layout for page in pages)
+    count = len(pages)
+    return {
+        'region': region,
+        'fixture': fixture,
+        'pages': count,
+        'parser': parser_backend,
+        'partialParse': partial_parse,
+        'repeat': len(runs),
+        'cardsPerSec': count / total_time if total_time else 0.0,
+        'parseCardsPerSec': count / parse_time if parse_time else 0.0,
+        'extractCardsPerSec': count / extract_time if extract_time else 0.0,
+        'layouts': {layout: {'pages': layout_pages[layout],
+                             'cardsPerSec': layout_pages[layout] / layout_time[layout] if layout_time[layout] else 0.0}
+                    for layout in LAYOUTS if layout_pages[layout]},
+        'methods': dict(sorted(methods.items(), key=lambda item: -item[1]['totalSeconds'])),
+        'mismatches': mismatches,
+    }
+
+
+def log_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None, top: int = 10) -> None:
+    region = results['region']
+
+    def change(key: str) -> str:
+        if not baseline or not baseline.get(key):
+            return ''
+        return f" ({results[key] / baseline[key]:.2f}x)"
+
+    logger.info(f"{region}: {results['pages']} pages{' of the fixture corpus (correctness only)' if results.get('fixture') else ''}, "
+                f"parser {results['parser']}{' (partial parse)' if results['partialParse'] else ''}, best of {results['repeat']}")
+    logger.info(f"  parse + extract  {results['cardsPerSec']:9.1f} cards/s{change('cardsPerSec')}")
+    logger.info(f"  parse            {results['parseCardsPerSec']:9.1f} cards/s{change('parseCardsPerSec')}")
+    logger.info(f"  _extract_card_info {results['extractCardsPerSec']:7.1f} cards/s{change('extractCardsPerSec')}")
+    for layout, entry in results['layouts'].items():
+        logger.info(f"  {layout:<16} {entry['cardsPerSec']:9.1f} cards/s over {entry['pages']} pages")
+    for name, entry in list(results['methods'].items())[:top]:
+        logger.info(f"  {name:<34} {entry['totalSeconds'] * 1000:9.1f}ms  {entry['calls']:>6} calls  "
+                    f"{entry['meanMicros']:9.1f}µs/call")
+    if results['mismatches']:
+        fields = Counter(field for diff in results['mismatches'].values() for field in diff)
+        logger.error(f"{region}: {len(results['mismatches'])} records differ from golden: "
+                     + ', '.join(f"{field} ({count})" for field, count in fields.most_common()))
+    else:
+        logger.info(f"{region}: all {results['pages']} records match golden")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark card extraction on a frozen corpus with golden output')
+    parser.add_argument('--benchmark-dir', type=Path, default=DEFAULT_BENCHMARK_DIR,
+                        help='Corpus and golden JSON directory (default: scrapers/benchmark)')
+    parser.add_argument('--data-root', type=Path, help='Data directory (default: ../data)')
+    parser.add_argument('--region', choices=[*REGIONS, 'all'], default='all')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    freeze = commands.add_parser('freeze', help='Sample cached pages into the corpus and write golden JSON')
+    freeze.add_argument('--per-layout', type=int, default=5,
+                        help=f'Pages per layout ({", ".join(LAYOUTS)}; default: 5)')
+    freeze.add_argument('--ids', help='Comma-separated card IDs to include as well')
+    freeze.add_argument('--scan-limit', type=int, help='Look at most this many cached pages per region')
+    freeze.add_argument('--force', action='store_true', help='Replace an existing corpus')
+
+    run = commands.add_parser('run', help='Benchmark the corpus and check it against golden JSON')
+    run.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER_BACKEND)
+    run.add_argument('--partial-parse', action='store_true', help="Parse only the scraper's PARSE_ONLY subtrees")
+    run.add_argument('--repeat', type=int, default=3, help='Timed passes over the corpus (best reported; default: 3)')
+    run.add_argument('--top', type=int, default=10, help='Slowest extractor methods to list (default: 10)')
+    run.add_argument('--show', type=int, default=5, help='Log the first N records that differ from golden')
+    run.add_argument('--json', type=Path, help='Save the results')
+    run.add_argument('--compare', type=Path, help='Results saved by an earlier --json run to compare with')
+    run.add_argument('--update-golden', action='store_true',
+                     help='Replace the golden records with the current output (after an intended change)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    regions = list(REGIONS) if args.region == 'all' else [args.region]
+
+    if args.command == 'freeze':
+        ids = [x.strip() for x in args.ids.split(',') if x.strip()] if args.ids else None
+        frozen = sum(freeze_region(region, args.benchmark_dir, args.data_root, args.per_layout, ids,
+                                   args.scan_limit, args.force) for region in regions)
+        sys.exit(0 if frozen else 1)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {}
+    missing = []
+    for region in regions:
+        region_results = benchmark_region(region, args.benchmark_dir, args.data_root, args.parser,
+                                          args.partial_parse, args.repeat, args.show, args.update_golden)
+        if region_results is None:
+            missing.append(region)
+            continue
+        log_results(region_results, baseline.get(region), args.top)
+        results[region] = region_results
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        logger.info(f"Results saved to {args.json}")
+    if missing:
+        logger.error(f"No corpus or golden records for {', '.join(missing)}")
+    failed = bool(missing) or (any(r['mismatches'] for r in results.values()) and not args.update_golden)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Distributed Card Scraper
+Runs one crawl on several workers (processes or machines) through a
+coordinator that leases ID-range chunks to them
+
+Features:
+- coordinator: queues ID ranges in SQLite (data/queue/{name}.sqlite), serves
+  leases over HTTP and writes the cards workers push back to per-expansion
+  JSONL files; --exit-when-done merges them into the JSON outputs
+- worker: leases chunks, scrapes them with the region's scrape_batch
+  (cache, threads or async engine, parse workers) and heartbeats meanwhile;
+  killed workers' chunks are leased again once their lease expires
+- A chunk with IDs whose fetch failed (after retries) is reported as failed,
+  not done, so it is leased again and counts toward MAX_ATTEMPTS
+- status: chunk counts and current leases
+
+Sample usage:
+    python scrapers/distributed_scrape.py coordinator --add japan 40000 20000 --add hongkong 1 20000 --port 8790
+    python scrapers/distributed_scrape.py worker --coordinator http://10.0.0.5:8790 --cache-html --threads 4
+    python scrapers/distributed_scrape.py status --coordinator http://10.0.0.5:8790
+"""
+
+import argparse
+import json
+import sys
+import threading
+from pathlib import Path
+import logging
+
+# Add src to path to reuse scraper classes
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from run_journal import HTTP_ERROR, OutcomeCounter
+from scrape_regions import REGIONS
+from work_queue import (DEFAULT_CHUNK_SIZE, DEFAULT_LEASE_TTL, Coordinator, QueueClient,
+                        create_coordinator_server, open_lease_queue, run_worker)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_ROOT = Path(__file__).parent.parent / 'data'
+
+
+def run_coordinator(args: argparse.Namespace) -> None:
+    queue = open_lease_queue(args.data_root, args.name, args.lease_ttl)
+    for region, start, count in args.add:
+        if region not in REGIONS:
+            logger.error(f"Unknown region {region} (choose from {', '.join(REGIONS)})")
+            return
+        added = queue.add_range(region, int(start), int(count), args.chunk_size)
+        logger.info(f"Queued {added} chunks of {region} {start}+{count}")
+    if args.retry_failed:
+        logger.info(f"Re-queued {queue.retry_failed()} failed chunks")
+
+    output_dir = Path(args.output_dir)
+    coordinator = Coordinator(queue, {region: output_dir / config.output for region, config in REGIONS.items()})
+    server = create_coordinator_server(coordinator, args.host, args.port)
+    logger.info(f"Coordinator for {queue.path} listening on http://{args.host}:{args.port}")
+
+    def watch() -> None:
+        # Stop serving once every chunk is done or failed
+        while not stop.wait(5.0):
+            if queue.finished():
+                server.shutdown()
+                return
+
+    stop = threading.Event()
+    if args.exit_when_done:
+        threading.Thread(target=watch, daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        coordinator.close()
+
+    status = queue.status()
+    logger.info(f"Chunks: {status['chunks']}, {status['cards']} cards")
+    if args.exit_when_done and queue.finished():
+        for region, sink in coordinator.sinks.items():
+            sink.merge(REGIONS[region].module.save_cards_by_expansion, args.compact_json)
+    queue.close()
+
+
+def run_scrape_worker(args: argparse.Namespace) -> None:
+    client = QueueClient(args.coordinator, args.worker_id)
+    scrapers = {}
+
+    def scrape_range(region: str, start: int, count: int):
+        config = REGIONS[region]
+        if region not in scrapers:
+            scraper = config.scraper_cls(args.data_root, record_cache=True)
+            scraper.retry_policy.max_retries = args.max_retries
+            scraper.quiet = args.quiet
+            if args.min_request_interval is not None:
+                scraper.set_rate_limit(args.min_request_interval, args.burst)
+            else:
+                scraper.set_rate_limit(config.min_request_interval, args.burst)
+            scrapers[region] = scraper
+        outcomes = OutcomeCounter()
+        cards = config.module.scrape_batch(
+            list(range(start, start + count)),
+            scrapers[region],
+            cache_html=args.cache_html,
+            refresh_cache=args.refresh_cache,
+            cache_only=args.cache_only,
+            threads=args.threads,
+            engine=args.engine,
+            concurrency=args.concurrency,
+            parse_workers=args.parse_workers,
+            journal=outcomes
+        )
+        # scrape_batch logs and skips IDs it could not fetch; a chunk is only done when none were lost
+        failed = outcomes.counts[HTTP_ERROR]
+        if failed:
+            url, error = outcomes.first_errors.get(HTTP_ERROR, ('', ''))
+            raise RuntimeError(f"{failed} of {count} IDs could not be fetched ({url}: {error})")
+        return cards
+
+    regions = [x.strip() for x in args.regions.split(',')] if args.regions else None
+    completed = run_worker(client, scrape_range, regions,
+                           heartbeat_interval=args.heartbeat_interval, max_chunks=args.max_chunks)
+    logger.info(f"{client.worker}: completed {completed} chunks")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Distributed card scraping through a leased ID-range queue')
+    parser.add_argument('--data-root', type=Path, default=DEFAULT_DATA_ROOT,
+                        help='Data directory (queue database, HTML cache)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    coordinator = commands.add_parser('coordinator', help='Serve leases and collect results')
+    coordinator.add_argument('--name', default='crawl', help='Queue name (data/queue/{name}.sqlite)')
+    coordinator.add_argument('--add', nargs=3, action='append', default=[], metavar=('REGION', 'START', 'COUNT'),
+                             help='Queue an ID range (repeatable; chunks already queued are kept)')
+    coordinator.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                             help=f'IDs per lease (default: {DEFAULT_CHUNK_SIZE})')
+    coordinator.add_argument('--lease-ttl', type=float, default=DEFAULT_LEASE_TTL,
+                             help=f'Seconds before an unrenewed lease expires (default: {DEFAULT_LEASE_TTL:g})')
+    coordinator.add_argument('--retry-failed', action='store_true',
+                             help='Re-queue chunks parked as failed')
+    coordinator.add_argument('--host', default='127.0.0.1',
+                             help='Listen address (0.0.0.0 for remote workers)')
+    coordinator.add_argument('--port', type=int, default=8790)
+    coordinator.add_argument('--output-dir', default='.',
+                             help='Directory for the per-region JSONL/JSON output')
+    coordinator.add_argument('--exit-when-done', action='store_true',
+                             help='Stop once every chunk is done and merge the JSONL files into JSON')
+    coordinator.add_argument('--compact-json', action='store_true',
+                             help='Write minified JSON (no indentation)')
+
+    worker = commands.add_parser('worker', help='Lease and scrape chunks')
+    worker.add_argument('--coordinator', required=True, help='Coordinator URL')
+    worker.add_argument('--worker-id', help='Worker name (default: {hostname}-{pid})')
+    worker.add_argument('--regions', help='Only lease chunks of these comma-separated regions')
+    worker.add_argument('--max-chunks', type=int, help='Stop after this many chunks')
+    worker.add_argument('--heartbeat-interval', type=float, default=DEFAULT_LEASE_TTL / 4,
+                        help=f'Seconds between lease renewals (default: {DEFAULT_LEASE_TTL / 4:g})')
+    worker.add_argument('--cache-html', action='store_true')
+    worker.add_argument('--refresh-cache', action='store_true')
+    worker.add_argument('--cache-only', action='store_true')
+    worker.add_argument('--threads', type=int, default=1)
+    worker.add_argument('--engine', choices=['threads', 'async'], default='threads')
+    worker.add_argument('--concurrency', type=int, default=200)
+    worker.add_argument('--parse-workers', type=int, default=0)
+    worker.add_argument('--min-request-interval', type=float,
+                        help='Seconds between requests per host (default: the region\'s default)')
+    worker.add_argument('--burst', type=int, default=1)
+    worker.add_argument('--max-retries', type=int, default=4)
+    worker.add_argument('--quiet', action='store_true')
+
+    status = commands.add_parser('status', help='Show chunk counts and leases')
+    status.add_argument('--coordinator', required=True, help='Coordinator URL')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == 'coordinator':
+        run_coordinator(args)
+    elif args.command == 'worker':
+        run_scrape_worker(args)
+    else:
+        print(json.dumps(QueueClient(args.coordinator).status(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
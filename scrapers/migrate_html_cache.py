@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+HTML Cache Migration
+Packs data/html/{region} HTML files (flat and expansion folders) into the
+compressed, content-addressed shard store (src/html_shards.py), and compacts
+shard stores grown by refreshes and rewrites (--compact)
+
+Sample usage:
+    python scrapers/migrate_html_cache.py --region all --train-dictionary
+    python scrapers/migrate_html_cache.py --region hongkong --delete-source
+    python scrapers/migrate_html_cache.py --region all --compact
+"""
+
+import sys
+import json
+import random
+import re
+from pathlib import Path
+import argparse
+import logging
+from typing import Iterator, Optional, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from html_cache import META_SUFFIX
+from html_shards import SHARD_DIR, ShardHtmlCache, has_shard_index, train_dictionary
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REGIONS = ['japan', 'hongkong', 'english']
+DICT_SAMPLES = 2000
+
+
+def iter_html_files(html_dir: Path) -> Iterator[Tuple[str, Path, Optional[str]]]:
+    """Yield (card_id, path, expansion folder) for every cached HTML file"""
+    for path in sorted(html_dir.rglob('*.html')):
+        rel = path.relative_to(html_dir)
+        if rel.parts[0] == SHARD_DIR:
+            continue
+        folder = rel.parts[0] if len(rel.parts) > 1 else None
+
+        match = re.match(r'^(\d+)', path.name)
+        if match:
+            yield match.group(1), path, folder
+            continue
+
+        # Fall back to the card URL near the top of the page
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            header = f.read(2048)
+        match = re.search(r'/detail/(\d+)/', header) or re.search(r'/card/(\d+)', header)
+        if match:
+            yield match.group(1), path, folder
+        else:
+            logger.warning(f"No card ID for {rel}, skipping")
+
+
+def sample_pages(files) -> list:
+    """Random sample of cached page bodies for dictionary training"""
+    sample = random.sample(files, min(DICT_SAMPLES, len(files)))
+    return [path.read_bytes() for _, path, _ in sample]
+
+
+def migrate_region(region: str, data_root: Path, train: bool = False, delete_source: bool = False) -> None:
+    """Migrate one region's HTML cache into shards"""
+    html_dir = data_root / 'html' / region
+    if not html_dir.exists():
+        logger.warning(f"No cache directory for {region}")
+        return
+
+    files = list(iter_html_files(html_dir))
+    if not files:
+        logger.warning(f"No cached files found for {region}")
+        return
+    logger.info(f"Migrating {len(files)} cached pages for {region}...")
+
+    cache = ShardHtmlCache(html_dir)
+    if train:
+        samples = sample_pages(files)
+        logger.info(f"Training dictionary on {len(samples)} pages...")
+        dictionary = train_dictionary(samples) if len(samples) >= 10 else None
+        if dictionary:
+            cache.set_dictionary(dictionary)
+
+    migrated = 0
+    with cache.batch():
+        for card_id, path, folder in files:
+            meta_path = path.with_name(path.stem + META_SUFFIX)
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+            cache.put_page(card_id, path.read_bytes(), meta, folder)
+            migrated += 1
+            if migrated % 1000 == 0:
+                logger.info(f"Migrated {migrated}/{len(files)} pages...")
+
+    # Verify every page reads back byte-identical before touching the source
+    failed = 0
+    for card_id, path, _ in files:
+        if cache.read_bytes(card_id) != path.read_bytes():
+            failed += 1
+            logger.error(f"Verification failed for {path.relative_to(html_dir)}")
+
+    stats = cache.stats()
+    ratio = stats['rawBytes'] / stats['storedBytes'] if stats['storedBytes'] else 0
+    logger.info(f"{region}: {stats['pages']} pages, {stats['uniqueBodies']} unique bodies, "
+                f"{stats['rawBytes'] / 1e6:.1f} MB → {stats['storedBytes'] / 1e6:.1f} MB ({ratio:.1f}x)")
+
+    if delete_source:
+        if failed:
+            logger.error(f"{failed} pages failed verification, keeping source files")
+        else:
+            for _, path, _ in files:
+                path.unlink()
+                meta_path = path.with_name(path.stem + META_SUFFIX)
+                if meta_path.exists():
+                    meta_path.unlink()
+            logger.info(f"Deleted {len(files)} source files")
+
+    cache.close()
+
+
+def compact_region(region: str, data_root: Path, min_garbage: float = 0.25) -> None:
+    """Drop superseded page bodies from a region's shard store and rewrite mostly-dead shards"""
+    html_dir = data_root / 'html' / region
+    if not has_shard_index(html_dir):
+        logger.warning(f"No shard store for {region}")
+        return
+
+    cache = ShardHtmlCache(html_dir)
+    before = sum(path.stat().st_size for path in cache.shard_dir.glob('*.shard'))
+    stats = cache.compact(min_garbage)
+    after = sum(path.stat().st_size for path in cache.shard_dir.glob('*.shard'))
+    cache.close()
+    logger.info(f"{region}: dropped {stats['orphans']} superseded bodies, rewrote {stats['shardsRewritten']} and "
+                f"deleted {stats['shardsDeleted']} shards, {before / 1e6:.2f} MB → {after / 1e6:.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate HTML cache to compressed shards')
+    parser.add_argument('--region', choices=REGIONS + ['all'], default='all')
+    parser.add_argument('--train-dictionary', action='store_true',
+                        help='Train a zstd dictionary on the cache before migrating')
+    parser.add_argument('--delete-source', action='store_true',
+                        help='Delete the HTML files once all pages verified')
+    parser.add_argument('--compact', action='store_true',
+                        help='Compact existing shard stores instead of migrating (run with no scraper writing)')
+    parser.add_argument('--min-garbage', type=float, default=0.25,
+                        help='With --compact, rewrite shards at least this fraction dead (default: 0.25)')
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).parent
+    data_root = script_dir.parent / 'data'
+
+    regions = REGIONS if args.region == 'all' else [args.region]
+
+    for region in regions:
+        if args.compact:
+            compact_region(region, data_root, args.min_garbage)
+        else:
+            migrate_region(region, data_root, args.train_dictionary, args.delete_source)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Freshness-Priority Recrawl
+Re-crawls one region within a fixed request budget, spending it on new IDs
+and cards that change instead of sweeping every ID on a fixed cycle
+
+Features:
+- Candidates: every tracked card, every cached page, any --ids / --id-range /
+  --id-map IDs, and --probe-ahead IDs above the highest ID that held a card
+  (empty pages fetched by earlier probes do not move the horizon)
+- Queue from recrawl_scheduler.py: new IDs, then cards most likely changed
+  since their last fetch (recently changed first, long-stable ones rarely)
+- Cached pages are revalidated with conditional GETs (304s are cheap) and
+  their outcome feeds each card's change statistics
+- --dry-run logs the queue per tier without fetching
+- Optional streamed output (--output): the fetched cards merged into
+  {stem}_{expansion}.json files
+
+Sample usage:
+    python scrapers/recrawl.py --region japan --budget 2000 --probe-ahead 300
+    python scrapers/recrawl.py --region hongkong --budget 500 --dry-run
+    python scrapers/recrawl.py --region english --budget 1000 --output data/cards/english/recrawl.json
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, List
+import logging
+
+# Add src to path to reuse scraper classes
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from scrape_regions import REGIONS
+from card_sink import JsonlCardSink
+from id_discovery import mapped_card_ids
+from recrawl_scheduler import DEFAULT_HALF_LIFE_DAYS, RecrawlScheduler, open_recrawl_scheduler, summarize_plan
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Re-crawl a region within a request budget, freshest-first')
+    parser.add_argument('--region', choices=sorted(REGIONS), required=True)
+    parser.add_argument('--budget', type=int, required=True, help='Card pages to request this run')
+    parser.add_argument('--ids', type=str, help='Extra comma-separated card IDs to consider')
+    parser.add_argument('--id-range', type=int, nargs=2, metavar=('START', 'COUNT'),
+                        help='Extra card ID range to consider')
+    parser.add_argument('--id-map', action='store_true',
+                        help='Also consider the intervals saved by --discover')
+    parser.add_argument('--probe-ahead', type=int, default=0, metavar='N',
+                        help='Consider N IDs above the highest one that held a card, for new releases (default: 0)')
+    parser.add_argument('--half-life', type=float, default=DEFAULT_HALF_LIFE_DAYS, metavar='DAYS',
+                        help=f'Days for a card\'s change history to lose half its weight (default: {DEFAULT_HALF_LIFE_DAYS:g})')
+    parser.add_argument('--dry-run', action='store_true', help='Log the queue without fetching')
+    parser.add_argument('--output', type=Path,
+                        help='Also write the fetched cards to {stem}_{expansion}.json (default: only refresh the cache)')
+    parser.add_argument('--compact-json', action='store_true', help='Write minified JSON')
+    parser.add_argument('--threads', type=int, default=1, help='Fetch threads (default: 1)')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                        help='Fetch engine (default: threads)')
+    parser.add_argument('--concurrency', type=int, default=200,
+                        help='Cards in flight at once (async engine, default: 200)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Parser processes (default: 0 = parse in the fetch threads)')
+    parser.add_argument('--min-request-interval', type=float, default=None,
+                        help='Minimum seconds between requests to the host (default: the region\'s)')
+    parser.add_argument('--burst', type=int, default=1,
+                        help='Requests allowed back-to-back before pacing applies (default: 1)')
+    parser.add_argument('--max-retries', type=int, default=4,
+                        help='Retries for 429/5xx and connection errors (default: 4)')
+    parser.add_argument('--quiet', action='store_true', help='Only log summaries and errors')
+    return parser.parse_args()
+
+
+def candidate_ids(args: argparse.Namespace, scraper: Any, scheduler: RecrawlScheduler, cached: List[int]) -> List[int]:
+    """Tracked, cached and requested IDs, plus --probe-ahead IDs past the highest card"""
+    card_ids = set(scheduler.known_ids())
+    card_ids.update(cached)
+    if args.ids:
+        card_ids.update(int(x.strip()) for x in args.ids.split(',') if x.strip())
+    if args.id_range:
+        start, count = args.id_range
+        card_ids.update(range(start, start + count))
+    if args.id_map:
+        card_ids.update(mapped_card_ids(scraper))
+    if args.probe_ahead > 0:
+        highest = scheduler.highest_card_id()
+        if highest is None:
+            highest = max(card_ids, default=0)
+        card_ids.update(range(highest + 1, highest + 1 + args.probe_ahead))
+    return sorted(card_ids)
+
+
+def main():
+    args = parse_args()
+    config = REGIONS[args.region]
+    scraper = config.scraper_cls(record_cache=True)
+    interval = config.min_request_interval if args.min_request_interval is None else args.min_request_interval
+    scraper.set_rate_limit(interval, args.burst)
+    scraper.retry_policy.max_retries = args.max_retries
+    scraper.quiet = args.quiet
+
+    scheduler = open_recrawl_scheduler(scraper.data_root, args.region, args.half_life)
+    try:
+        cached = [int(card_id) for card_id in scraper.html_cache.card_ids() if card_id.isdigit()]
+        seeded = scheduler.seed(scraper.html_cache, cached)
+        if seeded:
+            logger.info(f"Seeded {seeded} cached pages into {scheduler.path}")
+        card_ids = candidate_ids(args, scraper, scheduler, cached)
+
+        plan = scheduler.plan(card_ids, args.budget)
+        tiers = summarize_plan(plan)
+        logger.info(f"Queue: {len(plan)} of {len(card_ids)} candidate IDs ("
+                    + ", ".join(f"{count} {tier}" for tier, count in tiers.items()) + ")")
+        if args.dry_run:
+            for planned in plan[:20]:
+                logger.info(f"  {planned.card_id:>7}  {planned.tier:<16}  {planned.score:.3f}")
+            if len(plan) > 20:
+                logger.info(f"  ... {len(plan) - 20} more")
+            return
+
+        planned_ids = [planned.card_id for planned in plan]
+        started = time.time()
+        sink = JsonlCardSink(args.output) if args.output else None
+        # refresh_cache: cached pages are revalidated (conditional GET) and known-empty IDs are retried
+        config.module.scrape_batch(
+            planned_ids,
+            scraper,
+            cache_html=True,
+            refresh_cache=True,
+            threads=args.threads,
+            engine=args.engine,
+            concurrency=args.concurrency,
+            parse_workers=args.parse_workers,
+            sink=sink
+        )
+        if sink is not None:
+            sink.close()
+            sink.merge(config.module.save_cards_by_expansion, args.compact_json)
+
+        counts = scheduler.observe(scraper.html_cache, planned_ids, since=started)
+        stats = scheduler.stats()
+        logger.info(f"Fetched {counts['fetched']} pages in {time.time() - started:.1f}s: {counts['new']} new, "
+                    f"{counts['changed']} changed, {counts['fetched'] - counts['new'] - counts['changed']} unchanged, "
+                    f"{counts['unreached']} not found or failed")
+        logger.info(f"Tracking {stats['cards']} cards ({stats['recentlyChanged']} changed recently) "
+                    f"and {stats['empty']} empty IDs")
+    finally:
+        scheduler.close()
+
+
+if __name__ == '__main__':
+    main()
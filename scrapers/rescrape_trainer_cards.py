@@ -1,64 +1,59 @@
 #!/usr/bin/env python3
 """
 Re-scrape Trainer cards in batches
+Runs every batch of trainer_card_ids.txt in this process on warm pools and
+caches, and writes one merged, deduplicated output
 """
-import subprocess
-import json
+import argparse
+import sys
 from pathlib import Path
+import logging
 
-# Load Trainer card IDs
-ids_file = Path(__file__).parent / 'trainer_card_ids.txt'
-with open(ids_file, 'r') as f:
-    ids = f.read().strip().split(',')
+# Add src to path to reuse scraper classes
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from batch_scrape import CardBatchScraper
+from japanese_card_scraper import JapaneseCardScraper, save_cards_by_expansion, scrape_batch
+from parser_backend import DEFAULT_PARSER_BACKEND, PARSER_BACKENDS
 
-print(f"Total Trainer cards to re-scrape: {len(ids)}")
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
-# Batch size (avoid command line length limits)
-batch_size = 500
-output_dir = Path(__file__).parent.parent / 'data' / 'cards' / 'japan'
-output_dir.mkdir(parents=True, exist_ok=True)
+DEFAULT_IDS_FILE = Path(__file__).parent / 'trainer_card_ids.txt'
+DEFAULT_OUTPUT = Path(__file__).parent.parent / 'data' / 'cards' / 'japan' / 'trainer_cards.json'
 
-total_scraped = 0
-failed_batches = []
 
-for i in range(0, len(ids), batch_size):
-    batch = ids[i:i+batch_size]
-    batch_num = (i // batch_size) + 1
-    total_batches = (len(ids) + batch_size - 1) // batch_size
-    
-    print(f"\n{'='*60}")
-    print(f"Batch {batch_num}/{total_batches}: Scraping {len(batch)} cards (IDs {batch[0]}-{batch[-1]})")
-    print(f"{'='*60}")
-    
-    batch_ids = ','.join(batch)
-    output_file = output_dir / f'trainer_cards_batch_{batch_num}.json'
-    
-    cmd = [
-        'python', 'src/japanese_card_scraper.py',
-        '--ids', batch_ids,
-        '--cache-only',
-        '--threads', '20',
-        '--output', str(output_file)
-    ]
-    
-    try:
-        result = subprocess.run(cmd, cwd=Path(__file__).parent, capture_output=False, text=True)
-        if result.returncode == 0:
-            total_scraped += len(batch)
-            print(f"✓ Batch {batch_num} completed")
-        else:
-            print(f"✗ Batch {batch_num} failed")
-            failed_batches.append(batch_num)
-    except Exception as e:
-        print(f"✗ Batch {batch_num} error: {e}")
-        failed_batches.append(batch_num)
+def main():
+    parser = argparse.ArgumentParser(description='Re-scrape the Japanese Trainer cards listed in trainer_card_ids.txt')
+    parser.add_argument('--ids-file', type=Path, default=DEFAULT_IDS_FILE,
+                        help='Comma-separated card IDs (default: trainer_card_ids.txt)')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT,
+                        help='Base output path; cards go to {stem}_{expansion}.json (default: data/cards/japan/trainer_cards.json)')
+    parser.add_argument('--batch-size', type=int, default=500, help='IDs per batch (default: 500)')
+    parser.add_argument('--threads', type=int, default=20, help='Cache read / fetch threads (default: 20)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Processes parsing HTML while threads read it (default: 0 = parse in the threads)')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER_BACKEND)
+    parser.add_argument('--fetch', action='store_true',
+                        help='Fetch pages missing from the HTML cache (default: cache only)')
+    parser.add_argument('--compact-json', action='store_true', help='Write minified JSON')
+    args = parser.parse_args()
 
-print(f"\n{'='*60}")
-print(f"SCRAPING SUMMARY")
-print(f"{'='*60}")
-print(f"Total batches: {total_batches}")
-print(f"Successful: {total_batches - len(failed_batches)}")
-print(f"Failed: {len(failed_batches)}")
-if failed_batches:
-    print(f"Failed batch numbers: {failed_batches}")
-print(f"{'='*60}")
+    with open(args.ids_file, 'r') as f:
+        ids = [int(x) for x in f.read().replace('\n', ',').split(',') if x.strip()]
+    logger.info(f"Total Trainer cards to re-scrape: {len(ids)} ({len(set(ids))} unique)")
+
+    scraper = JapaneseCardScraper(parser_backend=args.parser, record_cache=True)
+    scraper.quiet = True
+    with CardBatchScraper(scraper, scrape_batch, threads=args.threads, parse_workers=args.parse_workers,
+                          cache_html=True, cache_only=not args.fetch) as batches:
+        count = batches.scrape_into(ids, args.output, save_cards_by_expansion, args.batch_size, args.compact_json)
+
+    logger.info(f"Scraped {count} Trainer cards from {len(batches.seen)} IDs "
+                f"({batches.duplicates} duplicate IDs skipped) → {args.output.parent}/{args.output.stem}_*.json")
+    if scraper.record_cache is not None:
+        stats = scraper.record_cache.stats()
+        logger.info(f"Record cache: {stats['hits']} hits, {stats['misses']} misses")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,76 +1,87 @@
 #!/usr/bin/env python3
 """
-HK/EN Expansion Card Scraper
-Scrapes card lists from expansion search pages and then details
+Expansion Card Scraper
+Harvests an expansion's card IDs from the card search listing pages, then
+scrapes the card details with the region's scraper
+
+Features:
+- HK / EN: card-search/list/?expansionCodes= listing (one request per page of cards)
+- JP: card search result API by product group (pg) code
+- Listing summaries saved to data/listings/{region}/{expansion}.json
+- Details scraped with the region's scrape_batch (cache, threads, parse workers)
+
+Sample usage:
+    python scrapers/scrape_expansion.py --region hongkong --expansion M3 --cache-html
+    python scrapers/scrape_expansion.py --region english --expansion ME02 --ids-only
 """
 
-import requests
-from bs4 import BeautifulSoup
 import argparse
-import re
 import json
 import logging
 import sys
 from pathlib import Path
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add src to path to reuse scraper classes
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
-from hk_card_scraper import HkCardScraper
-from english_card_scraper import EnglishCardScraper
+import english_card_scraper
+import hk_card_scraper
+import japanese_card_scraper
+from listing_harvester import MAX_PAGES, harvest_card_ids
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_card_ids_from_expansion(region: str, expansion_code: str) -> list[int]:
-    """
-    Simulate finding card IDs.
-    Since we cannot execute JS, we will try to probe a likely range or use a placeholder.
-    """
-    logger.info(f"Attempting to find cards for expansion {expansion_code} in {region}")
-    
-    # In a real scenario with browser access, we would:
-    # 1. Load the search list page
-    # 2. Extract card IDs from hrefs
-    
-    # Here, we will try to probe around a "suspected" ID range if we had one.
-    # But we don't.
-    
-    # However, the user asked to "go ahead to download by new expansion".
-    # This implies I should try to implement the logic to handle expansion filtering.
-    # I will update the scrapers to accept an expansion code, but they still need IDs.
-    
-    # If I can't find IDs, I cannot proceed.
-    # Let's assume for this task that we might need to rely on the user providing IDs 
-    # OR that the previous probe failed because of rate limiting or wrong URL format.
-    
-    # Let's try ONE MORE URL format that is common on these sites:
-    # https://asia.pokemon-card.com/hk/card-search/details.php/card/ID
-    
-    return []
+SCRAPER_MODULES = {
+    'japan': (japanese_card_scraper, japanese_card_scraper.JapaneseCardScraper),
+    'hongkong': (hk_card_scraper, hk_card_scraper.HkCardScraper),
+    'english': (english_card_scraper, english_card_scraper.EnglishCardScraper),
+}
+
 
 def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--region', choices=['hongkong', 'english'], required=True)
-    parser.add_argument('--expansion', required=True)
+    parser = argparse.ArgumentParser(description='Scrape whole expansions via the card search listing')
+    parser.add_argument('--region', choices=list(SCRAPER_MODULES), required=True)
+    parser.add_argument('--expansion', required=True,
+                        help='Comma-separated expansion codes (JP: product group codes)')
+    parser.add_argument('--output', help='Output JSON file path (default: {region}_expansion_cards.json)')
+    parser.add_argument('--ids-only', action='store_true',
+                        help='Only harvest and print the card IDs')
+    parser.add_argument('--max-pages', type=int, default=MAX_PAGES,
+                        help=f'Listing pages read per expansion at most (default: {MAX_PAGES})')
+    parser.add_argument('--cache-html', action='store_true')
+    parser.add_argument('--refresh-cache', action='store_true')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Processes parsing HTML while threads fetch it (default: 0 = parse in the fetch threads)')
+    parser.add_argument('--quiet', action='store_true')
     args = parser.parse_args()
-    
-    print(f"Scraping {args.region} expansion {args.expansion}...")
-    
-    # Since we can't easily reverse engineer the API without browser tools,
-    # and the page is JS rendered, we have a challenge.
-    
-    # However, maybe the user *knows* the IDs or we can find a sitemap?
-    # Or maybe we can try the 'detail' page of the FIRST card of the expansion if we can guess it.
-    
-    # Let's try to find if there is a direct API we can hit.
-    # Common endpoint: https://asia.pokemon-card.com/hk/api/v1/...
-    
-    # Let's try to fetch a known valid page from the site (e.g. homepage) to get cookies
-    # and then try the list page again.
-    
-    pass
+
+    module, scraper_cls = SCRAPER_MODULES[args.region]
+    scraper = scraper_cls(record_cache=True)
+    scraper.quiet = args.quiet
+
+    expansions = [x.strip() for x in args.expansion.split(',') if x.strip()]
+    card_ids = harvest_card_ids(scraper, expansions, args.max_pages)
+    if not card_ids:
+        logger.warning(f"No cards found in the {args.region} listing for {', '.join(expansions)}")
+        return
+    if args.ids_only:
+        print(json.dumps(card_ids))
+        return
+
+    logger.info(f"Scraping {len(card_ids)} cards...")
+    cards = module.scrape_batch(
+        card_ids,
+        scraper,
+        cache_html=args.cache_html,
+        refresh_cache=args.refresh_cache,
+        threads=args.threads,
+        parse_workers=args.parse_workers
+    )
+    output_path = Path(args.output or f"{args.region}_expansion_cards.json")
+    module.save_cards_by_expansion(cards, output_path)
+    logger.info(f"Scraped {len(cards)} of {len(card_ids)} listed cards")
+
 
 if __name__ == '__main__':
     main()
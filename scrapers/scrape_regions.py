@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Multi-Region Card Scraper
+Scrapes the JP, HK and EN sites at the same time on one event loop, so a
+slow region (JP's 2s request interval) no longer holds up the others
+
+Features:
+- One async fetch engine and one keep-alive connection pool for all regions
+- Request budgets stay per host (rate_limiter.py): www.pokemon-card.com for JP,
+  asia.pokemon-card.com shared by HK and EN, overridable per host
+- Per-region card IDs from --ids / --id-range / --id-map / --expansion listings
+- Optional parse process pool per region (each scraper class needs its own)
+- Periodic per-region progress and a final throughput table (cards/s per
+  region and overall wall time)
+- Output per region with the region's save_cards_by_expansion, or streamed
+  to per-expansion JSONL files with a run journal (--jsonl)
+
+Sample usage:
+    python scrapers/scrape_regions.py --id-range japan 40000 2000 --id-range hongkong 1 2000 --cache-html
+    python scrapers/scrape_regions.py --expansion hongkong M3 --expansion english ME02 --jsonl
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+import logging
+
+# Add src to path to reuse scraper classes
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+import english_card_scraper
+import hk_card_scraper
+import japanese_card_scraper
+from card_sink import JsonlCardSink
+from fetch_engine import AsyncFetchEngine
+from id_discovery import mapped_card_ids
+from listing_harvester import harvest_card_ids
+from negative_cache import DEFAULT_TTL_DAYS
+from parse_pipeline import create_parse_pool
+from rate_limiter import get_rate_limiter, rate_from_interval
+from run_journal import COMPLETED, EMPTY, OK, open_run_journal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RegionConfig(NamedTuple):
+    module: Any
+    scraper_cls: type
+    min_request_interval: float     # Default request interval of the region's CLI
+    output: str                     # Default output file of the region's CLI
+
+
+REGIONS: Dict[str, RegionConfig] = {
+    'japan': RegionConfig(japanese_card_scraper, japanese_card_scraper.JapaneseCardScraper, 2.0, 'japanese_cards.json'),
+    'hongkong': RegionConfig(hk_card_scraper, hk_card_scraper.HkCardScraper, 0.8, 'hk_cards.json'),
+    'english': RegionConfig(english_card_scraper, english_card_scraper.EnglishCardScraper, 0.8, 'english_cards.json'),
+}
+
+
+class RegionProgress:
+    """Outcome counts and throughput of one region (passed to the engine as its journal)"""
+
+    def __init__(self, region: str, total: int, journal: Optional[Any] = None):
+        self.region = region
+        self.total = total
+        self.journal = journal
+        self.counts: Counter = Counter()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def record(self, url: str, outcome: str, error: Optional[str] = None) -> None:
+        self.counts[outcome] += 1
+        if self.journal is not None:
+            self.journal.record(url, outcome, error)
+
+    @property
+    def processed(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def errors(self) -> int:
+        return sum(count for outcome, count in self.counts.items() if outcome not in COMPLETED)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def rate(self) -> float:
+        """Cards per second so far"""
+        return self.counts[OK] / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.region:<9} {self.processed:>7}/{self.total:<7} cards {self.counts[OK]:>7}  "
+                f"empty {self.counts[EMPTY]:>6}  errors {self.errors:>5}  "
+                f"{self.elapsed:8.1f}s  {self.rate():7.2f} cards/s")
+
+
+class RegionJob(NamedTuple):
+    region: str
+    scraper: Any
+    card_ids: List[int]
+    progress: RegionProgress
+    sink: Optional[JsonlCardSink]
+    requested_ids: Set[int]
+
+
+async def run_regions(
+    jobs: List[RegionJob],
+    cache_html: bool = True,
+    refresh_cache: bool = False,
+    cache_only: bool = False,
+    concurrency: int = 200,
+    max_connections_per_host: int = 8,
+    parse_pools: Optional[Dict[str, Any]] = None,
+    progress_interval: float = 30.0
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Scrape every region's cards concurrently on one engine
+
+    Args:
+        jobs: One job per region
+        cache_html: Save HTML to cache
+        refresh_cache: Force re-fetch
+        cache_only: Only use cache
+        concurrency: Cards in flight at once per region
+        max_connections_per_host: Open connections allowed per host
+        parse_pools: Optional parse process pool per region
+        progress_interval: Seconds between progress lines (0 = none)
+
+    Returns:
+        Scraped cards per region (empty lists for regions streamed to a sink)
+    """
+    parse_pools = parse_pools or {}
+
+    async def run_job(job: RegionJob) -> List[Dict[str, Any]]:
+        module = REGIONS[job.region].module
+        card_ids = job.card_ids
+        # Cache-only runs and explicitly requested IDs bypass the negative cache
+        if job.scraper.negative_cache is not None and not (refresh_cache or cache_only):
+            card_ids = job.scraper.negative_cache.pending_ids(card_ids, job.requested_ids)
+        urls = (module.build_card_url(card_id) for card_id in card_ids)
+        job.progress.started = time.monotonic()
+        try:
+            return await engine.scrape_urls(
+                job.scraper, urls, cache_html, refresh_cache, cache_only,
+                job.sink, job.progress, parse_pools.get(job.region)
+            )
+        finally:
+            job.progress.finished = time.monotonic()
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(progress_interval)
+            for job in jobs:
+                logger.info(f"⏱ {job.progress.summary()}")
+
+    async with AsyncFetchEngine(
+        concurrency=concurrency,
+        max_connections_per_host=max_connections_per_host,
+        user_agent=jobs[0].scraper.user_agent
+    ) as engine:
+        reporter = asyncio.create_task(report()) if progress_interval > 0 else None
+        try:
+            results = await asyncio.gather(*(run_job(job) for job in jobs))
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+    return {job.region: cards for job, cards in zip(jobs, results)}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Scrape several regions concurrently with per-host request budgets')
+    parser.add_argument('--ids', nargs=2, action='append', default=[], metavar=('REGION', 'IDS'),
+                        help='Comma-separated card IDs for a region (repeatable)')
+    parser.add_argument('--id-range', nargs=3, action='append', default=[], metavar=('REGION', 'START', 'COUNT'),
+                        help='Card ID range for a region (repeatable)')
+    parser.add_argument('--id-map', action='append', default=[], metavar='REGION',
+                        help='Scrape the intervals saved by --discover for a region (repeatable)')
+    parser.add_argument('--expansion', nargs=2, action='append', default=[], metavar=('REGION', 'CODES'),
+                        help='Harvest comma-separated expansions from a region\'s card search listing (repeatable)')
+    parser.add_argument('--output-dir', default='.',
+                        help='Directory for the per-region output files (default names of each scraper)')
+    parser.add_argument('--compact-json', action='store_true',
+                        help='Write minified JSON (no indentation)')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='Stream cards to per-expansion JSONL files and journal each region\'s run')
+    parser.add_argument('--merge-json', action='store_true',
+                        help='With --jsonl, also merge the JSONL files into the JSON output files')
+    parser.add_argument('--cache-html', action='store_true',
+                        help='Cache HTML files locally')
+    parser.add_argument('--refresh-cache', action='store_true',
+                        help='Force re-fetch even if cached')
+    parser.add_argument('--cache-only', action='store_true',
+                        help='Only use cached HTML (no network requests)')
+    parser.add_argument('--negative-ttl', type=float, default=DEFAULT_TTL_DAYS, metavar='DAYS',
+                        help=f'Days an ID whose page held no card is skipped (default: {DEFAULT_TTL_DAYS})')
+    parser.add_argument('--no-negative-cache', action='store_true',
+                        help='Do not skip or record IDs whose page held no card')
+    parser.add_argument('--concurrency', type=int, default=200,
+                        help='Cards in flight at once per region (default: 200)')
+    parser.add_argument('--max-connections-per-host', type=int, default=8,
+                        help='Open connections allowed per host (default: 8)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Parser processes per region (default: 0 = parse in the engine\'s threads)')
+    parser.add_argument('--min-request-interval', nargs=2, action='append', default=[], metavar=('HOST', 'SECONDS'),
+                        help='Minimum seconds between requests to a host (default: JP 2.0, asia 0.8; 0 disables)')
+    parser.add_argument('--burst', type=int, default=1,
+                        help='Requests allowed back-to-back per host before pacing applies (default: 1)')
+    parser.add_argument('--max-retries', type=int, default=4,
+                        help='Retries for 429/5xx and connection errors (default: 4)')
+    parser.add_argument('--progress-interval', type=float, default=30.0,
+                        help='Seconds between per-region progress lines (default: 30, 0 = off)')
+    parser.add_argument('--quiet', action='store_true',
+                        help='Only log summaries and errors')
+    return parser.parse_args()
+
+
+def requested_card_ids(args: argparse.Namespace, region: str, scraper: Any) -> Set[int]:
+    """Card IDs known to be cards: listed explicitly (--ids) or by the site's listing (--expansion)"""
+    card_ids = set()
+    for name, ids in args.ids:
+        if name == region:
+            card_ids.update(int(x.strip()) for x in ids.split(',') if x.strip())
+    expansions = [x.strip() for name, codes in args.expansion if name == region for x in codes.split(',') if x.strip()]
+    if expansions:
+        card_ids.update(harvest_card_ids(scraper, expansions))
+    return card_ids
+
+
+def region_card_ids(args: argparse.Namespace, region: str, scraper: Any, requested_ids: Set[int]) -> List[int]:
+    """Card IDs selected for a region on the command line (the requested ones plus ranges and the ID map)"""
+    card_ids = set(requested_ids)
+    for name, start, count in args.id_range:
+        if name == region:
+            card_ids.update(range(int(start), int(start) + int(count)))
+    if region in args.id_map:
+        card_ids.update(mapped_card_ids(scraper))
+    return sorted(card_ids)
+
+
+def main():
+    args = parse_args()
+    selected = [name for name, *_ in args.ids + args.id_range + args.expansion] + args.id_map
+    unknown = sorted(set(selected) - set(REGIONS))
+    if unknown:
+        logger.error(f"Unknown region(s): {', '.join(unknown)} (choose from {', '.join(REGIONS)})")
+        return
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs: List[RegionJob] = []
+    for region, config in REGIONS.items():
+        if region not in selected:
+            continue
+        scraper = config.scraper_cls(record_cache=True,
+                                     negative_ttl_days=None if args.no_negative_cache else args.negative_ttl)
+        scraper.set_rate_limit(config.min_request_interval, args.burst)
+        scraper.retry_policy.max_retries = args.max_retries
+        scraper.quiet = args.quiet
+
+        requested_ids = requested_card_ids(args, region, scraper)
+        card_ids = region_card_ids(args, region, scraper, requested_ids)
+        if not card_ids:
+            logger.warning(f"No card IDs to scrape for {region}")
+            continue
+        sink = JsonlCardSink(output_dir / config.output) if args.jsonl else None
+        journal = open_run_journal(scraper.data_root, region) if args.jsonl else None
+        if journal is not None:
+            journal.before_sync = sink.sync
+            logger.info(f"Run journal for {region}: {journal.path}")
+        jobs.append(RegionJob(region, scraper, card_ids, RegionProgress(region, len(card_ids), journal), sink,
+                              requested_ids))
+    if not jobs:
+        logger.warning("No regions to scrape")
+        return
+
+    # Host overrides after the scrapers applied their defaults (HK and EN share asia.pokemon-card.com)
+    for host, seconds in args.min_request_interval:
+        get_rate_limiter().configure(host, rate_from_interval(float(seconds)), args.burst)
+
+    logger.info("Scraping " + ", ".join(f"{job.region}: {len(job.card_ids)} cards" for job in jobs))
+    start_time = time.monotonic()
+    with ExitStack() as stack:
+        parse_pools = {
+            job.region: stack.enter_context(create_parse_pool(job.scraper, args.parse_workers))
+            for job in jobs
+        } if args.parse_workers > 0 else None
+        results = asyncio.run(run_regions(
+            jobs,
+            cache_html=args.cache_html,
+            refresh_cache=args.refresh_cache,
+            cache_only=args.cache_only,
+            concurrency=args.concurrency,
+            max_connections_per_host=args.max_connections_per_host,
+            parse_pools=parse_pools,
+            progress_interval=args.progress_interval
+        ))
+    wall_time = time.monotonic() - start_time
+
+    for job in jobs:
+        module = REGIONS[job.region].module
+        output_path = output_dir / REGIONS[job.region].output
+        if job.sink is not None:
+            job.sink.close()
+            job.progress.journal.close()
+            logger.info(f"{job.region}: streamed {job.sink.count} cards to {len(job.sink.paths())} JSONL files")
+            if args.merge_json:
+                job.sink.merge(module.save_cards_by_expansion, args.compact_json)
+        else:
+            module.save_cards_by_expansion(results[job.region], output_path, args.compact_json)
+        if job.scraper.negative_cache is not None:
+            stats = job.scraper.negative_cache.stats()
+            logger.info(f"{job.region}: negative cache skipped {stats['skipped']} IDs, {stats['empty_ids']} known empty")
+
+    total_cards = sum(job.progress.counts[OK] for job in jobs)
+    logger.info("=" * 60)
+    for job in jobs:
+        logger.info(job.progress.summary())
+    logger.info(f"Total: {total_cards} cards in {wall_time:.1f}s ({total_cards / wall_time if wall_time else 0:.2f} cards/s); "
+                f"regions back to back would take {sum(job.progress.elapsed for job in jobs):.1f}s")
+    logger.info("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+In-Process Batch Scraping for PTCG_2026 scrapers
+Scrapes many ID lists in one process with the scraper, its caches and its
+worker pools kept warm between batches
+
+Features:
+- One scraper instance (HTTP session, HTML cache index, record and negative
+  caches) and one thread pool / parse worker pool serve every batch, instead
+  of a fresh interpreter, bs4 import and session per batch
+- Works with any region: pass the scraper and its module's scrape_batch
+- IDs are deduplicated within and across batches
+- scrape_into() streams every batch into one JsonlCardSink and merges it into
+  one grouped, deduplicated output ({stem}_{expansion}.json)
+
+Sample usage:
+    python scrapers/rescrape_trainer_cards.py --threads 20
+
+    from batch_scrape import CardBatchScraper
+    with CardBatchScraper(scraper, scrape_batch, threads=20, cache_only=True) as batches:
+        batches.scrape_into(card_ids, Path('trainer_cards.json'), save_cards_by_expansion)
+"""
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+import logging
+
+from card_sink import JsonlCardSink
+from parse_pipeline import create_parse_pool
+
+logger = logging.getLogger(__name__)
+
+
+class CardBatchScraper:
+    """A scraper plus warm worker pools, reused for every batch of IDs"""
+
+    def __init__(
+        self,
+        scraper: Any,
+        scrape_batch: Callable[..., List[Dict[str, Any]]],
+        threads: int = 1,
+        parse_workers: int = 0,
+        engine: str = 'threads',
+        cache_html: bool = True,
+        refresh_cache: bool = False,
+        cache_only: bool = False,
+        concurrency: int = 200,
+        max_connections_per_host: int = 8
+    ):
+        """
+        Args:
+            scraper: JapaneseCardScraper, HkCardScraper or EnglishCardScraper
+            scrape_batch: The scraper module's scrape_batch
+            threads: Fetch / cache read threads (thread engine)
+            parse_workers: Parser processes (0 = parse in the fetch threads)
+            engine: 'threads' or 'async' (the async engine opens its HTTP session per batch)
+            cache_html: Save fetched HTML to the cache
+            refresh_cache: Re-fetch pages that are cached
+            cache_only: Only read the cache, never fetch
+            concurrency: Cards in flight at once (async engine only)
+            max_connections_per_host: Open connections per host (async engine only)
+        """
+        self.scraper = scraper
+        self.scrape_batch = scrape_batch
+        self.threads = threads
+        self.parse_workers = parse_workers
+        self.engine = engine
+        self.cache_html = cache_html
+        self.refresh_cache = refresh_cache
+        self.cache_only = cache_only
+        self.concurrency = concurrency
+        self.max_connections_per_host = max_connections_per_host
+        self.seen: Set[int] = set()
+        self.duplicates = 0
+        self._executor: Optional[Executor] = (
+            ThreadPoolExecutor(max_workers=threads) if threads > 1 and engine == 'threads' else None
+        )
+        self._parse_pool: Optional[Executor] = create_parse_pool(scraper, parse_workers) if parse_workers > 0 else None
+
+    def scrape(self, card_ids: Iterable[int], sink: Optional[JsonlCardSink] = None,
+               journal: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """
+        Scrape one batch of IDs on the warm pools
+
+        IDs already scraped by this instance are skipped
+
+        Returns:
+            Scraped cards (empty when streaming to a sink)
+        """
+        batch = []
+        for card_id in card_ids:
+            card_id = int(card_id)
+            if card_id in self.seen:
+                self.duplicates += 1
+                continue
+            self.seen.add(card_id)
+            batch.append(card_id)
+        if not batch:
+            return []
+        return self.scrape_batch(
+            batch,
+            self.scraper,
+            cache_html=self.cache_html,
+            refresh_cache=self.refresh_cache,
+            cache_only=self.cache_only,
+            threads=self.threads,
+            engine=self.engine,
+            concurrency=self.concurrency,
+            max_connections_per_host=self.max_connections_per_host,
+            parse_workers=self.parse_workers,
+            sink=sink,
+            journal=journal,
+            executor=self._executor,
+            parse_pool=self._parse_pool
+        )
+
+    def scrape_into(
+        self,
+        card_ids: Iterable[int],
+        output_path: Path,
+        save_func: Callable[[List[Dict[str, Any]], Path, bool], None],
+        batch_size: int = 500,
+        compact: bool = False,
+        keep_jsonl: bool = False
+    ) -> int:
+        """
+        Scrape all IDs in batches into one merged output
+
+        Args:
+            card_ids: Card IDs (duplicates are scraped once)
+            output_path: Base output path ({stem}_{expansion}.json files)
+            save_func: The scraper module's save_cards_by_expansion
+            batch_size: IDs per batch (progress is logged after each)
+            compact: Write minified JSON
+            keep_jsonl: Keep the intermediate JSONL files
+
+        Returns:
+            Cards written
+        """
+        card_ids = list(card_ids)
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with JsonlCardSink(output_path) as sink:
+            for start in range(0, len(card_ids), batch_size):
+                self.scrape(card_ids[start:start + batch_size], sink)
+                logger.info(f"{min(start + batch_size, len(card_ids))}/{len(card_ids)} IDs done, {sink.count} cards")
+        sink.merge(save_func, compact, keep_jsonl=keep_jsonl)
+        return sink.count
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=True)
+            self._parse_pool = None
+
+    def __enter__(self) -> 'CardBatchScraper':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Incremental HTML Cache Reprocessor for PTCG_2026 scrapers
+Re-extracts the cached pages of every region at once on one process pool,
+touching only pages that changed since the last run
+
+Features:
+- Every cache layout: flat files and expansion folders (html_index.py) and
+  shards (html_shards.py)
+- Per-region manifest (data/html/.reprocess/{region}.sqlite) of each page's
+  fingerprint (mtime and size, or the shard content hash), content hash,
+  extractor version and whether it held a card
+- Pages with an unchanged fingerprint are never read: their record comes
+  from the record cache (record_cache.py), and known empty pages are skipped
+- Pages whose fingerprint changed are read and hashed on I/O threads; same
+  content is answered from the record cache, new content is parsed
+- One parse pool for all regions: each worker keeps a scraper per region
+  class, and the regions' pages are interleaved so every core stays busy
+  until the last region finishes
+
+Sample usage:
+    python scrapers/process_html_cache.py --parse-workers 16
+    python scrapers/process_html_cache.py --region hongkong --io-threads 8
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from itertools import chain, zip_longest
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import logging
+
+from html_index import HtmlCacheIndex
+from html_shards import ShardHtmlCache
+from parse_pipeline import bounded_as_completed, store_record
+from record_cache import content_hash
+from sampling_profiler import start_worker_profiler, worker_profile_settings
+
+logger = logging.getLogger(__name__)
+
+REPROCESS_DIR = '.reprocess'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    card_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    url TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    version TEXT NOT NULL,
+    has_card INTEGER NOT NULL
+);
+"""
+
+# Scrapers owned by each parse worker process, one per region class
+_worker_scrapers: Dict[type, Any] = {}
+_worker_settings: Optional[Tuple[str, str]] = None
+
+
+def _init_reprocess_worker(data_root: str, parser_backend: str, profile: Optional[Tuple[str, float]] = None) -> None:
+    global _worker_settings
+    if profile is not None:
+        start_worker_profiler(*profile)
+    _worker_settings = (data_root, parser_backend)
+
+
+def parse_region_page(scraper_cls: type, html_text: str, card_url: str) -> Optional[Dict[str, Any]]:
+    """Parse one page in a worker process with its region's scraper (created on first use)"""
+    scraper = _worker_scrapers.get(scraper_cls)
+    if scraper is None:
+        data_root, parser_backend = _worker_settings
+        scraper = _worker_scrapers[scraper_cls] = scraper_cls(data_root)
+        scraper.quiet = True
+        scraper.parser_backend = parser_backend
+    return scraper.parse_card_html(html_text, card_url)
+
+
+def create_reprocess_pool(data_root: Path, parser_backend: str, workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Parse worker processes shared by every region"""
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        initializer=_init_reprocess_worker,
+        initargs=(str(data_root), parser_backend, worker_profile_settings())
+    )
+
+
+class CachedPage(NamedTuple):
+    card_id: str
+    path: Optional[Path]    # None for pages stored in shards
+    fingerprint: str
+
+
+class ManifestEntry(NamedTuple):
+    card_id: str
+    fingerprint: str
+    url: str
+    digest: bytes
+    version: str
+    has_card: int
+
+
+def scan_pages(scraper: Any) -> List[CachedPage]:
+    """Every cached page of a scraper's region, one per card (flat files win over expansion-folder copies)"""
+    cache = scraper.html_cache
+    if isinstance(cache, ShardHtmlCache):
+        return [CachedPage(card_id, None, f"sha256:{digest}")
+                for card_id, digest in cache.page_hashes().items() if card_id.isdigit()]
+
+    index = getattr(scraper, 'html_index', None)
+    owned = index is None
+    if owned:
+        index = HtmlCacheIndex(scraper.html_dir)
+    try:
+        index.refresh()
+        pages = []
+        for entry in index.entries():
+            if not entry.card_id.isdigit():
+                continue
+            # Fingerprint from the file itself: the index row may predate an in-place rewrite
+            try:
+                st = entry.path.stat()
+            except OSError:
+                continue
+            pages.append(CachedPage(entry.card_id, entry.path, f"{st.st_mtime_ns}:{st.st_size}"))
+        return pages
+    finally:
+        if owned:
+            index.close()
+
+
+class ReprocessManifest:
+    """What each cached page of a region looked like when it was last extracted"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def entries(self) -> Dict[str, ManifestEntry]:
+        with self._lock:
+            return {row[0]: ManifestEntry(*row) for row in self._conn.execute('SELECT * FROM pages')}
+
+    def update(self, entries: Iterable[ManifestEntry]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)', entries)
+
+    def remove(self, card_ids: Iterable[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM pages WHERE card_id = ?', ((card_id,) for card_id in card_ids))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_reprocess_manifest(data_root: Path, region: str) -> ReprocessManifest:
+    """Reprocess manifest for a region (data/html/.reprocess/{region}.sqlite)"""
+    return ReprocessManifest(Path(data_root) / 'html' / REPROCESS_DIR / f"{region}.sqlite")
+
+
+class ReprocessJob:
+    """One region's scraper, output sink and outcome counts"""
+
+    def __init__(self, region: str, scraper: Any, build_card_url: Callable[[int], str], sink: Any):
+        """
+        Args:
+            region: Region name (manifest file name)
+            scraper: JapaneseCardScraper, HkCardScraper or EnglishCardScraper
+            build_card_url: The scraper module's build_card_url
+            sink: JsonlCardSink receiving every card of the region
+        """
+        self.region = region
+        self.scraper = scraper
+        self.build_card_url = build_card_url
+        self.sink = sink
+        self.counts: Counter = Counter()
+        self.manifest = open_reprocess_manifest(scraper.data_root, region)
+        self._updates: List[ManifestEntry] = []
+
+    @property
+    def version(self) -> str:
+        return str(self.scraper.EXTRACTOR_VERSION)
+
+    def emit(self, page: CachedPage, url: str, digest: bytes, data: Optional[Dict[str, Any]]) -> None:
+        if data:
+            self.sink.add(data)
+            self.counts['cards'] += 1
+        self._updates.append(ManifestEntry(page.card_id, page.fingerprint, url, digest, self.version, int(bool(data))))
+        if len(self._updates) >= 1000:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._updates:
+            self.manifest.update(self._updates)
+            self._updates = []
+
+    def close(self) -> None:
+        self.flush()
+        self.manifest.close()
+
+    def summary(self) -> str:
+        c = self.counts
+        return (f"{self.region:<9} pages {c['pages']:>7}  unchanged {c['unchanged']:>7}  empty {c['empty']:>6}  "
+                f"re-read {c['reread']:>6}  parsed {c['parsed']:>7}  errors {c['errors']:>5}  "
+                f"removed {c['removed']:>5}  cards {c['cards']:>7}")
+
+
+def _changed_pages(job: ReprocessJob) -> List[Tuple[ReprocessJob, CachedPage, str]]:
+    """Emit the region's unchanged pages from the record cache; returns the pages to read"""
+    pages = scan_pages(job.scraper)
+    known = job.manifest.entries()
+    removed = set(known) - {page.card_id for page in pages}
+    if removed:
+        job.manifest.remove(removed)
+    job.counts['pages'] = len(pages)
+    job.counts['removed'] = len(removed)
+
+    record_cache = job.scraper.record_cache
+    changed = []
+    for page in pages:
+        url = job.build_card_url(int(page.card_id))
+        entry = known.get(page.card_id)
+        if entry is not None and (entry.fingerprint, entry.url, entry.version) == (page.fingerprint, url, job.version):
+            if not entry.has_card:
+                job.counts['empty'] += 1
+                continue
+            data = record_cache.get(url, entry.digest) if record_cache is not None else None
+            if data is not None:
+                job.sink.add(data)
+                job.counts['unchanged'] += 1
+                job.counts['cards'] += 1
+                continue
+        changed.append((job, page, url))
+    return changed
+
+
+def _interleave(lists: List[List[Any]]) -> Iterator[Any]:
+    """Round-robin over several lists, so every region is in flight at once"""
+    missing = object()
+    return (item for item in chain.from_iterable(zip_longest(*lists, fillvalue=missing)) if item is not missing)
+
+
+def _read_page(task: Tuple[ReprocessJob, CachedPage, str]) -> Tuple[Any, ...]:
+    """(task, html, digest, cached record, error) for a changed page, on an I/O thread"""
+    job, page, url = task
+    try:
+        html_text = page.path.read_text(encoding='utf-8') if page.path else job.scraper.html_cache.read(page.card_id)
+    except OSError as e:
+        return task, None, None, None, e
+    if html_text is None:
+        return task, None, None, None, None
+    digest = content_hash(html_text)
+    record_cache = job.scraper.record_cache
+    return task, html_text, digest, record_cache.get(url, digest) if record_cache is not None else None, None
+
+
+def reprocess_regions(
+    jobs: List[ReprocessJob],
+    parse_workers: int = 0,
+    io_threads: int = 4,
+    max_pending: Optional[int] = None,
+    progress_interval: float = 30.0
+) -> float:
+    """
+    Bring every region's output up to date with its HTML cache
+
+    Args:
+        jobs: One job per region
+        parse_workers: Parser processes shared by all regions (0 = parse in this process)
+        io_threads: Threads reading and hashing changed pages
+        max_pending: Pages read ahead or waiting for a parser (defaults to 4 per worker)
+        progress_interval: Seconds between progress lines (0 = none)
+
+    Returns:
+        Wall time in seconds
+    """
+    started = time.monotonic()
+    max_pending = max_pending or 4 * max(parse_workers, io_threads, 1)
+    parsing: Dict[Future, Tuple[ReprocessJob, CachedPage, str, bytes]] = {}
+    last_report = started
+
+    def finish(job: ReprocessJob, page: CachedPage, url: str, digest: bytes, parse: Callable[[], Any],
+               in_process: bool) -> None:
+        try:
+            data = parse()
+        except Exception as e:
+            logger.error(f"✗ Error parsing {url}: {e}")
+            job.counts['errors'] += 1
+            return
+        # In-process parsing already stored the record through the scraper's own record cache
+        store_record(job.scraper, url, digest if job.scraper.record_cache is not None and not in_process else None, data)
+        job.counts['parsed'] += 1
+        job.emit(page, url, digest, data)
+
+    def collect(block: bool) -> None:
+        if not parsing:
+            return
+        done, _ = wait(parsing, return_when=FIRST_COMPLETED) if block else (
+            [future for future in parsing if future.done()], None)
+        for future in done:
+            job, page, url, digest = parsing.pop(future)
+            finish(job, page, url, digest, future.result, False)
+
+    try:
+        changed = [_changed_pages(job) for job in jobs]
+        for job, pages in zip(jobs, changed):
+            logger.info(f"{job.region}: {job.counts['pages']} cached pages, {len(pages)} new or changed, "
+                        f"{job.counts['unchanged'] + job.counts['empty']} unchanged")
+
+        with ExitStack() as stack:
+            scraper = jobs[0].scraper
+            parse_pool = stack.enter_context(
+                create_reprocess_pool(scraper.data_root, scraper.parser_backend, parse_workers)
+            ) if parse_workers > 0 and any(changed) else None
+            io_pool = stack.enter_context(ThreadPoolExecutor(max_workers=max(io_threads, 1)))
+            for task, html_text, digest, data, error in bounded_as_completed(
+                    io_pool, _read_page, _interleave(changed), max_pending):
+                job, page, url = task
+                if error is not None or html_text is None:
+                    logger.error(f"✗ Error reading {page.path or page.card_id}: {error or 'missing'}")
+                    job.counts['errors'] += 1
+                elif data is not None:
+                    job.counts['reread'] += 1
+                    job.emit(page, url, digest, data)
+                elif parse_pool is None:
+                    finish(job, page, url, digest, lambda: job.scraper.parse_card_html(html_text, url), True)
+                else:
+                    while len(parsing) >= max_pending:
+                        collect(block=True)
+                    future = parse_pool.submit(parse_region_page, type(job.scraper), html_text, url)
+                    parsing[future] = (job, page, url, digest)
+                    collect(block=False)
+
+                if progress_interval > 0 and time.monotonic() - last_report >= progress_interval:
+                    last_report = time.monotonic()
+                    for job in jobs:
+                        logger.info(f"⏱ {job.summary()}")
+            while parsing:
+                collect(block=True)
+    finally:
+        for job in jobs:
+            job.close()
+    return time.monotonic() - started
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Streaming Card Sink for PTCG_2026 scrapers
+Appends scraped cards to per-expansion JSONL files as they complete
+
+Features:
+- Memory stays flat however many IDs a run covers: cards are written and
+  dropped, only per-expansion counters are kept
+- Every card is on disk as soon as it is scraped, so a crash loses nothing;
+  sync() fsyncs the open files (the run journal calls it before its own
+  fsync), and files are fsynced when closed
+- Thread-safe; used by all scrape_batch engines (threads, pipeline, async)
+- merge() rebuilds the grouped JSON arrays ({stem}_{expansion}.json) from
+  the JSONL files with the scraper's own save_cards_by_expansion, one
+  expansion in memory at a time
+
+Sample usage:
+    python scrapers/src/japanese_card_scraper.py --id-range 1 50000 --cache-only --jsonl --merge-json
+"""
+
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Expansion files kept open at once (least recently opened are closed first)
+MAX_OPEN_FILES = 64
+
+SUMMARY_FIELDS = ('expansionCode', 'rarity', 'supertype')
+
+
+def safe_expansion_name(expansion: str) -> str:
+    """Expansion code as a file name component"""
+    safe = expansion.replace('.png', '').replace(' ', '_').replace('/', '_').strip()
+    return ''.join(c for c in safe if c.isalnum() or c in ('_', '-')) or 'unknown'
+
+
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Cards in a JSONL file (a torn last line from a crash is skipped)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable line {line_number} in {path.name}")
+
+
+class JsonlCardSink:
+    """Per-expansion JSONL writer for completed cards"""
+
+    def __init__(self, output_path: Path, expansions: Optional[Set[str]] = None, append: bool = False):
+        """
+        Initialize sink
+
+        Args:
+            output_path: Base output path; cards go to {stem}_{expansion}.jsonl beside it
+            expansions: Only keep cards of these expansion codes (lowercase)
+            append: Add to existing JSONL files instead of starting them over
+        """
+        self.output_path = Path(output_path)
+        self.expansions = expansions
+        self.append = append
+        self.count = 0
+        self.skipped = 0
+        self.counters: Dict[str, Counter] = {field: Counter() for field in SUMMARY_FIELDS}
+        self._lock = threading.Lock()
+        self._files: Dict[Path, TextIO] = {}
+        self._started: Set[Path] = set()
+        if append:
+            # Files from the run being continued are part of this run's output
+            self._started.update(self.output_path.parent.glob(f"{self.output_path.stem}_*.jsonl"))
+
+    def add(self, card: Dict[str, Any]) -> None:
+        """Write one card to its expansion's JSONL file"""
+        expansion = card.get('expansionCode', 'unknown')
+        if self.expansions is not None and expansion.lower() not in self.expansions:
+            with self._lock:
+                self.skipped += 1
+            return
+
+        line = json.dumps(card, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file(self.path_for(expansion)).write(line)
+            self.count += 1
+            for field, counter in self.counters.items():
+                counter[card.get(field, 'unknown')] += 1
+
+    def path_for(self, expansion: str) -> Path:
+        return self.output_path.parent / f"{self.output_path.stem}_{safe_expansion_name(expansion)}.jsonl"
+
+    def paths(self) -> List[Path]:
+        """JSONL files written by this run"""
+        with self._lock:
+            return sorted(self._started)
+
+    def sync(self) -> None:
+        """Flush and fsync the open JSONL files"""
+        with self._lock:
+            for f in self._files.values():
+                _fsync(f)
+
+    def close(self) -> None:
+        with self._lock:
+            for f in self._files.values():
+                _fsync(f)
+                f.close()
+            self._files.clear()
+
+    def merge(self, save_func: Callable[[List[Dict[str, Any]], Path, bool], None], compact: bool = False,
+              keep_jsonl: bool = True) -> None:
+        """
+        Write the grouped JSON arrays from this run's JSONL files
+
+        Args:
+            save_func: The scraper module's save_cards_by_expansion
+            compact: Use compact JSON formatting
+            keep_jsonl: Keep the JSONL files once merged
+        """
+        self.close()
+        for path in self.paths():
+            # A resumed run can repeat a card that was written just before a crash; keep the latest
+            cards = {}
+            for card in iter_jsonl(path):
+                cards[card.get('sourceUrl') or len(cards)] = card
+            save_func(list(cards.values()), self.output_path, compact)
+            if not keep_jsonl:
+                path.unlink()
+
+    def __enter__(self) -> 'JsonlCardSink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _file(self, path: Path) -> TextIO:
+        f = self._files.get(path)
+        if f is not None:
+            return f
+
+        if len(self._files) >= MAX_OPEN_FILES:
+            oldest = self._files.pop(next(iter(self._files)))
+            _fsync(oldest)
+            oldest.close()
+
+        # First write of this run truncates unless appending; later reopens append
+        mode = 'a' if self.append or path in self._started else 'w'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(path, mode, encoding='utf-8', buffering=1)  # Line buffered: one card per write
+        self._files[path] = f
+        self._started.add(path)
+        return f
+
+
+def _fsync(f: TextIO) -> None:
+    f.flush()
+    os.fsync(f.fileno())
@@ -18,17 +18,34 @@ from bs4 import BeautifulSoup
 import json
 import re
 import time
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Collection, Dict, Any, Optional, List, Tuple
 import urllib.parse
-import importlib.util
 import argparse
 from pathlib import Path
 from datetime import datetime
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import nullcontext
 from collections import Counter, defaultdict
 import logging
 
+from card_sink import JsonlCardSink
+from html_cache import CACHE_BACKENDS, open_html_cache
+from html_index import HtmlCacheIndex
+from html_shards import ShardHtmlCache
+from html_trim import CardFragmentTrimmer
+from id_discovery import DEFAULT_MAX_STEP, discover_card_ids, mapped_card_ids
+from listing_harvester import harvest_card_ids
+from negative_cache import DEFAULT_TTL_DAYS, open_negative_cache
+from parse_pipeline import bounded_as_completed, scrape_batch_pipelined
+from parser_backend import DEFAULT_PARSER_BACKEND, PARSER_BACKENDS, parse_html
+from record_cache import content_hash, open_record_cache
+from rate_limiter import get_rate_limiter, rate_from_interval
+from retry_policy import RetryPolicy, request_with_retry
+from run_journal import RunJournal, new_run_name, open_run_journal, scrape_with_status
+from sampling_profiler import DEFAULT_PROFILE_INTERVAL, finish_profiling, profile_path, start_profiling
+from scrape_metrics import enable_metrics, metrics_path
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,9 +53,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Check for lxml parser
-_BS4_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
-
 # ============================================================================
 # MAPPING CONSTANTS
 # ============================================================================
@@ -126,7 +140,23 @@ RULE_BOX_PATTERNS = {
 class EnglishCardScraper:
     """Scraper for English (Asia) Pokemon card details"""
 
-    def __init__(self, data_root: Optional[str] = None):
+    REQUEST_HOST = 'asia.pokemon-card.com'
+
+    # Bump when extraction output changes; invalidates this region's record cache
+    EXTRACTOR_VERSION = '1'
+
+    # Subtrees built with --partial-parse (everything the extractors look up)
+    PARSE_ONLY = (
+        'h1', 'h2', 'h3', 'p', 'table', 'div.skillInformation', 'div.subtext', 'div.evolution', 'div.extraInformation',
+        'section.expansionColumn', 'span.expansionSymbol', 'span.rarity', 'span.alpha', 'span.regulationMark',
+        'span.type', 'span[class*="icon-"]', 'div[class*="icon-"]', 'i[class*="icon-"]',
+        'img[src*="/card-img/"]', 'img[src*="/rarity/"]', 'img.img-regulation', 'a[href*="expansionCodes="]',
+    )
+
+    def __init__(self, data_root: Optional[str] = None, cache_backend: str = 'auto',
+                 parser_backend: str = DEFAULT_PARSER_BACKEND, record_cache: bool = False,
+                 negative_ttl_days: Optional[float] = None, trim_cache: bool = False,
+                 partial_parse: bool = False):
         if data_root is None:
             script_dir = Path(__file__).parent.parent.parent
             data_root = script_dir / 'data'
@@ -134,9 +164,20 @@ class EnglishCardScraper:
         self.data_root = Path(data_root)
         self.cards_dir = self.data_root / 'cards' / 'english'
         self.html_dir = self.data_root / 'html' / 'english'
+        self.html_cache = open_html_cache(self.html_dir, cache_backend)
+        # Persistent card ID → file index of flat-file caches, re-indexed on every write
+        self.html_index = None if isinstance(self.html_cache, ShardHtmlCache) else HtmlCacheIndex(self.html_dir)
+        self.html_cache.index = self.html_index
+        self.parser_backend = parser_backend
+        self.partial_parse = partial_parse
+        self.record_cache = open_record_cache(self.data_root, self.cards_dir.name, self.EXTRACTOR_VERSION) if record_cache else None
+        self.negative_cache = open_negative_cache(self.data_root, self.cards_dir.name, self.EXTRACTOR_VERSION, negative_ttl_days) if negative_ttl_days is not None else None
+        if trim_cache:
+            self.html_cache.trim = CardFragmentTrimmer(self)
         
         self.user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        self.min_request_interval = 0.8
+        self.rate_limiter = get_rate_limiter()
+        self.retry_policy = RetryPolicy()
         self.quiet = False
 
     def scrape_card_details(
@@ -147,49 +188,136 @@ class EnglishCardScraper:
         cache_only: bool = False
     ) -> Optional[Dict[str, Any]]:
         try:
-            card_id = self._extract_card_id_from_url(card_url)
-            cache_path = self.html_dir / f"{card_id}.html" if card_id and cache_html else None
-            html_text = None
+            html_text = self.fetch_card_html(card_url, cache_html, refresh_cache, cache_only)
+            if html_text is None:
+                return None
 
-            if cache_path and cache_path.exists() and not refresh_cache:
-                if not self.quiet:
-                    logger.info(f"Using cached HTML for card {card_id}")
-                html_text = cache_path.read_text(encoding='utf-8')
-            else:
-                if cache_only:
-                    if not self.quiet:
-                        logger.warning(f"Cache miss for {card_id}, skipping (cache-only mode)")
-                    return None
-                
+            return self.parse_card_html(html_text, card_url)
+
+        except Exception as e:
+            if not self.quiet:
+                logger.error(f"Error scraping {card_url}: {e}")
+            return None
+
+    def fetch_card_html(
+        self,
+        card_url: str,
+        cache_html: bool = False,
+        refresh_cache: bool = False,
+        cache_only: bool = False
+    ) -> Optional[str]:
+        """Get a card detail page from the cache or the web without parsing it (None on a cache-only miss)"""
+        card_id = self._extract_card_id_from_url(card_url)
+        html_text = self._read_cached_html(card_id, card_url, cache_html, refresh_cache, cache_only)
+
+        if html_text is None:
+            if cache_only:
                 if not self.quiet:
-                    logger.info(f"Fetching {card_url}")
-                
-                time.sleep(self.min_request_interval)
-                response = requests.get(card_url, headers={'User-Agent': self.user_agent}, timeout=10)
-                response.raise_for_status()
-                html_text = response.text
-                
-                if cache_path:
-                    cache_path.parent.mkdir(parents=True, exist_ok=True)
-                    cache_path.write_text(html_text, encoding='utf-8')
+                    logger.warning(f"Cache miss for {card_id}, skipping (cache-only mode)")
+                return None
+            
+            if not self.quiet:
+                logger.info(f"Fetching {card_url}")
+            
+            # Revalidate cached copy on refresh runs (conditional GET)
+            headers = {'User-Agent': self.user_agent}
+            headers.update(self._conditional_headers(card_id, cache_html, refresh_cache))
+            response = request_with_retry(
+                lambda: requests.get(card_url, headers=headers, timeout=10),
+                card_url, self.rate_limiter, self.retry_policy
+            )
+            html_text = self._handle_response(
+                card_id, card_url, response.status_code, response.text, response.headers, cache_html
+            )
+
+        return html_text
 
-            soup = BeautifulSoup(html_text, _BS4_PARSER)
-            card_data = self._extract_card_info(soup, card_url)
+    def set_rate_limit(self, min_request_interval: float, burst: int = 1) -> None:
+        """Configure the shared request budget for asia.pokemon-card.com (0 = unlimited)"""
+        self.rate_limiter.configure(self.REQUEST_HOST, rate_from_interval(min_request_interval), burst)
 
-            if card_data and self._is_valid_card_data(card_data):
+    def parse_card_html(self, html_text: str, card_url: str) -> Optional[Dict[str, Any]]:
+        """Parse a card detail page into card data, or None if it holds no valid card"""
+        digest = None
+        if self.record_cache is not None:
+            digest = content_hash(html_text)
+            card_data = self.record_cache.get(card_url, digest)
+            if card_data is not None:
                 if not self.quiet:
-                    logger.info(f"Successfully scraped: {card_data['name']} ({card_data['webCardId']})")
+                    logger.info(f"Cached record: {card_data['name']} ({card_data['webCardId']})")
                 return card_data
-            else:
-                if not self.quiet:
-                    logger.error(f"Failed to parse card data for {card_url}")
-                return None
 
-        except Exception as e:
+        card_data = None
+        full_parse = True
+        if self.partial_parse:
+            try:
+                tree = parse_html(html_text, self.parser_backend, self.PARSE_ONLY)
+                # No h1 in the partial tree: an empty ID page, not worth a full parse
+                full_parse = tree.find('h1') is not None
+                card_data = self._extract_card_info(tree, card_url) if full_parse else None
+            except Exception:
+                card_data = None
+        if full_parse and not (card_data and self._is_valid_card_data(card_data)):
+            # Full parse of card pages the partial tree could not extract
+            card_data = self._extract_card_info(parse_html(html_text, self.parser_backend), card_url)
+
+        has_card = bool(card_data and self._is_valid_card_data(card_data))
+        if self.negative_cache is not None:
+            self.negative_cache.update(self._extract_card_id_from_url(card_url), has_card)
+
+        if has_card:
+            if digest is not None:
+                self.record_cache.put(card_url, digest, card_data)
             if not self.quiet:
-                logger.error(f"Error scraping {card_url}: {e}")
+                logger.info(f"Successfully scraped: {card_data['name']} ({card_data['webCardId']})")
+            return card_data
+
+        if not self.quiet:
+            logger.error(f"Failed to parse card data for {card_url}")
+        return None
+
+    def _read_cached_html(
+        self,
+        card_id: Optional[str],
+        card_url: str,
+        cache_html: bool,
+        refresh_cache: bool,
+        cache_only: bool
+    ) -> Optional[str]:
+        """Return cached HTML for a card, or None if it must be fetched"""
+        if not card_id or not (cache_html or cache_only) or refresh_cache:
             return None
 
+        html_text = self.html_cache.read(card_id)
+        if html_text is not None and not self.quiet:
+            logger.info(f"Using cached HTML for card {card_id}")
+        return html_text
+
+    def _conditional_headers(self, card_id: Optional[str], cache_html: bool, refresh_cache: bool) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers when refreshing a cached page"""
+        if not card_id or not cache_html or not refresh_cache:
+            return {}
+        return self.html_cache.conditional_headers(card_id)
+
+    def _handle_response(
+        self,
+        card_id: Optional[str],
+        card_url: str,
+        status: int,
+        html_text: str,
+        headers: Dict[str, str],
+        cache_html: bool
+    ) -> Optional[str]:
+        """Cache a fetched page (or reuse the cached copy on 304) and return its HTML"""
+        if status == 304:
+            if not self.quiet:
+                logger.info(f"Not modified, using cached HTML for card {card_id}")
+            return self.html_cache.revalidated(card_id, headers)
+
+        if cache_html and card_id:
+            self.html_cache.store(card_id, html_text, headers, card_url)
+        return html_text
+
     def _extract_card_info(self, soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
         card_name_h1 = soup.find('h1')
         if not card_name_h1:
@@ -720,24 +848,63 @@ def scrape_batch(
     cache_html: bool = True,
     refresh_cache: bool = False,
     cache_only: bool = False,
-    threads: int = 1
+    threads: int = 1,
+    engine: str = 'threads',
+    concurrency: int = 200,
+    max_connections_per_host: int = 8,
+    parse_workers: int = 0,
+    sink: Optional[JsonlCardSink] = None,
+    journal: Optional[RunJournal] = None,
+    executor: Optional[Executor] = None,
+    parse_pool: Optional[Executor] = None,
+    requested_ids: Collection[int] = ()
 ) -> List[Dict[str, Any]]:
-    urls = [build_card_url(card_id) for card_id in card_ids]
+    if journal is not None:
+        card_ids = journal.pending_ids(card_ids, build_card_url)
+    # Skipping saves no request when only the cache is read, so cache-only runs see every page;
+    # explicitly requested IDs are always fetched
+    if scraper.negative_cache is not None and not (refresh_cache or cache_only):
+        card_ids = scraper.negative_cache.pending_ids(card_ids, requested_ids)
+
+    if engine == 'async':
+        from fetch_engine import scrape_batch_async
+        return scrape_batch_async(
+            card_ids, scraper, build_card_url, cache_html, refresh_cache, cache_only,
+            concurrency=concurrency,
+            max_connections_per_host=max_connections_per_host,
+            parse_workers=parse_workers,
+            sink=sink,
+            journal=journal,
+            parse_pool=parse_pool
+        )
+
+    urls = (build_card_url(card_id) for card_id in card_ids)
+    if parse_workers > 0 or parse_pool is not None:
+        return scrape_batch_pipelined(
+            urls, scraper, cache_html, refresh_cache, cache_only,
+            io_threads=threads, parse_workers=parse_workers, sink=sink, journal=journal,
+            parse_pool=parse_pool, io_pool=executor
+        )
     results = []
+    emit = sink.add if sink is not None else results.append
+    
+    def scrape_one(url: str) -> Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[str]]:
+        return (url, *scrape_with_status(scraper, url, cache_html, refresh_cache, cache_only))
     
-    def scrape_one(url: str) -> Optional[Dict[str, Any]]:
-        return scraper.scrape_card_details(url, cache_html, refresh_cache, cache_only)
+    def finish(url: str, outcome: Optional[str], data: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        if data:
+            emit(data)
+        if journal is not None and outcome is not None:
+            journal.record(url, outcome, error)
     
-    if threads > 1:
-        with ThreadPoolExecutor(max_workers=threads) as executor:
-            future_to_url = {executor.submit(scrape_one, url): url for url in urls}
-            for future in as_completed(future_to_url):
-                data = future.result()
-                if data: results.append(data)
+    if threads > 1 or executor is not None:
+        with nullcontext(executor) if executor is not None else ThreadPoolExecutor(max_workers=threads) as pool:
+            for scraped in bounded_as_completed(pool, scrape_one, urls, max(1, threads) * 4):
+                finish(*scraped)
     else:
         for url in urls:
-            data = scrape_one(url)
-            if data: results.append(data)
+            finish(*scrape_one(url))
+    
     return results
 
 def save_cards_by_expansion(cards: List[Dict[str, Any]], output_path: Path, compact: bool = False) -> None:
@@ -760,45 +927,157 @@ def main():
     parser = argparse.ArgumentParser(description='English (Asia) Card Scraper')
     parser.add_argument('--ids', type=str, help='Comma-separated card IDs')
     parser.add_argument('--id-range', nargs=2, type=int)
+    parser.add_argument('--discover', action='store_true',
+                        help='Probe --id-range for dense intervals first and scrape only those (map saved to data/ids/{region}.json)')
+    parser.add_argument('--discover-step', type=int, default=DEFAULT_MAX_STEP,
+                        help=f'Largest jump between discovery probes; smaller finds smaller clusters (default: {DEFAULT_MAX_STEP})')
+    parser.add_argument('--id-map', action='store_true',
+                        help='Scrape the intervals saved by earlier --discover runs (within --id-range if given)')
     parser.add_argument('--output', default='english_cards.json')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='Stream cards to per-expansion JSONL files as they complete (flat memory)')
+    parser.add_argument('--merge-json', action='store_true',
+                        help='With --jsonl, also write the grouped JSON files at the end')
+    parser.add_argument('--resume', metavar='RUN',
+                        help='Resume an interrupted --jsonl run from its journal (data/runs/{region}/RUN.jsonl), skipping finished cards')
     parser.add_argument('--cache-html', action='store_true')
     parser.add_argument('--refresh-cache', action='store_true')
     parser.add_argument('--cache-only', action='store_true')
+    parser.add_argument('--cache-backend', choices=CACHE_BACKENDS, default='auto',
+                        help='HTML cache backend: flat files or compressed shards (default: auto)')
+    parser.add_argument('--partial-parse', action='store_true',
+                        help='Build only the card detail subtrees of each page (bs4 backend; full parse if no card is found)')
+    parser.add_argument('--trim-cache', action='store_true',
+                        help='Cache only the card detail fragment of fetched pages (smaller cache, faster re-parsing)')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER_BACKEND,
+                        help='HTML parser backend: bs4, or the faster lxml tree (default: bs4)')
+    parser.add_argument('--no-record-cache', action='store_true',
+                        help='Re-extract every page instead of reusing records from unchanged HTML')
+    parser.add_argument('--negative-ttl', type=float, default=DEFAULT_TTL_DAYS, metavar='DAYS',
+                        help=f'Days to skip IDs whose page held no card before probing them again (default: {DEFAULT_TTL_DAYS:g})')
+    parser.add_argument('--no-negative-cache', action='store_true',
+                        help='Probe every ID, including ones known to hold no card')
     parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                        help='Fetch engine: thread pool or asyncio (default: threads)')
+    parser.add_argument('--concurrency', type=int, default=200,
+                        help='Cards in flight at once with --engine async')
+    parser.add_argument('--max-connections-per-host', type=int, default=8,
+                        help='Pooled connections per host with --engine async')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Processes parsing HTML while threads fetch it (default: 0 = parse in the fetch threads)')
+    parser.add_argument('--min-request-interval', type=float, default=0.8,
+                        help='Seconds per request at the sustained per-host rate (default: 0.8)')
+    parser.add_argument('--burst', type=int, default=1,
+                        help='Requests allowed back-to-back per host (default: 1)')
+    parser.add_argument('--max-retries', type=int, default=4,
+                        help='Retries for 429/5xx/connection errors (default: 4)')
     parser.add_argument('--quiet', action='store_true')
-    parser.add_argument('--expansion', type=str, help='Filter by expansion code (requires fetch_expansion_ids implementation)')
+    parser.add_argument('--metrics', nargs='?', const='auto', metavar='PATH',
+                        help='Time each scrape stage and write the histograms (.prom/.txt: Prometheus text, '
+                             'otherwise JSON; default: data/runs/{region}/{run}.metrics.json)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='Serve live metrics on http://127.0.0.1:PORT/metrics while scraping')
+    parser.add_argument('--profile', nargs='?', const='auto', metavar='PATH',
+                        help='Sample all threads and parse workers; write folded stacks for a flamegraph and a ranked '
+                             'table next to them (default: data/runs/{region}/{run}.profile.folded)')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_PROFILE_INTERVAL, metavar='SECONDS',
+                        help=f'Seconds between --profile samples (default: {DEFAULT_PROFILE_INTERVAL:g})')
+    parser.add_argument('--expansion', type=str,
+                        help='Comma-separated expansion codes; their card IDs are harvested from the card search listing')
     
     args = parser.parse_args()
     
-    scraper = EnglishCardScraper()
+    scraper = EnglishCardScraper(cache_backend=args.cache_backend, parser_backend=args.parser,
+                                 record_cache=not args.no_record_cache,
+                                 negative_ttl_days=None if args.no_negative_cache else args.negative_ttl,
+                                 trim_cache=args.trim_cache, partial_parse=args.partial_parse)
     scraper.quiet = args.quiet
+    metrics = enable_metrics(scraper, args.metrics_port) if args.metrics or args.metrics_port else None
+    profiler = start_profiling(args.profile_interval) if args.profile else None
+    scraper.set_rate_limit(args.min_request_interval, args.burst)
+    scraper.retry_policy.max_retries = args.max_retries
     
     card_ids = []
     
+    requested_ids = set()
     if args.ids:
         card_ids = [int(x.strip()) for x in args.ids.split(',') if x.strip()]
+        requested_ids.update(card_ids)
     elif args.id_range:
         start, count = args.id_range
         card_ids = list(range(start, start + count))
     elif args.expansion:
-         # Placeholder for future implementation
-        logger.warning("Fetching by expansion code is not fully implemented due to site structure (JS-rendered). Please provide --id-range.")
-        return
+        # Collect the expansions' card IDs from the card search listing pages
+        card_ids = harvest_card_ids(scraper, [x.strip() for x in args.expansion.split(',') if x.strip()])
+        # Listed by the site itself, so never skipped as known-empty
+        requested_ids.update(card_ids)
     else:
         card_ids = [1000]
 
+    # Narrow the ID list to the dense intervals of the ID space
+    if args.discover:
+        if not args.id_range:
+            logger.error("--discover needs --id-range START COUNT")
+            return
+        start, count = args.id_range
+        card_ids = discover_card_ids(scraper, build_card_url, start, count,
+                                     max_step=args.discover_step, cache_only=args.cache_only)
+    elif args.id_map:
+        card_ids = mapped_card_ids(scraper, args.id_range)
+    if not card_ids:
+        logger.warning("No card IDs to scrape")
+        return
+    
     logger.info(f"Starting scrape of {len(card_ids)} cards...")
+    output_path = Path(args.output)
+    if args.resume:
+        args.jsonl = True
+    sink = JsonlCardSink(output_path, append=bool(args.resume)) if args.jsonl else None
+    journal = open_run_journal(scraper.data_root, scraper.cards_dir.name, args.resume) if args.jsonl else None
+    if journal is not None:
+        journal.before_sync = sink.sync
+        logger.info(f"Run journal: {journal.path} (resume with --resume {journal.name})")
     cards = scrape_batch(
         card_ids,
         scraper,
         cache_html=args.cache_html or args.cache_only,
         refresh_cache=args.refresh_cache,
         cache_only=args.cache_only,
-        threads=args.threads
+        threads=args.threads,
+        engine=args.engine,
+        concurrency=args.concurrency,
+        max_connections_per_host=args.max_connections_per_host,
+        parse_workers=args.parse_workers,
+        sink=sink,
+        journal=journal,
+        requested_ids=requested_ids
     )
     
-    save_cards_by_expansion(cards, Path(args.output), False)
-    logger.info(f"Scraped {len(cards)} cards")
+    if sink is not None:
+        sink.close()
+        journal.close()
+        logger.info(f"Run {journal.name}: {journal.summary()}")
+        if args.merge_json:
+            sink.merge(save_cards_by_expansion)
+        logger.info(f"Scraped {sink.count} cards (streamed to {len(sink.paths())} JSONL files)")
+    else:
+        save_cards_by_expansion(cards, output_path, False)
+        logger.info(f"Scraped {len(cards)} cards")
+    if scraper.record_cache is not None:
+        stats = scraper.record_cache.stats()
+        logger.info(f"Record cache: {stats['hits']} hits, {stats['misses']} misses")
+    if scraper.negative_cache is not None:
+        stats = scraper.negative_cache.stats()
+        logger.info(f"Negative cache: skipped {stats['skipped']} empty IDs, {stats['added']} new, {stats['cleared']} now hold cards")
+    run_name = journal.name if journal is not None else new_run_name()
+    if metrics is not None:
+        metrics.log_summary()
+        if args.metrics:
+            path = metrics.write(metrics_path(args.metrics, scraper.data_root, scraper.cards_dir.name, run_name))
+            logger.info(f"Metrics: {path}")
+    if profiler is not None:
+        finish_profiling(profiler, profile_path(args.profile, scraper.data_root, scraper.cards_dir.name, run_name))
 
 if __name__ == '__main__':
     main()
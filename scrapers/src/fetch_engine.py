@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Async Fetch Engine for PTCG_2026 scrapers
+Shared asyncio download engine used by the JP, HK and EN card scrapers
+
+Features:
+- Thousands of pending card requests on one event loop (no OS thread per card)
+- Bounded connections per host with pooled keep-alive connections (aiohttp)
+- Reuses each scraper's cache and extraction logic, so results are the same
+  card dicts `scrape_card_details` returns
+- Request pacing comes from the shared per-host limiter (rate_limiter.py)
+- Transient 429/5xx and connection errors are retried (retry_policy.py)
+- Conditional GETs on --refresh-cache runs (html_cache.py validators)
+- Optional process pool for parsing (parse_pipeline.py), so extraction uses all cores
+
+Sample usage:
+    python scrapers/src/japanese_card_scraper.py --id-range 40000 20000 --cache-html --engine async
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+import logging
+
+import aiohttp
+
+from parse_pipeline import create_parse_pool, lookup_record, parse_in_worker, store_record
+from rate_limiter import HostRateLimiter
+from retry_policy import RetryPolicy, retry_delay
+from run_journal import EMPTY, HTTP_ERROR, OK, PARSE_ERROR
+from scrape_metrics import NETWORK, RATE_LIMIT_WAIT, get_stage_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class AsyncFetchEngine:
+    """Asyncio HTTP engine that drives any card scraper's cache/parse pipeline"""
+
+    def __init__(
+        self,
+        concurrency: int = 200,
+        max_connections: int = 100,
+        max_connections_per_host: int = 8,
+        timeout: float = 10.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+        parse_workers: int = 4,
+        parse_pool: Optional[Executor] = None
+    ):
+        """
+        Initialize engine
+
+        Args:
+            concurrency: Number of cards in flight at once (pending requests)
+            max_connections: Total size of the keep-alive connection pool
+            max_connections_per_host: Open connections allowed per host
+            timeout: Total timeout per request in seconds
+            user_agent: User-Agent header sent with every request
+            parse_workers: Threads used for cache I/O and HTML parsing
+            parse_pool: Process pool from parse_pipeline.create_parse_pool; when
+                set, pages are parsed there instead of in the I/O threads
+        """
+        self.concurrency = max(1, concurrency)
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.parse_workers = parse_workers
+        self.parse_pool = parse_pool
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def __aenter__(self) -> 'AsyncFetchEngine':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Open the pooled HTTP session"""
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            keepalive_timeout=30,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'User-Agent': self.user_agent}
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.parse_workers)
+
+    async def close(self) -> None:
+        """Close the HTTP session and worker threads"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def fetch(
+        self,
+        url: str,
+        rate_limiter: HostRateLimiter,
+        policy: RetryPolicy,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, str, Mapping[str, str]]:
+        """
+        Fetch a URL through the host rate limiter, retrying transient failures
+
+        Returns:
+            (status, decoded body, response headers); raises
+            aiohttp.ClientResponseError for non-retryable error statuses or
+            once retries are exhausted
+        """
+        metrics = get_stage_metrics()
+        attempt = 0
+        while True:
+            metrics.observe(RATE_LIMIT_WAIT, await rate_limiter.acquire_async(url))
+            try:
+                with metrics.timer(NETWORK):
+                    async with self._session.get(url, headers=headers) as response:
+                        status = response.status
+                        if not policy.is_retryable_status(status):
+                            rate_limiter.record(url, True)
+                            response.raise_for_status()
+                            return status, await response.text(), response.headers
+
+                        rate_limiter.record(url, False)
+                        if attempt >= policy.max_retries:
+                            logger.error(f"Giving up on {url} after {attempt + 1} attempts: HTTP {status}")
+                            response.raise_for_status()
+                        delay = retry_delay(url, response.headers.get('Retry-After'), attempt, rate_limiter, policy)
+                        reason = f"HTTP {status}"
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                rate_limiter.record(url, False)
+                if attempt >= policy.max_retries:
+                    logger.error(f"Giving up on {url} after {attempt + 1} attempts: {e!r}")
+                    raise
+                delay = policy.backoff(attempt)
+                reason = type(e).__name__
+
+            logger.warning(f"{reason} for {url}, retry {attempt + 1}/{policy.max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def scrape_card(
+        self,
+        scraper: Any,
+        card_url: str,
+        cache_html: bool = False,
+        refresh_cache: bool = False,
+        cache_only: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Async counterpart of `scraper.scrape_card_details`
+
+        Args:
+            scraper: JapaneseCardScraper, HkCardScraper or EnglishCardScraper
+            card_url: URL to card detail page
+            cache_html: Save HTML to cache directory
+            refresh_cache: Force re-fetch even if cached
+            cache_only: Only use cache, skip HTTP requests
+
+        Returns:
+            Card data dict or None if failed
+        """
+        _, data, _ = await self.scrape_card_status(scraper, card_url, cache_html, refresh_cache, cache_only)
+        return data
+
+    async def scrape_card_status(
+        self,
+        scraper: Any,
+        card_url: str,
+        cache_html: bool = False,
+        refresh_cache: bool = False,
+        cache_only: bool = False,
+        parse_pool: Optional[Executor] = None
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[str]]:
+        """
+        `scrape_card` that also reports the outcome (as run_journal.scrape_with_status)
+
+        Args:
+            parse_pool: Process pool for this scraper's pages (defaults to the engine's)
+
+        Returns:
+            (outcome, card data, error message); the outcome is None on a cache-only miss
+        """
+        try:
+            card_id = scraper._extract_card_id_from_url(card_url)
+            html_text = await self._run_blocking(
+                scraper._read_cached_html, card_id, card_url, cache_html, refresh_cache, cache_only
+            )
+
+            if html_text is None:
+                if cache_only:
+                    return None, None, None
+
+                if not scraper.quiet:
+                    logger.info(f"Fetching {card_url}")
+
+                # Revalidate cached copy on refresh runs (conditional GET)
+                headers = await self._run_blocking(
+                    scraper._conditional_headers, card_id, cache_html, refresh_cache
+                )
+                status, body, response_headers = await self.fetch(
+                    card_url, scraper.rate_limiter, scraper.retry_policy, headers
+                )
+                html_text = await self._run_blocking(
+                    scraper._handle_response, card_id, card_url, status, body, response_headers, cache_html
+                )
+        except Exception as e:
+            if not scraper.quiet:
+                logger.error(f"✗ Error scraping {card_url}: {e}")
+            return HTTP_ERROR, None, str(e)
+
+        parse_pool = parse_pool or self.parse_pool
+        try:
+            if parse_pool is not None:
+                digest, data = await self._run_blocking(lookup_record, scraper, html_text, card_url)
+                if data is None:
+                    loop = asyncio.get_running_loop()
+                    data = await loop.run_in_executor(parse_pool, parse_in_worker, html_text, card_url)
+                    await self._run_blocking(store_record, scraper, card_url, digest, data)
+            else:
+                data = await self._run_blocking(scraper.parse_card_html, html_text, card_url)
+        except Exception as e:
+            if not scraper.quiet:
+                logger.error(f"✗ Error parsing {card_url}: {e}")
+            return PARSE_ERROR, None, str(e)
+        return (OK if data else EMPTY), data, None
+
+    async def scrape_urls(
+        self,
+        scraper: Any,
+        urls: Iterable[str],
+        cache_html: bool = False,
+        refresh_cache: bool = False,
+        cache_only: bool = False,
+        sink: Optional[Any] = None,
+        journal: Optional[Any] = None,
+        parse_pool: Optional[Executor] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Scrape many card URLs with at most `concurrency` cards in flight
+        (streamed to `sink` and outcomes recorded in `journal` if given)
+
+        Several scrape_urls calls can run on one engine at once (one per
+        region), sharing its connection pool; `parse_pool` then gives each
+        scraper class its own parse worker pool
+        """
+        url_iter = iter(urls)
+        results = []
+
+        async def worker() -> None:
+            # Workers share one iterator, so URLs are consumed lazily
+            for url in url_iter:
+                outcome, data, error = await self.scrape_card_status(
+                    scraper, url, cache_html, refresh_cache, cache_only, parse_pool
+                )
+                if data:
+                    if sink is not None:
+                        sink.add(data)
+                    else:
+                        results.append(data)
+                if journal is not None and outcome is not None:
+                    journal.record(url, outcome, error)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return results
+
+    async def _run_blocking(self, func: Callable, *args) -> Any:
+        """Run cache I/O or parsing off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+
+def scrape_batch_async(
+    card_ids: Iterable[int],
+    scraper: Any,
+    build_card_url: Callable[[int], str],
+    cache_html: bool = True,
+    refresh_cache: bool = False,
+    cache_only: bool = False,
+    concurrency: int = 200,
+    max_connections_per_host: int = 8,
+    parse_workers: int = 0,
+    sink: Optional[Any] = None,
+    journal: Optional[Any] = None,
+    parse_pool: Optional[Executor] = None
+) -> List[Dict[str, Any]]:
+    """
+    Scrape multiple cards on the async engine
+
+    Args:
+        card_ids: Card IDs to scrape
+        scraper: Scraper instance
+        build_card_url: Region-specific card ID → URL builder
+        cache_html: Save HTML to cache
+        refresh_cache: Force re-fetch
+        cache_only: Only use cache
+        concurrency: Number of cards in flight at once
+        max_connections_per_host: Open connections allowed per host
+        parse_workers: Parser processes (0 = parse in the engine's threads)
+        sink: JsonlCardSink that receives each card as it completes
+        journal: RunJournal that records each card's outcome
+        parse_pool: Pool from create_parse_pool to reuse instead of starting one (left running)
+
+    Returns:
+        List of scraped card data (empty when streaming to a sink)
+    """
+    async def run(parse_pool: Optional[Executor]) -> List[Dict[str, Any]]:
+        async with AsyncFetchEngine(
+            concurrency=concurrency,
+            max_connections_per_host=max_connections_per_host,
+            user_agent=scraper.user_agent,
+            parse_pool=parse_pool
+        ) as engine:
+            urls = (build_card_url(card_id) for card_id in card_ids)
+            return await engine.scrape_urls(scraper, urls, cache_html, refresh_cache, cache_only, sink, journal)
+
+    if parse_pool is not None:
+        return asyncio.run(run(parse_pool))
+    if parse_workers > 0:
+        with create_parse_pool(scraper, parse_workers) as parse_pool:
+            return asyncio.run(run(parse_pool))
+    return asyncio.run(run(None))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+HTML Cache for PTCG_2026 scrapers
+Stores card detail pages in data/html/{region} with sidecar validator metadata
+
+Features:
+- Flat `{card_id}.html` files (expansion folders supported through a resolver)
+- `{card_id}.meta.json` sidecars holding ETag / Last-Modified and a body hash
+- Conditional GET headers for --refresh-cache runs: 304 responses keep the
+  cached page, 200 responses only rewrite the page when the body changed
+- Optional `trim` hook (html_trim.py) storing only the card detail fragment;
+  change detection keeps using the hash of the page as served
+- Optional cache index (html_index.py) re-indexed on every page write, since
+  in-place rewrites leave the directory mtime unchanged
+- `open_html_cache` picks the flat-file or sharded backend (html_shards.py)
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional
+import logging
+
+from html_index import HtmlCacheIndex
+
+logger = logging.getLogger(__name__)
+
+META_SUFFIX = '.meta.json'
+
+CACHE_BACKENDS = ['auto', 'files', 'shards']
+
+
+class HtmlCache:
+    """Card HTML cache with HTTP validators for conditional revalidation"""
+
+    def __init__(self, root: Path, resolver: Optional[Callable[[str], Optional[Path]]] = None):
+        """
+        Initialize cache
+
+        Args:
+            root: Cache directory (e.g. data/html/japan)
+            resolver: Optional card ID → existing file lookup for non-flat layouts
+        """
+        self.root = Path(root)
+        self.resolver = resolver
+        # Page → card fragment (None keeps the page); set for --trim-cache
+        self.trim: Optional[Callable[[str, Optional[str]], Optional[str]]] = None
+        # Card ID → file index kept current on writes; set by the scrapers
+        self.index: Optional[HtmlCacheIndex] = None
+
+    def path(self, card_id: str) -> Path:
+        """Flat cache path for a card"""
+        return self.root / f"{card_id}.html"
+
+    def locate(self, card_id: str) -> Optional[Path]:
+        """Existing cache file for a card, or None"""
+        if self.resolver is not None:
+            return self.resolver(card_id)
+        path = self.path(card_id)
+        return path if path.exists() else None
+
+    def contains(self, card_id: str) -> bool:
+        """True if a page is cached for the card"""
+        return self.locate(card_id) is not None
+
+    def card_ids(self) -> List[str]:
+        """Card IDs of all flat cache files"""
+        if not self.root.exists():
+            return []
+        return [path.stem for path in self.root.glob('*.html') if path.stem.isdigit()]
+
+    def read(self, card_id: str) -> Optional[str]:
+        """Read a cached page (None on cache miss)"""
+        path = self.locate(card_id)
+        if path is None:
+            return None
+        return path.read_text(encoding='utf-8')
+
+    def read_meta(self, card_id: str) -> Dict[str, Any]:
+        """Sidecar metadata for a cached page ({} if none)"""
+        path = self.locate(card_id)
+        if path is None:
+            return {}
+        try:
+            return json.loads(self._meta_path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def conditional_headers(self, card_id: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating a cached page"""
+        meta = self.read_meta(card_id)
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('lastModified'):
+            headers['If-Modified-Since'] = meta['lastModified']
+        return headers
+
+    def revalidated(self, card_id: str, response_headers: Mapping[str, str]) -> Optional[str]:
+        """
+        Handle a 304 Not Modified response
+
+        Returns:
+            Cached page (None if the cache entry vanished meanwhile)
+        """
+        path = self.locate(card_id)
+        if path is None:
+            return None
+        meta = self.read_meta(card_id)
+        meta.update(self._validators(response_headers))
+        meta['checkedAt'] = datetime.now().isoformat()
+        self._write_meta(path, meta)
+        return path.read_text(encoding='utf-8')
+
+    def store(self, card_id: str, html_text: str, response_headers: Mapping[str, str], url: str = None) -> bool:
+        """
+        Save a 200 response and its validators
+
+        Returns:
+            True if the page body was (re)written, False if it was unchanged
+        """
+        path = self.locate(card_id) or self.path(card_id)
+        meta = self.read_meta(card_id)
+        body_hash = hashlib.sha256(html_text.encode('utf-8')).hexdigest()
+        changed = self.source_hash(meta) != body_hash or not path.exists()
+
+        if changed:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(self._stored_body(html_text, url, meta), encoding='utf-8')
+            self._reindex(path)
+
+        now = datetime.now().isoformat()
+        meta.update({
+            'url': url or meta.get('url'),
+            'sha256': body_hash,
+            'checkedAt': now
+        })
+        if changed:
+            meta['fetchedAt'] = now
+        meta.pop('etag', None)
+        meta.pop('lastModified', None)
+        meta.update(self._validators(response_headers))
+        self._write_meta(path, meta)
+        return changed
+
+    def rewrite(self, card_id: str, html_text: str, meta_updates: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Replace a cached page's body in place (validators and fetch times are kept)
+
+        Returns:
+            False if the card is not cached
+        """
+        path = self.locate(card_id)
+        if path is None:
+            return False
+        meta = self.read_meta(card_id)
+        path.write_text(html_text, encoding='utf-8')
+        self._reindex(path)
+        meta.update(meta_updates or {})
+        self._write_meta(path, meta)
+        return True
+
+    @staticmethod
+    def source_hash(meta: Dict[str, Any]) -> Optional[str]:
+        """Hash of the page as served (trimmed pages record it separately)"""
+        return meta.get('sourceSha256') or meta.get('sha256')
+
+    def _stored_body(self, html_text: str, url: Optional[str], meta: Dict[str, Any]) -> str:
+        """Body to write for a fetched page, noting in `meta` whether it was trimmed"""
+        fragment = self.trim(html_text, url) if self.trim is not None else None
+        if fragment is None:
+            meta.pop('fragment', None)
+            meta.pop('sourceSha256', None)
+            return html_text
+        from html_trim import FRAGMENT_VERSION
+        meta['fragment'] = FRAGMENT_VERSION
+        meta['sourceSha256'] = hashlib.sha256(html_text.encode('utf-8')).hexdigest()
+        return fragment
+
+    def _reindex(self, path: Path) -> None:
+        if self.index is not None:
+            self.index.update_path(path)
+
+    @staticmethod
+    def _validators(response_headers: Mapping[str, str]) -> Dict[str, str]:
+        validators = {}
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if etag:
+            validators['etag'] = etag
+        if last_modified:
+            validators['lastModified'] = last_modified
+        return validators
+
+    @staticmethod
+    def _meta_path(html_path: Path) -> Path:
+        return html_path.with_name(html_path.stem + META_SUFFIX)
+
+    def _write_meta(self, html_path: Path, meta: Dict[str, Any]) -> None:
+        self._meta_path(html_path).write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+
+
+def open_html_cache(
+    root: Path,
+    backend: str = 'auto',
+    resolver: Optional[Callable[[str], Optional[Path]]] = None
+) -> HtmlCache:
+    """
+    Open the HTML cache for a region directory
+
+    Args:
+        root: Cache directory (e.g. data/html/japan)
+        backend: 'files', 'shards', or 'auto' (shards once the directory was migrated)
+        resolver: Card ID → file lookup for the flat-file backend
+
+    Returns:
+        HtmlCache or ShardHtmlCache
+    """
+    from html_shards import ShardHtmlCache, has_shard_index
+
+    if backend == 'shards' or (backend == 'auto' and has_shard_index(root)):
+        return ShardHtmlCache(root)
+    return HtmlCache(root, resolver=resolver)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+HTML Cache Index for PTCG_2026 scrapers
+Persistent SQLite index of a cache directory: card ID → (path, mtime, size, language)
+
+Features:
+- Supports flat files and expansion folders (data/html/hongkong/{expansion}/{id}.html)
+- Incremental refresh: only directories whose mtime changed are re-listed, and
+  only new or changed files (mtime/size) are re-read; the known files of the
+  other directories are re-stat'ed, since pages rewritten in place leave the
+  directory mtime alone
+- Page language (hk / hk-en) is detected once at index time from the image URLs,
+  so the cache-hit language check does not have to read the page
+- A warm index of a 30k-file cache loads in milliseconds instead of a full scan
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = '.index'
+SNIFF_BYTES = 4096
+
+# Directories modified this recently may still receive files within the same
+# mtime tick, so they are re-listed on the next refresh
+RACY_SECONDS = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    card_id TEXT,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    language TEXT
+);
+CREATE INDEX IF NOT EXISTS files_card_id ON files (card_id);
+"""
+
+
+class IndexEntry(NamedTuple):
+    """One indexed cache file"""
+    card_id: str
+    path: Path
+    folder: Optional[str]  # Expansion folder (None for flat files)
+    mtime_ns: int
+    size: int
+    language: Optional[str]
+
+
+def detect_language(sample: str) -> Optional[str]:
+    """'hk-en' or 'hk' from the card image URLs in a page sample (None if unknown)"""
+    if '/hk-en/card-img/' in sample:
+        return 'hk-en'
+    if '/hk/card-img/' in sample:
+        return 'hk'
+    return None
+
+
+class HtmlCacheIndex:
+    """Persistent, incrementally refreshed index of an HTML cache directory"""
+
+    def __init__(self, root: Path, index_path: Optional[Path] = None):
+        """
+        Initialize index
+
+        Args:
+            root: Cache directory (e.g. data/html/hongkong)
+            index_path: SQLite file (defaults to data/html/.index/{region}.sqlite,
+                outside the cache so index writes never touch its mtimes)
+        """
+        self.root = Path(root)
+        self.index_path = Path(index_path) if index_path else self.root.parent / INDEX_DIR / f"{self.root.name}.sqlite"
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._by_id: Optional[Dict[str, IndexEntry]] = None
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the directory tree
+
+        Returns:
+            Counts of listed directories and added/updated/removed files
+        """
+        with self._lock:
+            stats = {'dirsListed': 0, 'added': 0, 'updated': 0, 'removed': 0}
+            if not self.root.exists():
+                self._by_id = {}
+                return stats
+
+            conn = self._connect()
+            known_dirs = dict(conn.execute('SELECT path, mtime_ns FROM dirs'))
+            children: Dict[str, List[str]] = {}
+            for rel_dir in known_dirs:
+                if rel_dir:
+                    children.setdefault(_parent(rel_dir), []).append(rel_dir)
+            seen_dirs = set()
+            racy_before = time.time_ns() - int(RACY_SECONDS * 1e9)
+
+            with conn:
+                pending = ['']
+                while pending:
+                    rel_dir = pending.pop()
+                    abs_dir = self.root / rel_dir
+                    try:
+                        dir_mtime = abs_dir.stat().st_mtime_ns
+                    except OSError:
+                        continue
+                    seen_dirs.add(rel_dir)
+
+                    if known_dirs.get(rel_dir) == dir_mtime:
+                        # Entries unchanged, but files may have been rewritten in place
+                        self._restat_dir(conn, rel_dir, stats)
+                        pending.extend(children.get(rel_dir, []))
+                        continue
+
+                    stats['dirsListed'] += 1
+                    subdirs = self._scan_dir(conn, rel_dir, abs_dir, stats)
+                    pending.extend(subdirs)
+                    stored_mtime = dir_mtime if dir_mtime < racy_before else -1
+                    conn.execute('INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)',
+                                 (rel_dir, stored_mtime))
+
+                for rel_dir in set(known_dirs) - seen_dirs:
+                    conn.execute('DELETE FROM dirs WHERE path = ?', (rel_dir,))
+                    removed = conn.execute(
+                        "DELETE FROM files WHERE path LIKE ? ESCAPE '\\' AND path NOT LIKE ? ESCAPE '\\'",
+                        (_like_prefix(rel_dir) + '/%', _like_prefix(rel_dir) + '/%/%')
+                    ).rowcount
+                    stats['removed'] += removed
+
+            self._load()
+            return stats
+
+    def get(self, card_id: str) -> Optional[IndexEntry]:
+        """Indexed file for a card (refreshes the index on first use)"""
+        return self._entries().get(card_id)
+
+    def entries(self) -> List[IndexEntry]:
+        """All indexed files that map to a card ID (one per card, flat files first)"""
+        return list(self._entries().values())
+
+    def _entries(self) -> Dict[str, IndexEntry]:
+        if self._by_id is None:
+            with self._lock:
+                if self._by_id is None:
+                    self.refresh()
+        return self._by_id
+
+    def is_current(self, entry: IndexEntry) -> bool:
+        """True if the file still has the indexed mtime and size"""
+        try:
+            st = entry.path.stat()
+        except OSError:
+            return False
+        return st.st_mtime_ns == entry.mtime_ns and st.st_size == entry.size
+
+    def update_path(self, path: Path) -> Optional[IndexEntry]:
+        """Re-index a single file after it was written"""
+        path = Path(path)
+        with self._lock:
+            conn = self._connect()
+            try:
+                rel = path.relative_to(self.root).as_posix()
+            except ValueError:
+                return None
+            with conn:
+                entry = self._index_file(conn, rel, path)
+            if entry is not None and self._by_id is not None:
+                self._set_entry(entry)
+            return entry
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _scan_dir(self, conn: sqlite3.Connection, rel_dir: str, abs_dir: Path, stats: Dict[str, int]) -> List[str]:
+        """Diff one directory listing against the index; returns subdirectories"""
+        prefix = f"{rel_dir}/" if rel_dir else ''
+        known = self._known_files(conn, prefix)
+
+        subdirs = []
+        present = set()
+        with os.scandir(abs_dir) as it:
+            for item in it:
+                if item.is_dir(follow_symlinks=False):
+                    subdirs.append(prefix + item.name)
+                    continue
+                if not item.name.endswith('.html'):
+                    continue
+                rel = prefix + item.name
+                present.add(rel)
+                st = item.stat()
+                if known.get(rel) == (st.st_mtime_ns, st.st_size):
+                    continue
+                stats['updated' if rel in known else 'added'] += 1
+                self._index_file(conn, rel, Path(item.path), st)
+
+        for rel in set(known) - present:
+            conn.execute('DELETE FROM files WHERE path = ?', (rel,))
+            stats['removed'] += 1
+        return subdirs
+
+    def _restat_dir(self, conn: sqlite3.Connection, rel_dir: str, stats: Dict[str, int]) -> None:
+        """Re-read the known files of an unlisted directory whose mtime or size changed"""
+        prefix = f"{rel_dir}/" if rel_dir else ''
+        for rel, known in self._known_files(conn, prefix).items():
+            path = self.root / rel
+            try:
+                st = path.stat()
+            except OSError:
+                conn.execute('DELETE FROM files WHERE path = ?', (rel,))
+                stats['removed'] += 1
+                continue
+            if known != (st.st_mtime_ns, st.st_size):
+                stats['updated'] += 1
+                self._index_file(conn, rel, path, st)
+
+    @staticmethod
+    def _known_files(conn: sqlite3.Connection, prefix: str) -> Dict[str, Tuple[int, int]]:
+        """Indexed (mtime_ns, size) of the files directly under a directory prefix"""
+        return {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in conn.execute(
+                "SELECT path, mtime_ns, size FROM files WHERE path LIKE ? ESCAPE '\\' AND path NOT LIKE ? ESCAPE '\\'",
+                (_like_prefix(prefix) + '%', _like_prefix(prefix) + '%/%')
+            )
+        }
+
+    def _index_file(self, conn: sqlite3.Connection, rel: str, path: Path, st: os.stat_result = None) -> Optional[IndexEntry]:
+        """Read a file's header and store its card ID and language"""
+        try:
+            st = st or path.stat()
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                sample = f.read(SNIFF_BYTES)
+        except OSError:
+            conn.execute('DELETE FROM files WHERE path = ?', (rel,))
+            return None
+
+        # Filename first, then the card URL near the top of the page
+        match = re.match(r'^(\d+)', path.name) or re.search(r'/detail/(\d+)/', sample[:2048])
+        card_id = match.group(1) if match else None
+        language = detect_language(sample)
+        conn.execute(
+            'INSERT OR REPLACE INTO files (path, card_id, mtime_ns, size, language) VALUES (?, ?, ?, ?, ?)',
+            (rel, card_id, st.st_mtime_ns, st.st_size, language)
+        )
+        if card_id is None:
+            return None
+        return IndexEntry(card_id, path, _folder(rel), st.st_mtime_ns, st.st_size, language)
+
+    def _load(self) -> None:
+        by_id = {}
+        rows = self._connect().execute(
+            'SELECT card_id, path, mtime_ns, size, language FROM files WHERE card_id IS NOT NULL ORDER BY path'
+        )
+        for card_id, rel, mtime_ns, size, language in rows:
+            entry = IndexEntry(card_id, self.root / rel, _folder(rel), mtime_ns, size, language)
+            current = by_id.get(card_id)
+            if current is None or (current.folder is not None and entry.folder is None):
+                by_id[card_id] = entry
+        self._by_id = by_id
+
+    def _set_entry(self, entry: IndexEntry) -> None:
+        # Flat files win over expansion-folder copies of the same card
+        current = self._by_id.get(entry.card_id)
+        if current is not None and current.folder is None and entry.folder is not None:
+            return
+        self._by_id[entry.card_id] = entry
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.index_path), timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+
+def _folder(rel_path: str) -> Optional[str]:
+    return rel_path.split('/', 1)[0] if '/' in rel_path else None
+
+
+def _parent(rel_path: str) -> str:
+    return rel_path.rsplit('/', 1)[0] if '/' in rel_path else ''
+
+
+def _like_prefix(prefix: str) -> str:
+    """Escape LIKE wildcards in a path prefix"""
+    return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Sharded HTML Cache for PTCG_2026 scrapers
+Packs cached card pages into compressed shard files with a SQLite offset index
+
+Features:
+- Each page is one zstd frame appended to data/html/{region}/shards/NNNNN.shard
+- Content-addressed: identical page bodies (sha256) are stored once
+- Random access by card ID (index lookup → seek → decompress one frame)
+- Optional zstd dictionary trained on the cache for much better ratios
+- compact() drops bodies no page points to any more (left behind by
+  refreshes and rewrites) and rewrites shards that are mostly garbage
+- Same interface as HtmlCache, so scrapers switch backends transparently
+
+Falls back to zlib when the `zstandard` package is not installed.
+"""
+
+import hashlib
+import importlib.util
+import json
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+import logging
+
+from html_cache import HtmlCache
+
+logger = logging.getLogger(__name__)
+
+# Check for zstandard
+_HAS_ZSTD = importlib.util.find_spec('zstandard') is not None
+if _HAS_ZSTD:
+    import zstandard
+
+SHARD_DIR = 'shards'
+INDEX_NAME = 'index.sqlite'
+MAX_SHARD_BYTES = 256 * 1024 * 1024
+ZSTD_LEVEL = 10
+DICT_SIZE = 112640
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dictionaries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    shard_id INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    codec TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    card_id TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    meta TEXT,
+    folder TEXT
+);
+"""
+
+
+def has_shard_index(root: Path) -> bool:
+    """True if a cache directory has been migrated to shards"""
+    return (Path(root) / SHARD_DIR / INDEX_NAME).exists()
+
+
+def train_dictionary(samples: List[bytes], dict_size: int = DICT_SIZE) -> Optional[bytes]:
+    """Train a zstd dictionary on sample pages (None without zstandard)"""
+    if not _HAS_ZSTD:
+        logger.warning("zstandard not installed, skipping dictionary training")
+        return None
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
+
+
+class ShardHtmlCache(HtmlCache):
+    """Content-addressed, compressed shard store with the HtmlCache interface"""
+
+    def __init__(self, root: Path, max_shard_bytes: int = MAX_SHARD_BYTES):
+        """
+        Initialize store
+
+        Args:
+            root: Cache directory (e.g. data/html/japan); shards live in root/shards
+            max_shard_bytes: Size after which a new shard file is started
+        """
+        super().__init__(root)
+        self.shard_dir = self.root / SHARD_DIR
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.max_shard_bytes = max_shard_bytes
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._writer_shard_id = None
+        self._dictionaries: Dict[int, Any] = {}
+        self._active_dict_id: Optional[int] = None
+
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        row = conn.execute('SELECT MAX(id) FROM dictionaries').fetchone()
+        self._active_dict_id = row[0] if row and _HAS_ZSTD else None
+
+    # ------------------------------------------------------------------
+    # HtmlCache interface
+    # ------------------------------------------------------------------
+
+    def locate(self, card_id: str) -> Optional[Path]:
+        """Pages live inside shard files, so there is no per-card path"""
+        return None
+
+    def contains(self, card_id: str) -> bool:
+        row = self._conn().execute('SELECT 1 FROM pages WHERE card_id = ?', (card_id,)).fetchone()
+        return row is not None
+
+    def card_ids(self) -> List[str]:
+        return [row[0] for row in self._conn().execute('SELECT card_id FROM pages')]
+
+    def page_hashes(self) -> Dict[str, str]:
+        """Card ID → content hash of the stored page, for every page"""
+        return dict(self._conn().execute('SELECT card_id, sha256 FROM pages'))
+
+    def read(self, card_id: str) -> Optional[str]:
+        data = self.read_bytes(card_id)
+        return data.decode('utf-8') if data is not None else None
+
+    def read_bytes(self, card_id: str) -> Optional[bytes]:
+        """Raw page bytes for a card (None on cache miss)"""
+        row = self._conn().execute(
+            'SELECT s.name, b.offset, b.length, b.codec FROM pages p '
+            'JOIN blobs b ON b.sha256 = p.sha256 JOIN shards s ON s.id = b.shard_id '
+            'WHERE p.card_id = ?', (card_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        name, offset, length, codec = row
+        with open(self.shard_dir / name, 'rb') as f:
+            f.seek(offset)
+            frame = f.read(length)
+        return self._decompress(frame, codec)
+
+    def read_meta(self, card_id: str) -> Dict[str, Any]:
+        row = self._conn().execute('SELECT meta FROM pages WHERE card_id = ?', (card_id,)).fetchone()
+        if not row or not row[0]:
+            return {}
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return {}
+
+    def revalidated(self, card_id: str, response_headers: Mapping[str, str]) -> Optional[str]:
+        if not self.contains(card_id):
+            return None
+        meta = self.read_meta(card_id)
+        meta.update(self._validators(response_headers))
+        meta['checkedAt'] = datetime.now().isoformat()
+        self._update_meta(card_id, meta)
+        return self.read(card_id)
+
+    def store(self, card_id: str, html_text: str, response_headers: Mapping[str, str], url: str = None) -> bool:
+        meta = self.read_meta(card_id)
+        data = html_text.encode('utf-8')
+        body_hash = hashlib.sha256(data).hexdigest()
+        changed = self.source_hash(meta) != body_hash or not self.contains(card_id)
+
+        now = datetime.now().isoformat()
+        meta.update({
+            'url': url or meta.get('url'),
+            'checkedAt': now
+        })
+        if changed:
+            meta['fetchedAt'] = now
+            data = self._stored_body(html_text, url, meta).encode('utf-8')
+        meta.pop('etag', None)
+        meta.pop('lastModified', None)
+        meta.update(self._validators(response_headers))
+        if changed:
+            self.put_page(card_id, data, meta)
+        else:
+            self._update_meta(card_id, meta)
+        return changed
+
+    def rewrite(self, card_id: str, html_text: str, meta_updates: Optional[Dict[str, Any]] = None) -> bool:
+        if not self.contains(card_id):
+            return False
+        meta = self.read_meta(card_id)
+        meta.update(meta_updates or {})
+        self.put_page(card_id, html_text.encode('utf-8'), meta)
+        return True
+
+    # ------------------------------------------------------------------
+    # Shard store
+    # ------------------------------------------------------------------
+
+    def put_page(self, card_id: str, data: bytes, meta: Optional[Dict[str, Any]] = None, folder: str = None) -> str:
+        """
+        Store a page body (deduplicated by hash) and point the card ID at it
+
+        Returns:
+            sha256 of the body
+        """
+        body_hash = self._put_blob(data)
+        meta = dict(meta or {})
+        meta['sha256'] = body_hash
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO pages (card_id, sha256, meta, folder) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(card_id) DO UPDATE SET sha256 = excluded.sha256, meta = excluded.meta, '
+                'folder = COALESCE(excluded.folder, pages.folder)',
+                (card_id, body_hash, json.dumps(meta, ensure_ascii=False), folder)
+            )
+        return body_hash
+
+    def _update_meta(self, card_id: str, meta: Dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute('UPDATE pages SET meta = ? WHERE card_id = ?',
+                         (json.dumps(meta, ensure_ascii=False), card_id))
+
+    def set_dictionary(self, dictionary: bytes) -> Optional[int]:
+        """Register a trained zstd dictionary for all subsequent writes"""
+        if not _HAS_ZSTD:
+            logger.warning("zstandard not installed, ignoring compression dictionary")
+            return None
+        with self._connect() as conn:
+            cursor = conn.execute('INSERT INTO dictionaries (data) VALUES (?)', (dictionary,))
+            self._active_dict_id = cursor.lastrowid
+        return self._active_dict_id
+
+    def stats(self) -> Dict[str, int]:
+        """Page, unique body and byte counts"""
+        conn = self._conn()
+        pages = conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        blobs, raw, stored = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length), 0) FROM blobs'
+        ).fetchone()
+        return {'pages': pages, 'uniqueBodies': blobs, 'rawBytes': raw, 'storedBytes': stored}
+
+    def compact(self, min_garbage: float = 0.25) -> Dict[str, int]:
+        """
+        Reclaim the space of superseded page bodies
+
+        Bodies no page points to are dropped from the index; shards with no live
+        body are deleted, and shards where at least `min_garbage` of the file is
+        dead are rewritten (frames are copied as stored, never recompressed).
+        Run while no other process writes to the cache.
+
+        Returns:
+            Counts of dropped bodies, rewritten and deleted shards, and bytes freed
+        """
+        stats = {'orphans': 0, 'shardsRewritten': 0, 'shardsDeleted': 0, 'bytesFreed': 0}
+        with self._write_lock:
+            with self._connect() as conn:
+                stats['orphans'] = conn.execute(
+                    'DELETE FROM blobs WHERE sha256 NOT IN (SELECT sha256 FROM pages)'
+                ).rowcount
+            # Compacted frames go to a fresh shard, so the current one can be compacted too
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+            conn = self._conn()
+            live = {
+                shard_id: live_bytes
+                for shard_id, live_bytes in conn.execute('SELECT shard_id, SUM(length) FROM blobs GROUP BY shard_id')
+            }
+            for shard_id, name in conn.execute('SELECT id, name FROM shards').fetchall():
+                path = self.shard_dir / name
+                size = path.stat().st_size if path.exists() else 0
+                live_bytes = live.get(shard_id, 0)
+                if live_bytes and size - live_bytes < min_garbage * size:
+                    continue
+
+                moves = []
+                if live_bytes:
+                    with open(path, 'rb') as src:
+                        for body_hash, offset, length in conn.execute(
+                                'SELECT sha256, offset, length FROM blobs WHERE shard_id = ? ORDER BY offset', (shard_id,)
+                        ).fetchall():
+                            src.seek(offset)
+                            frame = src.read(length)
+                            writer, new_shard_id = self._shard_writer(length)
+                            moves.append((new_shard_id, writer.tell(), body_hash))
+                            writer.write(frame)
+                    self._writer.flush()
+                with self._connect() as conn:
+                    conn.executemany('UPDATE blobs SET shard_id = ?, offset = ? WHERE sha256 = ?', moves)
+                    conn.execute('DELETE FROM shards WHERE id = ?', (shard_id,))
+                if path.exists():
+                    path.unlink()
+                stats['shardsRewritten' if moves else 'shardsDeleted'] += 1
+                stats['bytesFreed'] += size - live_bytes
+        return stats
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group many writes from the current thread into one transaction"""
+        conn = self._conn()
+        conn.execute('BEGIN')
+        self._local.in_batch = True
+        try:
+            yield
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            self._local.in_batch = False
+
+    def close(self) -> None:
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _put_blob(self, data: bytes) -> str:
+        body_hash = hashlib.sha256(data).hexdigest()
+        with self._write_lock:
+            row = self._conn().execute('SELECT 1 FROM blobs WHERE sha256 = ?', (body_hash,)).fetchone()
+            if row is not None:
+                return body_hash
+
+            frame, codec = self._compress(data)
+            writer, shard_id = self._shard_writer(len(frame))
+            offset = writer.tell()
+            writer.write(frame)
+            writer.flush()
+
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR IGNORE INTO blobs (sha256, shard_id, offset, length, size, codec) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (body_hash, shard_id, offset, len(frame), len(data), codec)
+                )
+        return body_hash
+
+    def _shard_writer(self, incoming: int):
+        """Current shard file of this process, rotated when it grows too large"""
+        if self._writer is not None and self._writer.tell() + incoming > self.max_shard_bytes:
+            self._writer.close()
+            self._writer = None
+
+        if self._writer is None:
+            # Every writer owns a fresh shard, so processes never append to the same file
+            with self._connect() as conn:
+                cursor = conn.execute("INSERT INTO shards (name) VALUES ('')")
+                shard_id = cursor.lastrowid
+                name = f"{shard_id:05d}.shard"
+                conn.execute('UPDATE shards SET name = ? WHERE id = ?', (name, shard_id))
+            self._writer = open(self.shard_dir / name, 'ab')
+            self._writer_shard_id = shard_id
+
+        return self._writer, self._writer_shard_id
+
+    def _compress(self, data: bytes):
+        if not _HAS_ZSTD:
+            return zlib.compress(data, 9), 'zlib'
+        if self._active_dict_id is not None:
+            compressor = self._thread_codec('zc', self._active_dict_id)
+            return compressor.compress(data), f"zstd-dict:{self._active_dict_id}"
+        return self._thread_codec('zc', None).compress(data), 'zstd'
+
+    def _decompress(self, frame: bytes, codec: str) -> bytes:
+        if codec == 'zlib':
+            return zlib.decompress(frame)
+        if not _HAS_ZSTD:
+            raise RuntimeError(f"zstandard is required to read {codec} shards")
+        dict_id = int(codec.split(':', 1)[1]) if codec.startswith('zstd-dict:') else None
+        return self._thread_codec('zd', dict_id).decompress(frame)
+
+    def _thread_codec(self, kind: str, dict_id: Optional[int]):
+        """Per-thread zstd (de)compressor (the objects are not thread-safe)"""
+        cache = getattr(self._local, 'codecs', None)
+        if cache is None:
+            cache = self._local.codecs = {}
+        key = (kind, dict_id)
+        codec = cache.get(key)
+        if codec is None:
+            dict_data = self._dictionary(dict_id) if dict_id is not None else None
+            if kind == 'zc':
+                codec = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data, write_content_size=True)
+            else:
+                codec = zstandard.ZstdDecompressor(dict_data=dict_data)
+            cache[key] = codec
+        return codec
+
+    def _dictionary(self, dict_id: int):
+        dictionary = self._dictionaries.get(dict_id)
+        if dictionary is None:
+            row = self._conn().execute('SELECT data FROM dictionaries WHERE id = ?', (dict_id,)).fetchone()
+            dictionary = self._dictionaries[dict_id] = zstandard.ZstdCompressionDict(row[0])
+        return dictionary
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread SQLite connection (autocommit, WAL)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.shard_dir / INDEX_NAME), timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection for a write; wrapped in its own transaction unless inside batch()"""
+        conn = self._conn()
+        if getattr(self._local, 'in_batch', False):
+            yield conn
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Card Fragment Trimming for the PTCG_2026 HTML cache
+Cuts cached card pages down to the card detail markup the extractors read,
+dropping the site header, navigation, scripts and footer
+
+Features:
+- The fragment is the smallest element holding every element a region's
+  extractor looks up (FRAGMENT_ANCHORS), kept verbatim, plus the title,
+  charset and canonical link from <head>
+- Trimmed pages carry a <meta name="ptcg-fragment"> marker and are never
+  trimmed twice
+- Each fragment is checked by extracting the card from both the full page
+  and the fragment; pages whose records differ, or whose fragment is not
+  smaller than the page, are kept whole
+- Opt-in on store (--trim-cache) and as a bulk upgrade of existing caches
+  (trim_html_cache.py), flat files and shards alike; shard stores are
+  compacted after an upgrade, so the full pages' space is reclaimed
+
+Sample usage:
+    python scrapers/src/japanese_card_scraper.py --id-range 40000 2000 --cache-html --trim-cache
+    python scrapers/trim_html_cache.py --region japan
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from html_shards import ShardHtmlCache
+from parser_backend import parse_html
+
+logger = logging.getLogger(__name__)
+
+# Bump when the fragment layout changes
+FRAGMENT_VERSION = '1'
+
+FRAGMENT_MARKER = 'ptcg-fragment'
+
+# Elements the extractors look up, keyed by region directory name; the fragment
+# is their smallest common ancestor. Container classes matched through
+# find_parent (JP div.card / div.RightBox / div.TopInfo) are listed so they stay
+FRAGMENT_ANCHORS: Dict[str, List[str]] = {
+    'japan': [
+        'h1', 'h2', 'h4', 'h5', 'table', 'span.type', 'div.subtext', 'div.card', 'div.RightBox', 'div.TopInfo',
+        'img[src*="/card_images/large/"]', 'img[src*="/rarity/"]', 'img.img-regulation', 'a[href^="/ex/"]',
+    ],
+    'hongkong': [
+        'h1', 'h2', 'table', 'p.mainInfomation', 'div.skillInformation', 'div.subtext', 'div.evolution',
+        'div.extraInformation', 'section.expansionColumn', 'span.expansionSymbol', 'span.rarity', 'span.alpha',
+        'span.regulationMark', 'img[src*="/card-img/"]', 'img[src*="/rarity/"]', 'img.img-regulation',
+        'a[href*="expansionCodes="]',
+    ],
+}
+FRAGMENT_ANCHORS['english'] = FRAGMENT_ANCHORS['hongkong']
+
+# Head tags kept in a fragment
+HEAD_SELECTORS = ['meta[charset]', 'title', 'link[rel="canonical"]']
+
+# Record fields that differ between two extractions of the same page
+VOLATILE_FIELDS = ('scrapedAt',)
+
+
+def is_fragment(html_text: str) -> bool:
+    """Whether a page was already trimmed"""
+    return f'name="{FRAGMENT_MARKER}"' in html_text[:512]
+
+
+def _common_ancestor(tags: List[Any]) -> Any:
+    paths = [list(reversed([tag, *tag.parents])) for tag in tags]
+    common = None
+    for nodes in zip(*paths):
+        if any(node is not nodes[0] for node in nodes):
+            break
+        common = nodes[0]
+    return common
+
+
+def trim_card_html(html_text: str, region: str) -> Optional[str]:
+    """
+    Card detail fragment of a page
+
+    Args:
+        html_text: Full card page
+        region: Region directory name (japan, hongkong, english)
+
+    Returns:
+        Fragment page, or None when the page holds no card heading or is already trimmed
+    """
+    if is_fragment(html_text):
+        return None
+    soup = parse_html(html_text, 'bs4')
+    if soup.find('h1') is None:
+        return None
+
+    anchors = [tag for tag in (soup.select_one(selector) for selector in FRAGMENT_ANCHORS[region]) if tag is not None]
+    container = _common_ancestor(anchors)
+    if container is None or container.name in ('[document]', 'html'):
+        container = soup.body or container
+
+    head = ''.join(str(tag) for selector in HEAD_SELECTORS for tag in soup.select(f'head > {selector}'))
+    body = str(container) if container.name == 'body' else f'<body>{container}</body>'
+    return (f'<!DOCTYPE html>\n<html><head><meta name="{FRAGMENT_MARKER}" content="{FRAGMENT_VERSION}">'
+            f'{head}</head>{body}</html>\n')
+
+
+class CardFragmentTrimmer:
+    """HtmlCache trim hook: a page's card fragment, checked against the full page"""
+
+    def __init__(self, scraper: Any, verify: bool = True):
+        """
+        Args:
+            scraper: JapaneseCardScraper, HkCardScraper or EnglishCardScraper
+            verify: Keep pages whole unless the fragment extracts to the same record
+        """
+        self.scraper = scraper
+        self.region = scraper.cards_dir.name
+        self.verify = verify
+        self.trimmed = 0
+        self.kept = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, html_text: str, card_url: Optional[str] = None) -> Optional[str]:
+        """Fragment to store instead of the page, or None to store the page as is"""
+        fragment = trim_card_html(html_text, self.region)
+        if fragment is not None and len(fragment.encode('utf-8')) >= len(html_text.encode('utf-8')):
+            fragment = None
+        if fragment is not None and self.verify and not self._same_record(html_text, fragment, card_url or ''):
+            logger.debug(f"Fragment of {card_url} extracts differently, keeping the full page")
+            fragment = None
+
+        with self._lock:
+            if fragment is None:
+                self.kept += 1
+            else:
+                self.trimmed += 1
+                self.bytes_before += len(html_text.encode('utf-8'))
+                self.bytes_after += len(fragment.encode('utf-8'))
+        return fragment
+
+    def _extract(self, html_text: str, card_url: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = self.scraper._extract_card_info(parse_html(html_text, self.scraper.parser_backend), card_url)
+        except Exception:
+            return None
+        if data:
+            for field in VOLATILE_FIELDS:
+                data.pop(field, None)
+        return data
+
+    def _same_record(self, html_text: str, fragment: str, card_url: str) -> bool:
+        full = self._extract(html_text, card_url)
+        return full is not None and full == self._extract(fragment, card_url)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'trimmed': self.trimmed, 'kept': self.kept,
+                    'bytesBefore': self.bytes_before, 'bytesAfter': self.bytes_after}
+
+
+def upgrade_cache(
+    scraper: Any,
+    build_card_url: Callable[[int], str],
+    verify: bool = True,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Trim every page already in a scraper's HTML cache
+
+    Args:
+        scraper: Scraper instance (its cache, index and extractors are used)
+        build_card_url: Region-specific card ID → URL builder (pages without a recorded URL)
+        verify: Only trim pages whose fragment extracts to the same record
+        dry_run: Count the savings without rewriting anything
+
+    Returns:
+        Trimmer statistics plus pages skipped as already trimmed (and, for
+        shard stores, the compaction counts)
+    """
+    cache = scraper.html_cache
+    trimmer = CardFragmentTrimmer(scraper, verify)
+    card_ids = set(cache.card_ids())
+    html_index = getattr(scraper, 'html_index', None)
+    if html_index is not None:
+        # Expansion-folder pages are only known to the index
+        html_index.refresh()
+        card_ids.update(entry.card_id for entry in html_index.entries())
+
+    skipped = 0
+    for count, card_id in enumerate(sorted(card_ids, key=lambda x: int(x) if x.isdigit() else 0), 1):
+        html_text = cache.read(card_id)
+        if html_text is None or is_fragment(html_text):
+            skipped += 1
+            continue
+        card_url = cache.read_meta(card_id).get('url') or build_card_url(int(card_id))
+        fragment = trimmer(html_text, card_url)
+        if fragment is not None and not dry_run:
+            cache.rewrite(card_id, fragment, {
+                'fragment': FRAGMENT_VERSION,
+                'sourceSha256': hashlib.sha256(html_text.encode('utf-8')).hexdigest()
+            })
+        if count % 1000 == 0:
+            logger.info(f"Trimmed {trimmer.trimmed} of {count} pages...")
+
+    stats = trimmer.stats()
+    stats['skipped'] = skipped
+    if isinstance(cache, ShardHtmlCache) and trimmer.trimmed and not dry_run:
+        # Rewrites leave the full pages in the shards until they are compacted
+        stats.update(cache.compact())
+    return stats
+
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Card ID Discovery for PTCG_2026 scrapers
+Finds the dense intervals of a region's card ID space before a full scrape,
+instead of walking every ID of an --id-range
+
+Features:
+- Galloping search through gaps (steps 1, 2, 4 ... up to max_step) and
+  through clusters, with binary search for each cluster's first and last ID;
+  the IDs next to each edge are probed one by one, and the search looks past
+  a hole below a cluster's first ID, so holes do not cut clusters short
+- Cheap existence probes: the HTML cache and negative cache are consulted
+  first, otherwise a ranged GET reads only the start of the page and stops
+  once the card name heading is seen (HEAD cannot tell an empty card page
+  from a real one; both answer 200)
+- Clusters closer than max_step are merged; intervals are padded by a few IDs
+  to absorb holes at their edges
+- The map is saved to data/ids/{region}.json; later runs can scrape the saved
+  intervals (--id-map) without probing again
+
+Sample usage:
+    python scrapers/src/japanese_card_scraper.py --id-range 40000 20000 --discover --cache-html
+    python scrapers/src/japanese_card_scraper.py --id-map --cache-html
+"""
+
+import json
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+import requests
+
+from retry_policy import request_with_retry
+
+logger = logging.getLogger(__name__)
+
+IDS_DIR = 'ids'
+
+# Largest jump between probes; also the widest gap merged into one interval.
+# Clusters shorter than this can fall between two probes and be missed
+DEFAULT_MAX_STEP = 32
+
+# IDs added on each side of a discovered interval
+INTERVAL_PADDING = 4
+
+# Bytes of a page read by a probe before giving up on finding the card name
+PROBE_BYTES = 65536
+
+# All three scrapers take the card name from the page's first h1
+CARD_NAME_PATTERN = re.compile(r'<h1\b[^>]*>(.*?)</h1>', re.S | re.I)
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# IDs next to a cluster edge probed one by one, so a short run of holes is
+# not taken for the edge
+EDGE_PROBES = 2 * INTERVAL_PADDING
+
+Interval = Tuple[int, int]
+
+_thread_local = threading.local()
+
+
+def has_card_name(html_text: str) -> bool:
+    """Whether a page (or the start of one) has a non-empty card name heading"""
+    match = CARD_NAME_PATTERN.search(html_text)
+    return bool(match and _TAG_PATTERN.sub('', match.group(1)).strip())
+
+
+def probe_card(scraper: Any, card_url: str, cache_only: bool = False) -> bool:
+    """
+    Check whether a card URL holds a card, reading as little as possible
+
+    Args:
+        scraper: JapaneseCardScraper, HkCardScraper or EnglishCardScraper
+        card_url: Card detail URL
+        cache_only: Only look at the HTML cache
+    """
+    card_id = scraper._extract_card_id_from_url(card_url)
+    if card_id:
+        html_text = scraper.html_cache.read(card_id)
+        if html_text is not None:
+            return has_card_name(html_text)
+        if scraper.negative_cache is not None and scraper.negative_cache.is_empty(int(card_id)):
+            return False
+    if cache_only:
+        return False
+
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = scraper.user_agent
+        _thread_local.session = session
+
+    try:
+        response = request_with_retry(
+            lambda: session.get(card_url, headers={'Range': f"bytes=0-{PROBE_BYTES - 1}"}, stream=True, timeout=10),
+            card_url, scraper.rate_limiter, scraper.retry_policy
+        )
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code in (404, 410):
+            return False
+        raise
+
+    # Servers that ignore Range send the whole page; stop reading early either way
+    with response:
+        head = b''
+        for chunk in response.iter_content(8192):
+            head += chunk
+            if has_card_name(head.decode(response.encoding or 'utf-8', errors='ignore')):
+                return True
+            if len(head) >= PROBE_BYTES:
+                break
+    return False
+
+
+def _edge_steps(max_step: int) -> Iterator[int]:
+    """Offsets from a cluster edge: 1 to EDGE_PROBES one by one, then doubling up to max_step"""
+    yield from range(1, min(EDGE_PROBES, max_step) + 1)
+    step = EDGE_PROBES * 2
+    while step < max_step:
+        yield step
+        step *= 2
+    if max_step > EDGE_PROBES:
+        yield max_step
+
+
+def discover_intervals(
+    exists: Callable[[int], bool],
+    start: int,
+    end: int,
+    max_step: int = DEFAULT_MAX_STEP
+) -> List[Interval]:
+    """
+    Find the intervals of existing IDs in [start, end)
+
+    Args:
+        exists: Probe for one ID
+        start: First ID of the range
+        end: End of the range (exclusive)
+        max_step: Largest jump between probes; clusters closer than this are merged,
+            clusters shorter than this can be missed
+
+    Returns:
+        Sorted, non-overlapping (first, last) ID pairs
+    """
+    known: Dict[int, bool] = {}
+
+    def probe(card_id: int) -> bool:
+        if card_id not in known:
+            known[card_id] = exists(card_id)
+        return known[card_id]
+
+    intervals: List[Interval] = []
+    pos = start
+    while pos < end:
+        # Gallop through the gap until an ID exists, probing the IDs right
+        # after the previous interval one by one
+        gap, last_miss, hit = pos, pos - 1, None
+        offsets = _edge_steps(max_step)
+        while pos < end:
+            if probe(pos):
+                hit = pos
+                break
+            last_miss = pos
+            offset = next(offsets, None)
+            pos = gap + offset if offset is not None else pos + max_step
+            if pos >= end > last_miss + 1:
+                pos = end - 1  # Cards at the very end of the range
+        if hit is None:
+            break
+
+        # First existing ID in (last_miss, hit]. A gallop probe can land on a
+        # hole inside the cluster, and a hole can stop the binary search early,
+        # so look up to max_step below the result (down to the previous
+        # interval) and search again below any ID found there
+        top, floor = hit, intervals[-1][1] if intervals else start - 1
+        low, high = last_miss, hit
+        while True:
+            while high - low > 1:
+                mid = (low + high) // 2
+                if probe(mid):
+                    high = mid
+                else:
+                    low = mid
+            first, below = high, None
+            for step in _edge_steps(max_step):
+                if first - step <= floor:
+                    break
+                if probe(first - step):
+                    below = first - step
+                    break
+            if below is None:
+                break
+            low, high = max(floor, below - max_step), below
+
+        # Gallop through the cluster while IDs exist
+        last_hit, step = top, 1
+        while last_hit + step < end and probe(last_hit + step):
+            last_hit += step
+            step = min(step * 2, max_step)
+
+        # Last existing ID in [last_hit, next miss)
+        low, high = last_hit, min(last_hit + step, end)
+        while high - low > 1:
+            mid = (low + high) // 2
+            if probe(mid):
+                low = mid
+            else:
+                high = mid
+        last = low
+
+        if intervals and first - intervals[-1][1] <= max_step:
+            intervals[-1] = (intervals[-1][0], last)
+        else:
+            intervals.append((first, last))
+        pos = last + 1
+
+    logger.info(f"Discovery probed {len(known)} of {end - start} IDs, found {len(intervals)} intervals")
+    return intervals
+
+
+def pad_intervals(intervals: List[Interval], start: int, end: int, padding: int = INTERVAL_PADDING) -> List[Interval]:
+    """Widen intervals by `padding` IDs on each side (within [start, end)), merging overlaps"""
+    padded: List[Interval] = []
+    for first, last in intervals:
+        first, last = max(start, first - padding), min(end - 1, last + padding)
+        if padded and first <= padded[-1][1] + 1:
+            padded[-1] = (padded[-1][0], max(padded[-1][1], last))
+        else:
+            padded.append((first, last))
+    return padded
+
+
+def iter_interval_ids(intervals: List[Interval]) -> Iterator[int]:
+    for first, last in intervals:
+        yield from range(first, last + 1)
+
+
+def id_map_path(data_root: Path, region: str) -> Path:
+    return Path(data_root) / IDS_DIR / f"{region}.json"
+
+
+def load_id_map(data_root: Path, region: str) -> Dict[str, Any]:
+    """Saved discovery map for a region (empty map if none yet)"""
+    path = id_map_path(data_root, region)
+    if not path.exists():
+        return {'region': region, 'scanned': [], 'intervals': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _clip_outside(intervals: List[Interval], start: int, end: int) -> List[Interval]:
+    """Parts of intervals outside [start, end)"""
+    clipped = []
+    for first, last in intervals:
+        if first < start:
+            clipped.append((first, min(last, start - 1)))
+        if last >= end:
+            clipped.append((max(first, end), last))
+    return clipped
+
+
+def save_id_map(data_root: Path, region: str, start: int, end: int, intervals: List[Interval]) -> Path:
+    """Replace the saved intervals inside [start, end) with a new discovery result"""
+    id_map = load_id_map(data_root, region)
+    kept = _clip_outside(id_map['intervals'], start, end)
+    scanned = _clip_outside(id_map['scanned'], start, end)
+
+    id_map['intervals'] = sorted(kept + [tuple(interval) for interval in intervals])
+    id_map['scanned'] = sorted(scanned + [(start, end - 1)])
+    id_map['discoveredAt'] = datetime.now().isoformat()
+
+    path = id_map_path(data_root, region)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(id_map, f, indent=2)
+    return path
+
+
+def discover_card_ids(
+    scraper: Any,
+    build_card_url: Callable[[int], str],
+    start: int,
+    count: int,
+    max_step: int = DEFAULT_MAX_STEP,
+    cache_only: bool = False
+) -> List[int]:
+    """
+    Discover the dense intervals of an ID range, save them and return their IDs
+
+    Args:
+        scraper: Scraper instance (its cache, negative cache and rate limiter are used)
+        build_card_url: Region-specific card ID → URL builder
+        start: First ID of the range
+        count: Number of IDs in the range
+        max_step: Largest jump between probes
+        cache_only: Probe the HTML cache only
+    """
+    end = start + count
+
+    def exists(card_id: int) -> bool:
+        try:
+            return probe_card(scraper, build_card_url(card_id), cache_only)
+        except Exception as e:
+            # An unreachable ID counts as present so its neighbourhood is still scraped
+            logger.warning(f"Probe failed for {card_id}: {e}")
+            return True
+
+    intervals = pad_intervals(discover_intervals(exists, start, end, max_step), start, end)
+    region = scraper.cards_dir.name
+    path = save_id_map(scraper.data_root, region, start, end, intervals)
+    card_ids = list(iter_interval_ids(intervals))
+    logger.info(f"Discovered {len(card_ids)} IDs in {len(intervals)} intervals, saved to {path}")
+    return card_ids
+
+
+def mapped_card_ids(scraper: Any, id_range: Optional[Tuple[int, int]] = None) -> List[int]:
+    """
+    IDs of the intervals saved by earlier discovery runs
+
+    Args:
+        scraper: Scraper instance
+        id_range: Optional (START, COUNT) limiting the IDs returned
+    """
+    intervals = [tuple(interval) for interval in load_id_map(scraper.data_root, scraper.cards_dir.name)['intervals']]
+    if id_range:
+        start, count = id_range
+        intervals = [(max(first, start), min(last, start + count - 1)) for first, last in intervals]
+        intervals = [(first, last) for first, last in intervals if first <= last]
+    if not intervals:
+        logger.warning("No discovered intervals saved for this region; run with --discover first")
+    return list(iter_interval_ids(intervals))
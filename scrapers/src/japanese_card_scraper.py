@@ -25,17 +25,34 @@ from bs4 import BeautifulSoup
 import json
 import re
 import time
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Collection, Dict, Any, Optional, List, Tuple
 import urllib.parse
-import importlib.util
 import argparse
 from pathlib import Path
 from datetime import datetime
 import threading
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import nullcontext
 from collections import Counter, defaultdict
 import logging
 
+from card_sink import JsonlCardSink
+from html_cache import CACHE_BACKENDS, open_html_cache
+from html_index import HtmlCacheIndex
+from html_shards import ShardHtmlCache
+from html_trim import CardFragmentTrimmer
+from id_discovery import DEFAULT_MAX_STEP, discover_card_ids, mapped_card_ids
+from listing_harvester import harvest_card_ids
+from negative_cache import DEFAULT_TTL_DAYS, open_negative_cache
+from parse_pipeline import bounded_as_completed, scrape_batch_pipelined
+from parser_backend import DEFAULT_PARSER_BACKEND, PARSER_BACKENDS, parse_html
+from record_cache import content_hash, open_record_cache
+from rate_limiter import get_rate_limiter, rate_from_interval
+from retry_policy import RetryPolicy, request_with_retry
+from run_journal import RunJournal, new_run_name, open_run_journal, scrape_with_status
+from sampling_profiler import DEFAULT_PROFILE_INTERVAL, finish_profiling, profile_path, start_profiling
+from scrape_metrics import enable_metrics, metrics_path
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -43,9 +60,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Check for lxml parser
-_BS4_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
-
 # ============================================================================
 # MAPPING CONSTANTS
 # ============================================================================
@@ -159,6 +173,113 @@ DEFAULT_SAMPLE_IDS = [
 ]
 
 
+# ============================================================================
+# PAGE CONTEXT
+# ============================================================================
+
+class JapanesePageContext:
+    """
+    Everything the extractors read from a card page, gathered in one pass
+
+    The page text, first stats table, section headings, icon classes and the
+    image/link elements are collected in a single walk over the tree, so no
+    extractor re-scans the document.
+    """
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+
+        strings = list(soup.strings)
+        self.raw_text = ''.join(strings)  # soup.get_text()
+        self.text = ' '.join(text for text in (string.strip() for string in strings) if text)  # soup.get_text(' ', strip=True)
+
+        self.name_elem = None       # First h1
+        self.first_h4 = None
+        self.card_h4 = None         # First h4 inside div.card
+        self.type_span = None       # span.type (evolution stage)
+        self.subtext = None         # div.subtext (collector number)
+        self.top_info = None        # div.RightBox div.TopInfo div.td-r
+        self.table = None           # First table (weakness / resistance / retreat)
+        self.illustrator_elem = None
+        self.image_src = None       # img[src*="/card_images/large/"]
+        self.rarity_src = None      # img[src*="/rarity/"]
+        self.regulation_logo = None  # img.img-regulation[alt]
+        self.ex_link = None         # a[href^="/ex/"]
+        self.headings = []          # (h2/h3 tag, tag.string) in document order
+        self.sections = {}          # h2 string → first h2 with that string
+        self.paragraphs = []
+        self.page_icons = []        # Class lists of icon span/div/i outside tables
+
+        for tag in soup.find_all(True):
+            name = tag.name
+            if name in ('span', 'div', 'i'):
+                classes = tag.get('class', [])
+                if any(isinstance(cls, str) and cls.startswith('icon-') for cls in classes) and not tag.find_parent('table'):
+                    self.page_icons.append(classes)
+                if name == 'span' and self.type_span is None and 'type' in classes:
+                    self.type_span = tag
+                elif name == 'div':
+                    if self.subtext is None and 'subtext' in classes:
+                        self.subtext = tag
+                    if self.top_info is None and 'td-r' in classes and _inside(tag, [('div', 'TopInfo'), ('div', 'RightBox')]):
+                        self.top_info = tag
+            elif name == 'p':
+                self.paragraphs.append(tag)
+            elif name in ('h2', 'h3'):
+                string = tag.string
+                self.headings.append((tag, string))
+                if name == 'h2' and string is not None:
+                    self.sections.setdefault(string, tag)
+            elif name == 'img':
+                src = tag.get('src')
+                if src is not None:
+                    if self.image_src is None and '/card_images/large/' in src:
+                        self.image_src = src
+                    if self.rarity_src is None and '/rarity/' in src:
+                        self.rarity_src = src
+                if self.regulation_logo is None and 'img-regulation' in tag.get('class', []) and tag.get('alt') is not None:
+                    self.regulation_logo = tag
+            elif name == 'a':
+                if self.ex_link is None and (tag.get('href') or '').startswith('/ex/'):
+                    self.ex_link = tag
+            elif name == 'h4':
+                if self.first_h4 is None:
+                    self.first_h4 = tag
+                if self.card_h4 is None and _inside(tag, [('div', 'card')]):
+                    self.card_h4 = tag
+            elif name == 'h1':
+                if self.name_elem is None:
+                    self.name_elem = tag
+            elif name == 'h5':
+                if self.illustrator_elem is None and tag.string == 'イラストレーター':
+                    self.illustrator_elem = tag
+            elif name == 'table':
+                if self.table is None:
+                    self.table = tag
+
+        self.section_titles = ' '.join(tag.get_text(strip=True) for tag, _ in self.headings)
+        self.table_headers = [th.get_text(strip=True) for th in self.table.find_all('th')] if self.table else []
+        self.table_cells = self.table.find_all('td') if self.table else []
+
+    def heading(self, pattern: str):
+        """First h2/h3 whose text matches a regex (soup.find(['h2', 'h3'], string=re.compile(pattern)))"""
+        for tag, string in self.headings:
+            if string is not None and re.search(pattern, string):
+                return tag
+        return None
+
+
+def _inside(tag, chain: List[Tuple[str, str]]) -> bool:
+    """True if tag has ancestors matching chain[0], chain[1], ... (CSS descendant combinators)"""
+    name, cls = chain[0]
+    parent = tag.find_parent(name, class_=cls)
+    while parent is not None:
+        if len(chain) == 1 or _inside(parent, chain[1:]):
+            return True
+        parent = parent.find_parent(name, class_=cls)
+    return False
+
+
 # ============================================================================
 # SCRAPER CLASS
 # ============================================================================
@@ -166,12 +287,33 @@ DEFAULT_SAMPLE_IDS = [
 class JapaneseCardScraper:
     """Scraper for Japanese Pokemon card details from pokemon-card.com"""
 
-    def __init__(self, data_root: Optional[str] = None):
+    REQUEST_HOST = 'www.pokemon-card.com'
+
+    # Bump when extraction output changes; invalidates this region's record cache
+    EXTRACTOR_VERSION = '1'
+
+    # Subtrees built with --partial-parse (everything the extractors look up)
+    PARSE_ONLY = (
+        'h1', 'h2', 'h3', 'h4', 'h5', 'p', 'table', 'div.RightBox', 'div.card', 'div.subtext', 'span.type',
+        'span[class*="icon-"]', 'div[class*="icon-"]', 'i[class*="icon-"]',
+        'img[src*="/card_images/large/"]', 'img[src*="/rarity/"]', 'img.img-regulation', 'a[href^="/ex/"]',
+    )
+
+    def __init__(self, data_root: Optional[str] = None, cache_backend: str = 'auto',
+                 parser_backend: str = DEFAULT_PARSER_BACKEND, record_cache: bool = False,
+                 negative_ttl_days: Optional[float] = None, trim_cache: bool = False,
+                 partial_parse: bool = False):
         """
         Initialize scraper
         
         Args:
             data_root: Root directory for data storage (defaults to ../../data)
+            cache_backend: HTML cache backend ('files', 'shards' or 'auto')
+            parser_backend: HTML parser ('bs4' or 'lxml')
+            record_cache: Reuse card records extracted from unchanged HTML
+            negative_ttl_days: Skip IDs whose page held no card for this many days (None = off)
+            trim_cache: Store only the card detail fragment of newly cached pages
+            partial_parse: Build only the PARSE_ONLY subtrees of each page (bs4 parser backend)
         """
         if data_root is None:
             script_dir = Path(__file__).parent.parent.parent
@@ -180,15 +322,24 @@ class JapaneseCardScraper:
         self.data_root = Path(data_root)
         self.cards_dir = self.data_root / 'cards' / 'japan'
         self.html_dir = self.data_root / 'html' / 'japan'
+        self.html_cache = open_html_cache(self.html_dir, cache_backend)
+        # Persistent card ID → file index of flat-file caches, re-indexed on every write
+        self.html_index = None if isinstance(self.html_cache, ShardHtmlCache) else HtmlCacheIndex(self.html_dir)
+        self.html_cache.index = self.html_index
+        self.parser_backend = parser_backend
+        self.partial_parse = partial_parse
+        self.record_cache = open_record_cache(self.data_root, self.cards_dir.name, self.EXTRACTOR_VERSION) if record_cache else None
+        self.negative_cache = open_negative_cache(self.data_root, self.cards_dir.name, self.EXTRACTOR_VERSION, negative_ttl_days) if negative_ttl_days is not None else None
+        if trim_cache:
+            self.html_cache.trim = CardFragmentTrimmer(self)
         
         # HTTP session management
         self.user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         self.thread_local = threading.local()
         
-        # Rate limiting
-        self.request_lock = threading.Lock()
-        self.last_request_ts = 0.0
-        self.min_request_interval = 0.8
+        # Rate limiting (process-wide token bucket per host)
+        self.rate_limiter = get_rate_limiter()
+        self.retry_policy = RetryPolicy()
         
         # Logging
         self.quiet = False
@@ -213,62 +364,161 @@ class JapaneseCardScraper:
             Card data dict or None if failed
         """
         try:
-            card_id = self._extract_card_id_from_url(card_url)
-            cache_path = self.html_dir / f"{card_id}.html" if card_id and cache_html else None
-            html_text = None
+            html_text = self.fetch_card_html(card_url, cache_html, refresh_cache, cache_only)
+            if html_text is None:
+                return None
 
-    # Try cache first
-            if cache_path and cache_path.exists() and not refresh_cache:
-                if not self.quiet:
-                    logger.info(f"Using cached HTML for card {card_id}")
-                html_text = cache_path.read_text(encoding='utf-8')
-            else:
-                # Fetch from web
-                if cache_only:
-                    if not self.quiet:
-                        logger.warning(f"Cache miss for {card_id}, skipping (cache-only mode)")
-                    return None
-                
-                if not self.quiet:
-                    logger.info(f"Fetching {card_url}")
-                
-                self._wait_for_request_slot()
-                response = self._get_session().get(card_url, timeout=10)
-                response.raise_for_status()
-                html_text = response.text
-                
-                # Save to cache
-                if cache_path:
-                    cache_path.parent.mkdir(parents=True, exist_ok=True)
-                    cache_path.write_text(html_text, encoding='utf-8')
+            return self.parse_card_html(html_text, card_url)
 
-            # Parse HTML
-            soup = BeautifulSoup(html_text, _BS4_PARSER)
-            card_data = self._extract_card_info(soup, card_url)
+        except Exception as e:
+            if not self.quiet:
+                logger.error(f"✗ Error scraping {card_url}: {e}")
+            return None
 
-            if card_data and self._is_valid_card_data(card_data):
+    def parse_card_html(self, html_text: str, card_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a card detail page into PTCG_2026 card data
+        
+        Args:
+            html_text: Raw HTML of the card detail page
+            card_url: URL the HTML was fetched from
+            
+        Returns:
+            Card data dict or None if the page holds no valid card
+        """
+        digest = None
+        if self.record_cache is not None:
+            digest = content_hash(html_text)
+            card_data = self.record_cache.get(card_url, digest)
+            if card_data is not None:
                 if not self.quiet:
-                    logger.info(f"✓ Scraped: {card_data.get('name')}")
+                    logger.info(f"✓ Cached record: {card_data.get('name')}")
                 return card_data
-            else:
-                if not self.quiet:
-                    logger.warning(f"✗ Failed to extract card data from {card_url}")
-                return None
 
-        except Exception as e:
+        card_data = None
+        full_parse = True
+        if self.partial_parse:
+            try:
+                tree = parse_html(html_text, self.parser_backend, self.PARSE_ONLY)
+                # No h1 in the partial tree: an empty ID page, not worth a full parse
+                full_parse = tree.find('h1') is not None
+                card_data = self._extract_card_info(tree, card_url) if full_parse else None
+            except Exception:
+                card_data = None
+        if full_parse and not (card_data and self._is_valid_card_data(card_data)):
+            # Full parse of card pages the partial tree could not extract
+            card_data = self._extract_card_info(parse_html(html_text, self.parser_backend), card_url)
+
+        has_card = bool(card_data and self._is_valid_card_data(card_data))
+        if self.negative_cache is not None:
+            self.negative_cache.update(self._extract_card_id_from_url(card_url), has_card)
+
+        if has_card:
+            if digest is not None:
+                self.record_cache.put(card_url, digest, card_data)
             if not self.quiet:
-                logger.error(f"✗ Error scraping {card_url}: {e}")
+                logger.info(f"✓ Scraped: {card_data.get('name')}")
+            return card_data
+
+        if not self.quiet:
+            logger.warning(f"✗ Failed to extract card data from {card_url}")
+        return None
+
+    def _read_cached_html(
+        self,
+        card_id: Optional[str],
+        card_url: str,
+        cache_html: bool,
+        refresh_cache: bool,
+        cache_only: bool
+    ) -> Optional[str]:
+        """Return cached HTML for a card, or None if it must be fetched"""
+        if not card_id or not (cache_html or cache_only) or refresh_cache:
             return None
 
-    def _wait_for_request_slot(self) -> None:
-        """Ensure minimum delay between HTTP requests (thread-safe)"""
-        with self.request_lock:
-            now = time.time()
-            elapsed = now - self.last_request_ts
-            remaining = self.min_request_interval - elapsed
-            if remaining > 0:
-                time.sleep(remaining)
-            self.last_request_ts = time.time()
+        html_text = self.html_cache.read(card_id)
+        if html_text is not None and not self.quiet:
+            logger.info(f"Using cached HTML for card {card_id}")
+        return html_text
+
+    def _conditional_headers(self, card_id: Optional[str], cache_html: bool, refresh_cache: bool) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers when refreshing a cached page"""
+        if not card_id or not cache_html or not refresh_cache:
+            return {}
+        return self.html_cache.conditional_headers(card_id)
+
+    def _handle_response(
+        self,
+        card_id: Optional[str],
+        card_url: str,
+        status: int,
+        html_text: str,
+        headers: Dict[str, str],
+        cache_html: bool
+    ) -> Optional[str]:
+        """Cache a fetched page (or reuse the cached copy on 304) and return its HTML"""
+        if status == 304:
+            if not self.quiet:
+                logger.info(f"Not modified, using cached HTML for card {card_id}")
+            return self.html_cache.revalidated(card_id, headers)
+
+        if cache_html and card_id:
+            self.html_cache.store(card_id, html_text, headers, card_url)
+        return html_text
+
+    def fetch_card_html(
+        self,
+        card_url: str,
+        cache_html: bool = False,
+        refresh_cache: bool = False,
+        cache_only: bool = False
+    ) -> Optional[str]:
+        """
+        Get a card detail page from the cache or the web (no parsing)
+        
+        Args:
+            card_url: URL to card detail page
+            cache_html: Save HTML to cache directory
+            refresh_cache: Force re-fetch even if cached
+            cache_only: Only use cache, skip HTTP requests
+            
+        Returns:
+            Page HTML, or None on a cache-only miss (raises on HTTP errors)
+        """
+        card_id = self._extract_card_id_from_url(card_url)
+        html_text = self._read_cached_html(card_id, card_url, cache_html, refresh_cache, cache_only)
+
+        if html_text is None:
+            # Fetch from web
+            if cache_only:
+                if not self.quiet:
+                    logger.warning(f"Cache miss for {card_id}, skipping (cache-only mode)")
+                return None
+            
+            if not self.quiet:
+                logger.info(f"Fetching {card_url}")
+            
+            # Revalidate cached copy on refresh runs (conditional GET)
+            headers = self._conditional_headers(card_id, cache_html, refresh_cache)
+            response = request_with_retry(
+                lambda: self._get_session().get(card_url, headers=headers, timeout=10),
+                card_url, self.rate_limiter, self.retry_policy
+            )
+            html_text = self._handle_response(
+                card_id, card_url, response.status_code, response.text, response.headers, cache_html
+            )
+
+        return html_text
+
+    def set_rate_limit(self, min_request_interval: float, burst: int = 1) -> None:
+        """
+        Configure the shared request budget for pokemon-card.com
+        
+        Args:
+            min_request_interval: Seconds per request at the sustained rate (0 = unlimited)
+            burst: Requests allowed back-to-back after an idle period
+        """
+        self.rate_limiter.configure(self.REQUEST_HOST, rate_from_interval(min_request_interval), burst)
 
     def _get_session(self) -> requests.Session:
         """Get thread-local HTTP session"""
@@ -286,10 +536,10 @@ class JapaneseCardScraper:
     def _extract_card_info(self, soup: BeautifulSoup, url: str) -> Optional[Dict[str, Any]]:
         """Extract all card information from BeautifulSoup object"""
         try:
-            page_text = soup.get_text(' ', strip=True)
+            page = JapanesePageContext(soup)
 
             # Card name (required)
-            name_elem = soup.find('h1')
+            name_elem = page.name_elem
             if not name_elem:
                 return None
             card_name = name_elem.get_text(strip=True)
@@ -299,39 +549,39 @@ class JapaneseCardScraper:
             web_card_id = self._format_web_card_id(page_card_id)
 
             # Pokedex number and classification
-            pokedex_number = self._extract_pokedex_number(soup)
+            pokedex_number = self._extract_pokedex_number(page)
             
             # Determine supertype
-            supertype = self._extract_supertype(soup, card_name, page_text)
+            supertype = self._extract_supertype(page, card_name)
             
             # Pokemon-specific attributes
-            hp = self._extract_hp(soup) if supertype == 'POKEMON' else None
-            pokemon_type = self._extract_pokemon_type(soup) if supertype == 'POKEMON' else None
-            evolution_stage = self._extract_evolution_stage(soup, page_text) if supertype == 'POKEMON' else None
-            weakness, weakness_value = self._extract_weakness(soup) if supertype == 'POKEMON' else (None, None)
-            resistance, resistance_value = self._extract_resistance(soup) if supertype == 'POKEMON' else (None, None)
-            retreat_cost = self._extract_retreat_cost(soup) if supertype == 'POKEMON' else None
+            hp = self._extract_hp(page) if supertype == 'POKEMON' else None
+            pokemon_type = self._extract_pokemon_type(page) if supertype == 'POKEMON' else None
+            evolution_stage = self._extract_evolution_stage(page) if supertype == 'POKEMON' else None
+            weakness, weakness_value = self._extract_weakness(page) if supertype == 'POKEMON' else (None, None)
+            resistance, resistance_value = self._extract_resistance(page) if supertype == 'POKEMON' else (None, None)
+            retreat_cost = self._extract_retreat_cost(page) if supertype == 'POKEMON' else None
             
             # Attacks and abilities
-            attacks = self._extract_attacks(soup) if supertype == 'POKEMON' else []
-            abilities = self._extract_abilities(soup) if supertype == 'POKEMON' else []
+            attacks = self._extract_attacks(page) if supertype == 'POKEMON' else []
+            abilities = self._extract_abilities(page) if supertype == 'POKEMON' else []
             
             # Evolution information
-            evolves_from, evolves_to = self._extract_evolution_info(soup, evolution_stage) if supertype == 'POKEMON' else (None, None)
+            evolves_from, evolves_to = self._extract_evolution_info(page, evolution_stage) if supertype == 'POKEMON' else (None, None)
             
             # Card metadata
-            image_url = self._extract_image_url(soup)
-            collector_number = self._extract_collector_number(soup, page_text)
-            expansion_code = self._extract_expansion_code(soup)
-            rarity = self._extract_rarity(soup)
-            illustrator = self._extract_illustrator(soup)
+            image_url = self._extract_image_url(page)
+            collector_number = self._extract_collector_number(page)
+            expansion_code = self._extract_expansion_code(page)
+            rarity = self._extract_rarity(page)
+            illustrator = self._extract_illustrator(page)
             
             # Rules and descriptions
-            rules = self._extract_rules(soup, card_name)
-            effect_text = self._extract_effect_text(soup, supertype)
+            rules = self._extract_rules(page, card_name)
+            effect_text = self._extract_effect_text(page, supertype)
             
             # Determine subtype
-            subtype = self._determine_subtype(supertype, evolution_stage, soup, page_text)
+            subtype = self._determine_subtype(supertype, evolution_stage, page)
             
             # Determine variant type and rarity
             variant_type = self._determine_variant_type(rarity, collector_number)
@@ -382,7 +632,7 @@ class JapaneseCardScraper:
                 # Text and rules
                 "effectText": effect_text,
                 "rules": rules if rules else None,
-                "flavorText": self._extract_flavor_text(soup, page_text) if supertype == 'POKEMON' else None,
+                "flavorText": self._extract_flavor_text(page) if supertype == 'POKEMON' else None,
                 
                 # Metadata
                 "imageUrl": image_url,
@@ -396,11 +646,11 @@ class JapaneseCardScraper:
 
         except Exception as e:
             logger.error(f"Error extracting card info: {e}")
-            return None
+            raise
 
-    def _extract_pokedex_number(self, soup: BeautifulSoup) -> Optional[int]:
+    def _extract_pokedex_number(self, page: JapanesePageContext) -> Optional[int]:
         """Extract Pokedex number (e.g., No.001)"""
-        card_info = soup.select_one('div.card h4') or soup.find('h4')
+        card_info = page.card_h4 or page.first_h4
         if card_info:
             info_text = card_info.get_text(strip=True)
             match = re.search(r'No\.(\d+)', info_text)
@@ -408,10 +658,10 @@ class JapaneseCardScraper:
                 return int(match.group(1))
         return None
 
-    def _extract_supertype(self, soup: BeautifulSoup, card_name: str, page_text: str) -> str:
+    def _extract_supertype(self, page: JapanesePageContext, card_name: str) -> str:
         """Determine card supertype (POKEMON, TRAINER, ENERGY)"""
         # Check for HP (Pokemon indicator)
-        if re.search(r'HP\s*\d+', page_text):
+        if re.search(r'HP\s*\d+', page.text):
             return 'POKEMON'
         
         # Check name suffix patterns
@@ -423,24 +673,21 @@ class JapaneseCardScraper:
             return 'ENERGY'
         
         # Check section headings
-        section_titles = ' '.join(tag.get_text(strip=True) for tag in soup.select('h2,h3'))
-        
-        if any(keyword in section_titles for keyword in ['ワザ', '特性']):
+        if any(keyword in page.section_titles for keyword in ['ワザ', '特性']):
             return 'POKEMON'
         
         # Default to Trainer
         return 'TRAINER'
 
-    def _extract_hp(self, soup: BeautifulSoup) -> Optional[int]:
+    def _extract_hp(self, page: JapanesePageContext) -> Optional[int]:
         """Extract HP value"""
-        text = soup.get_text(' ', strip=True)
-        match = re.search(r'HP\s*(\d+)', text)
+        match = re.search(r'HP\s*(\d+)', page.text)
         return int(match.group(1)) if match else None
 
-    def _extract_pokemon_type(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_pokemon_type(self, page: JapanesePageContext) -> Optional[str]:
         """Extract Pokemon type from icon classes"""
         # Look in TopInfo area first to avoid Weakness/Resistance icons
-        top_info = soup.select_one('div.RightBox div.TopInfo div.td-r')
+        top_info = page.top_info
         if top_info:
             for tag in top_info.find_all(['span', 'div', 'i']):
                 classes = tag.get('class', [])
@@ -451,10 +698,7 @@ class JapaneseCardScraper:
                             return pokemon_type
         
         # Fallback: search all icons (skip table for Weakness/Resistance)
-        for tag in soup.find_all(['span', 'div', 'i']):
-            if tag.find_parent('table'):
-                continue
-            classes = tag.get('class', [])
+        for classes in page.page_icons:
             for cls in classes:
                 if isinstance(cls, str) and cls.startswith('icon-') and cls != 'icon-none':
                     pokemon_type = ELEMENT_TO_TYPE.get(cls)
@@ -463,10 +707,10 @@ class JapaneseCardScraper:
         
         return None
 
-    def _extract_evolution_stage(self, soup: BeautifulSoup, text: str) -> Optional[str]:
+    def _extract_evolution_stage(self, page: JapanesePageContext) -> Optional[str]:
         """Extract evolution stage from the specific <span class="type"> element"""
         # Find the evolution stage in the TopInfo section
-        type_span = soup.find('span', class_='type')
+        type_span = page.type_span
         if not type_span:
             return 'BASIC'  # Default if no type span found
         
@@ -490,17 +734,15 @@ class JapaneseCardScraper:
         
         return stage_map.get(stage_text, 'BASIC')
 
-    def _extract_weakness(self, soup: BeautifulSoup) -> Tuple[Optional[str], Optional[str]]:
+    def _extract_weakness(self, page: JapanesePageContext) -> Tuple[Optional[str], Optional[str]]:
         """Extract weakness type and value"""
-        table = soup.find('table')
-        if not table:
+        if not page.table:
             return None, None
 
-        headers = [th.get_text(strip=True) for th in table.find_all('th')]
-        if '弱点' not in headers:
+        if '弱点' not in page.table_headers:
             return None, None
 
-        cells = table.find_all('td')
+        cells = page.table_cells
         if not cells:
             return None, None
 
@@ -513,13 +755,12 @@ class JapaneseCardScraper:
         
         return weakness_type, value
 
-    def _extract_resistance(self, soup: BeautifulSoup) -> Tuple[Optional[str], Optional[str]]:
+    def _extract_resistance(self, page: JapanesePageContext) -> Tuple[Optional[str], Optional[str]]:
         """Extract resistance type and value"""
-        table = soup.find('table')
-        if not table:
+        if not page.table:
             return None, None
 
-        cells = table.find_all('td')
+        cells = page.table_cells
         if len(cells) < 2:
             return None, None
 
@@ -533,17 +774,15 @@ class JapaneseCardScraper:
         
         return None, None
 
-    def _extract_retreat_cost(self, soup: BeautifulSoup) -> Optional[int]:
+    def _extract_retreat_cost(self, page: JapanesePageContext) -> Optional[int]:
         """Extract retreat cost"""
-        table = soup.find('table')
-        if not table:
+        if not page.table:
             return None
 
-        headers = [th.get_text(strip=True) for th in table.find_all('th')]
-        if 'にげる' not in headers:
+        if 'にげる' not in page.table_headers:
             return None
 
-        cells = table.find_all('td')
+        cells = page.table_cells
         if len(cells) < 3:
             return None
 
@@ -563,11 +802,11 @@ class JapaneseCardScraper:
                         return pokemon_type
         return None
 
-    def _extract_attacks(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    def _extract_attacks(self, page: JapanesePageContext) -> List[Dict[str, Any]]:
         """Extract attack information"""
         attacks = []
         
-        waza_section = soup.find('h2', string='ワザ')
+        waza_section = page.sections.get('ワザ')
         if not waza_section:
             return attacks
 
@@ -617,11 +856,11 @@ class JapaneseCardScraper:
                         symbols.append(symbol)
         return symbols if symbols else None
 
-    def _extract_abilities(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    def _extract_abilities(self, page: JapanesePageContext) -> List[Dict[str, str]]:
         """Extract ability information"""
         abilities = []
         
-        tokusei_section = soup.find('h2', string='特性')
+        tokusei_section = page.sections.get('特性')
         if not tokusei_section:
             return abilities
 
@@ -644,19 +883,16 @@ class JapaneseCardScraper:
         
         return abilities
 
-    def _extract_image_url(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_image_url(self, page: JapanesePageContext) -> Optional[str]:
         """Extract card image URL"""
-        img_elem = soup.select_one('img[src*="/card_images/large/"]')
-        if img_elem:
-            src = img_elem.get('src')
-            if src:
-                return urllib.parse.urljoin('https://www.pokemon-card.com', src)
+        if page.image_src:
+            return urllib.parse.urljoin('https://www.pokemon-card.com', page.image_src)
         return None
 
-    def _extract_collector_number(self, soup: BeautifulSoup, page_text: str) -> Optional[str]:
+    def _extract_collector_number(self, page: JapanesePageContext) -> Optional[str]:
         """Extract collector number (e.g., '005/100' or '228')"""
-        subtext = soup.select_one('div.subtext')
-        text = subtext.get_text(' ', strip=True) if subtext else page_text
+        subtext = page.subtext
+        text = subtext.get_text(' ', strip=True) if subtext else page.text
 
         # Standard set cards: "005 / 100"
         match = re.search(r'\b(\d{1,4})\s*/\s*(\d{1,4})\b', text)
@@ -670,17 +906,17 @@ class JapaneseCardScraper:
 
         return None
 
-    def _extract_expansion_code(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_expansion_code(self, page: JapanesePageContext) -> Optional[str]:
         """Extract expansion code (e.g., 'sv9')"""
         # Check regulation logo
-        logo = soup.select_one('img.img-regulation[alt]')
+        logo = page.regulation_logo
         if logo:
             alt = (logo.get('alt') or '').strip()
             if alt:
                 return alt.lower()
 
         # Check /ex/<code>/ link
-        link = soup.select_one('a[href^="/ex/"]')
+        link = page.ex_link
         if link and link.get('href'):
             match = re.search(r'^/ex/([^/]+)/', link['href'])
             if match:
@@ -688,13 +924,9 @@ class JapaneseCardScraper:
         
         return None
 
-    def _extract_rarity(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_rarity(self, page: JapanesePageContext) -> Optional[str]:
         """Extract rarity code"""
-        rarity_img = soup.select_one('img[src*="/rarity/"]')
-        if not rarity_img:
-            return None
-        
-        src = rarity_img.get('src')
+        src = page.rarity_src
         if not src:
             return None
 
@@ -723,9 +955,9 @@ class JapaneseCardScraper:
 
         return None
 
-    def _extract_illustrator(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_illustrator(self, page: JapanesePageContext) -> Optional[str]:
         """Extract illustrator name"""
-        illustrator_elem = soup.find('h5', string='イラストレーター')
+        illustrator_elem = page.illustrator_elem
         if illustrator_elem:
             illustrator_p = illustrator_elem.find_next_sibling('p')
             if illustrator_p:
@@ -734,7 +966,7 @@ class JapaneseCardScraper:
                     return link.get_text(strip=True)
         return None
 
-    def _extract_rules(self, soup: BeautifulSoup, card_name: str) -> Optional[List[str]]:
+    def _extract_rules(self, page: JapanesePageContext, card_name: str) -> Optional[List[str]]:
         """Extract rule box text (V, VMAX, ex, etc.)"""
         rules = []
         
@@ -744,7 +976,7 @@ class JapaneseCardScraper:
                 rules.append(f"{pattern_name} rule applies")
         
         # Look for ACE SPEC indicator
-        if 'ACE SPEC' in soup.get_text():
+        if 'ACE SPEC' in page.raw_text:
             rules.append("You can't have more than 1 ACE SPEC card in your deck")
         
         return rules if rules else None
@@ -776,14 +1008,14 @@ class JapaneseCardScraper:
         
         return None
 
-    def _extract_effect_text(self, soup: BeautifulSoup, supertype: str) -> Optional[str]:
+    def _extract_effect_text(self, page: JapanesePageContext, supertype: str) -> Optional[str]:
         """Extract card effect text (for Trainer/Energy cards)"""
         if supertype == 'POKEMON':
             return None
         
         # Method 1: Look for specific Trainer/Energy sections
         for section_title in ['グッズ', 'サポート', 'スタジアム', 'ポケモンのどうぐ', '特殊エネルギー', '基本エネルギー']:
-            section = soup.find(['h2', 'h3'], string=re.compile(section_title))
+            section = page.heading(section_title)
             if section:
                 # Get the next paragraph after the section title
                 next_p = section.find_next('p')
@@ -800,7 +1032,7 @@ class JapaneseCardScraper:
         
         # Method 2: Look for paragraphs with effect-like keywords (prioritize real effects over copyright)
         effect_candidates = []
-        for p in soup.find_all('p'):
+        for p in page.paragraphs:
             text = p.get_text(strip=True)
             if text and len(text) > 20:
                 # Check for effect-like keywords
@@ -814,7 +1046,7 @@ class JapaneseCardScraper:
             return effect_candidates[0]
         
         # Method 3: Fallback - look for any substantial paragraph that's not copyright
-        for p in soup.find_all('p'):
+        for p in page.paragraphs:
             text = p.get_text(strip=True)
             if (text and len(text) > 30 and 
                 not '©' in text and 
@@ -826,13 +1058,13 @@ class JapaneseCardScraper:
         
         return None
 
-    def _extract_flavor_text(self, soup: BeautifulSoup, page_text: str) -> Optional[str]:
+    def _extract_flavor_text(self, page: JapanesePageContext) -> Optional[str]:
         """Extract Pokemon flavor text (height, weight, description)"""
         parts = []
         
         # Height and weight
-        height_match = re.search(r'高さ：([\d.]+)\s*m', page_text)
-        weight_match = re.search(r'重さ：([\d.]+)\s*kg', page_text)
+        height_match = re.search(r'高さ：([\d.]+)\s*m', page.text)
+        weight_match = re.search(r'重さ：([\d.]+)\s*kg', page.text)
         
         if height_match:
             parts.append(f"高さ：{height_match.group(1)} m")
@@ -840,7 +1072,7 @@ class JapaneseCardScraper:
             parts.append(f"重さ：{weight_match.group(1)} kg")
         
         # Description
-        card_info = soup.find('h4')
+        card_info = page.first_h4
         if card_info:
             desc_elem = card_info.find_next_sibling('p')
             if desc_elem:
@@ -854,7 +1086,7 @@ class JapaneseCardScraper:
         
         return ' '.join(parts) if parts else None
 
-    def _extract_evolution_info(self, soup: BeautifulSoup, evolution_stage: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    def _extract_evolution_info(self, page: JapanesePageContext, evolution_stage: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
         """
         Extract evolution information from the page
         
@@ -865,7 +1097,7 @@ class JapaneseCardScraper:
         evolves_to = None
         
         # Look for the "進化" (Evolution) section heading
-        evolution_section = soup.find('h2', string='進化')
+        evolution_section = page.sections.get('進化')
         if not evolution_section:
             return None, None
         
@@ -906,8 +1138,7 @@ class JapaneseCardScraper:
         self, 
         supertype: str, 
         evolution_stage: Optional[str],
-        soup: BeautifulSoup,
-        page_text: str
+        page: JapanesePageContext
     ) -> Optional[str]:
         """Determine card subtype - Returns None for Pokemon cards"""
         # Pokemon cards don't have subtypes (evolution stage is separate)
@@ -915,12 +1146,12 @@ class JapaneseCardScraper:
             return None
         
         if supertype == 'ENERGY':
-            if '基本' in page_text:
+            if '基本' in page.text:
                 return 'BASIC_ENERGY'
             return 'SPECIAL_ENERGY'
         
         # Trainer subtypes
-        section_titles = ' '.join(tag.get_text(strip=True) for tag in soup.select('h2,h3'))
+        section_titles = page.section_titles
         
         if 'ポケモンのどうぐ' in section_titles:
             return 'TOOL'
@@ -992,7 +1223,16 @@ def scrape_batch(
     cache_html: bool = True,
     refresh_cache: bool = False,
     cache_only: bool = False,
-    threads: int = 1
+    threads: int = 1,
+    engine: str = 'threads',
+    concurrency: int = 200,
+    max_connections_per_host: int = 8,
+    parse_workers: int = 0,
+    sink: Optional[JsonlCardSink] = None,
+    journal: Optional[RunJournal] = None,
+    executor: Optional[Executor] = None,
+    parse_pool: Optional[Executor] = None,
+    requested_ids: Collection[int] = ()
 ) -> List[Dict[str, Any]]:
     """
     Scrape multiple cards with optional threading
@@ -1004,28 +1244,63 @@ def scrape_batch(
         refresh_cache: Force re-fetch
         cache_only: Only use cache
         threads: Number of threads (1 = sequential)
+        engine: 'threads' (ThreadPoolExecutor) or 'async' (asyncio fetch engine)
+        concurrency: Cards in flight at once (async engine only)
+        max_connections_per_host: Open connections per host (async engine only)
+        parse_workers: Parser processes fed by the fetch threads (0 = parse in the fetch threads)
+        sink: Stream each card to per-expansion JSONL files instead of returning it
+        journal: Record each card's outcome and skip cards a resumed run already finished
+        executor: Thread pool to fetch in instead of starting one (kept open; see batch_scrape.py)
+        parse_pool: Process pool from create_parse_pool instead of starting one (kept open)
+        requested_ids: IDs asked for explicitly, never skipped by the negative cache
         
     Returns:
-        List of scraped card data
+        List of scraped card data (empty when streaming to a sink)
     """
-    urls = [build_card_url(card_id) for card_id in card_ids]
+    if journal is not None:
+        card_ids = journal.pending_ids(card_ids, build_card_url)
+    # Skipping saves no request when only the cache is read, so cache-only runs see every page
+    if scraper.negative_cache is not None and not (refresh_cache or cache_only):
+        card_ids = scraper.negative_cache.pending_ids(card_ids, requested_ids)
+
+    if engine == 'async':
+        from fetch_engine import scrape_batch_async
+        return scrape_batch_async(
+            card_ids, scraper, build_card_url, cache_html, refresh_cache, cache_only,
+            concurrency=concurrency,
+            max_connections_per_host=max_connections_per_host,
+            parse_workers=parse_workers,
+            sink=sink,
+            journal=journal,
+            parse_pool=parse_pool
+        )
+
+    urls = (build_card_url(card_id) for card_id in card_ids)
+    if parse_workers > 0 or parse_pool is not None:
+        return scrape_batch_pipelined(
+            urls, scraper, cache_html, refresh_cache, cache_only,
+            io_threads=threads, parse_workers=parse_workers, sink=sink, journal=journal,
+            parse_pool=parse_pool, io_pool=executor
+        )
     results = []
+    emit = sink.add if sink is not None else results.append
+    
+    def scrape_one(url: str) -> Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[str]]:
+        return (url, *scrape_with_status(scraper, url, cache_html, refresh_cache, cache_only))
     
-    def scrape_one(url: str) -> Optional[Dict[str, Any]]:
-        return scraper.scrape_card_details(url, cache_html, refresh_cache, cache_only)
+    def finish(url: str, outcome: Optional[str], data: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        if data:
+            emit(data)
+        if journal is not None and outcome is not None:
+            journal.record(url, outcome, error)
     
-    if threads > 1:
-        with ThreadPoolExecutor(max_workers=threads) as executor:
-            future_to_url = {executor.submit(scrape_one, url): url for url in urls}
-            for future in as_completed(future_to_url):
-                data = future.result()
-                if data:
-                    results.append(data)
+    if threads > 1 or executor is not None:
+        with nullcontext(executor) if executor is not None else ThreadPoolExecutor(max_workers=threads) as pool:
+            for scraped in bounded_as_completed(pool, scrape_one, urls, max(1, threads) * 4):
+                finish(*scraped)
     else:
         for url in urls:
-            data = scrape_one(url)
-            if data:
-                results.append(data)
+            finish(*scrape_one(url))
     
     return results
 
@@ -1071,12 +1346,26 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--ids', type=str, help='Comma-separated card IDs')
     parser.add_argument('--id-range', nargs=2, type=int, metavar=('START', 'COUNT'),
                         help='Start ID and number of cards to scrape')
+    parser.add_argument('--harvest', type=str, metavar='PG',
+                        help='Comma-separated product group (pg) codes; their card IDs are harvested from the card search API')
+    parser.add_argument('--discover', action='store_true',
+                        help='Probe --id-range for dense intervals first and scrape only those (map saved to data/ids/{region}.json)')
+    parser.add_argument('--discover-step', type=int, default=DEFAULT_MAX_STEP,
+                        help=f'Largest jump between discovery probes; smaller finds smaller clusters (default: {DEFAULT_MAX_STEP})')
+    parser.add_argument('--id-map', action='store_true',
+                        help='Scrape the intervals saved by earlier --discover runs (within --id-range if given)')
     
     # Output options
     parser.add_argument('--output', default='japanese_cards.json',
                         help='Output JSON file path (default: japanese_cards.json)')
     parser.add_argument('--compact-json', action='store_true',
                         help='Use compact JSON formatting')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='Stream cards to per-expansion JSONL files as they complete (flat memory)')
+    parser.add_argument('--merge-json', action='store_true',
+                        help='With --jsonl, also write the grouped JSON files at the end')
+    parser.add_argument('--resume', metavar='RUN',
+                        help='Resume an interrupted --jsonl run from its journal (data/runs/{region}/RUN.jsonl), skipping finished cards')
     
     # Caching options
     parser.add_argument('--cache-html', action='store_true',
@@ -1085,6 +1374,20 @@ def parse_args() -> argparse.Namespace:
                         help='Force re-fetch cached HTML')
     parser.add_argument('--cache-only', action='store_true',
                         help='Only use cached HTML, skip HTTP requests')
+    parser.add_argument('--cache-backend', choices=CACHE_BACKENDS, default='auto',
+                        help='HTML cache backend: flat files or compressed shards (default: auto)')
+    parser.add_argument('--partial-parse', action='store_true',
+                        help='Build only the card detail subtrees of each page (bs4 backend; full parse if no card is found)')
+    parser.add_argument('--trim-cache', action='store_true',
+                        help='Cache only the card detail fragment of fetched pages (smaller cache, faster re-parsing)')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER_BACKEND,
+                        help='HTML parser backend: bs4, or the faster lxml tree (default: bs4)')
+    parser.add_argument('--no-record-cache', action='store_true',
+                        help='Re-extract every page instead of reusing records from unchanged HTML')
+    parser.add_argument('--negative-ttl', type=float, default=DEFAULT_TTL_DAYS, metavar='DAYS',
+                        help=f'Days to skip IDs whose page held no card before probing them again (default: {DEFAULT_TTL_DAYS:g})')
+    parser.add_argument('--no-negative-cache', action='store_true',
+                        help='Probe every ID, including ones known to hold no card')
     
     # Filtering
     parser.add_argument('--expansions', type=str,
@@ -1093,10 +1396,32 @@ def parse_args() -> argparse.Namespace:
     # Performance
     parser.add_argument('--threads', type=int, default=1,
                         help='Number of parallel threads (default: 1)')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                        help='Fetch engine: thread pool or asyncio (default: threads)')
+    parser.add_argument('--concurrency', type=int, default=200,
+                        help='Cards in flight at once with --engine async (default: 200)')
+    parser.add_argument('--max-connections-per-host', type=int, default=8,
+                        help='Pooled connections per host with --engine async (default: 8)')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Processes parsing HTML while threads fetch it (default: 0 = parse in the fetch threads)')
     parser.add_argument('--min-request-interval', type=float, default=2.0,
-                        help='Minimum seconds between requests (default: 2.0)')
+                        help='Seconds per request at the sustained per-host rate (default: 2.0)')
+    parser.add_argument('--burst', type=int, default=1,
+                        help='Requests allowed back-to-back per host (default: 1)')
+    parser.add_argument('--max-retries', type=int, default=4,
+                        help='Retries for 429/5xx/connection errors with exponential backoff (default: 4)')
     parser.add_argument('--quiet', action='store_true',
                         help='Suppress per-card logging')
+    parser.add_argument('--metrics', nargs='?', const='auto', metavar='PATH',
+                        help='Time each scrape stage and write the histograms (.prom/.txt: Prometheus text, '
+                             'otherwise JSON; default: data/runs/{region}/{run}.metrics.json)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='Serve live metrics on http://127.0.0.1:PORT/metrics while scraping')
+    parser.add_argument('--profile', nargs='?', const='auto', metavar='PATH',
+                        help='Sample all threads and parse workers; write folded stacks for a flamegraph and a ranked '
+                             'table next to them (default: data/runs/{region}/{run}.profile.folded)')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_PROFILE_INTERVAL, metavar='SECONDS',
+                        help=f'Seconds between --profile samples (default: {DEFAULT_PROFILE_INTERVAL:g})')
     
     return parser.parse_args()
 
@@ -1106,8 +1431,10 @@ def main():
     args = parse_args()
     
     # Determine card IDs to scrape
+    requested_ids = set()
     if args.ids:
         card_ids = [int(x.strip()) for x in args.ids.split(',') if x.strip()]
+        requested_ids.update(card_ids)
     elif args.id_range:
         start, count = args.id_range
         card_ids = list(range(start, start + count))
@@ -1116,46 +1443,113 @@ def main():
         logger.info("No IDs specified, using default sample cards")
     
     # Initialize scraper
-    scraper = JapaneseCardScraper()
-    scraper.min_request_interval = args.min_request_interval
+    scraper = JapaneseCardScraper(cache_backend=args.cache_backend, parser_backend=args.parser,
+                                  record_cache=not args.no_record_cache,
+                                  negative_ttl_days=None if args.no_negative_cache else args.negative_ttl,
+                                  trim_cache=args.trim_cache, partial_parse=args.partial_parse)
+    scraper.set_rate_limit(args.min_request_interval, args.burst)
+    scraper.retry_policy.max_retries = args.max_retries
     scraper.quiet = args.quiet
+    metrics = enable_metrics(scraper, args.metrics_port) if args.metrics or args.metrics_port else None
+    profiler = start_profiling(args.profile_interval) if args.profile else None
+    
+    # Take the ID list from the card search listing, or narrow it to the dense intervals of the ID space
+    if args.harvest:
+        card_ids = harvest_card_ids(scraper, [x.strip() for x in args.harvest.split(',') if x.strip()])
+        # Listed by the site itself, so never skipped as known-empty
+        requested_ids.update(card_ids)
+    elif args.discover:
+        if not args.id_range:
+            logger.error("--discover needs --id-range START COUNT")
+            return
+        start, count = args.id_range
+        card_ids = discover_card_ids(scraper, build_card_url, start, count,
+                                     max_step=args.discover_step, cache_only=args.cache_only)
+    elif args.id_map:
+        card_ids = mapped_card_ids(scraper, args.id_range)
+    if not card_ids:
+        logger.warning("No card IDs to scrape")
+        return
     
     # Scrape cards
     logger.info(f"Starting scrape of {len(card_ids)} cards...")
     start_time = time.time()
     
+    output_path = Path(args.output)
+    expansion_filter = set(x.strip().lower() for x in args.expansions.split(',')) if args.expansions else None
+    
+    # Stream cards to per-expansion JSONL files instead of holding them in memory,
+    # journaling each card's outcome so an interrupted run can be resumed
+    if args.resume:
+        args.jsonl = True
+    sink = JsonlCardSink(output_path, expansions=expansion_filter, append=bool(args.resume)) if args.jsonl else None
+    journal = open_run_journal(scraper.data_root, scraper.cards_dir.name, args.resume) if args.jsonl else None
+    if journal is not None:
+        journal.before_sync = sink.sync
+        logger.info(f"Run journal: {journal.path} (resume with --resume {journal.name})")
+    
     cards = scrape_batch(
         card_ids,
         scraper,
         cache_html=args.cache_html or args.cache_only,
         refresh_cache=args.refresh_cache,
         cache_only=args.cache_only,
-        threads=args.threads
+        threads=args.threads,
+        engine=args.engine,
+        concurrency=args.concurrency,
+        max_connections_per_host=args.max_connections_per_host,
+        parse_workers=args.parse_workers,
+        sink=sink,
+        journal=journal,
+        requested_ids=requested_ids
     )
     
     elapsed = time.time() - start_time
     
-    # Filter by expansion if specified
-    if args.expansions:
-        expansion_filter = set(x.strip().lower() for x in args.expansions.split(','))
-        original_count = len(cards)
-        cards = [c for c in cards if c.get('expansionCode', '').lower() in expansion_filter]
-        logger.info(f"Filtered {original_count} → {len(cards)} cards for expansions: {expansion_filter}")
-    
-    # Save results
-    output_path = Path(args.output)
-    save_cards_by_expansion(cards, output_path, args.compact_json)
+    if sink is not None:
+        sink.close()
+        journal.close()
+        logger.info(f"Streamed {sink.count} cards to {len(sink.paths())} JSONL files")
+        logger.info(f"📒 Run {journal.name}: {journal.summary()}")
+        if args.merge_json:
+            sink.merge(save_cards_by_expansion, args.compact_json)
+        scraped_count = sink.count
+        by_expansion, by_rarity, by_supertype = (sink.counters[field] for field in ('expansionCode', 'rarity', 'supertype'))
+    else:
+        # Filter by expansion if specified
+        if expansion_filter:
+            original_count = len(cards)
+            cards = [c for c in cards if c.get('expansionCode', '').lower() in expansion_filter]
+            logger.info(f"Filtered {original_count} → {len(cards)} cards for expansions: {expansion_filter}")
+        
+        # Save results
+        save_cards_by_expansion(cards, output_path, args.compact_json)
+        scraped_count = len(cards)
+        by_expansion = Counter(c.get('expansionCode', 'unknown') for c in cards)
+        by_rarity = Counter(c.get('rarity', 'unknown') for c in cards)
+        by_supertype = Counter(c.get('supertype', 'unknown') for c in cards)
     
     # Summary
     logger.info(f"\n{'='*60}")
-    logger.info(f"✅ Scraped {len(cards)} cards in {elapsed:.2f}s")
+    logger.info(f"✅ Scraped {scraped_count} cards in {elapsed:.2f}s")
     logger.info(f"⏱️  Average: {elapsed/len(card_ids):.2f}s per card")
+    if scraper.record_cache is not None:
+        stats = scraper.record_cache.stats()
+        logger.info(f"🗃️  Record cache: {stats['hits']} hits, {stats['misses']} misses")
+    if scraper.negative_cache is not None:
+        stats = scraper.negative_cache.stats()
+        logger.info(f"🚫 Negative cache: skipped {stats['skipped']} empty IDs, {stats['added']} new, {stats['cleared']} now hold cards")
+
+    run_name = journal.name if journal is not None else new_run_name()
+    if metrics is not None:
+        metrics.log_summary()
+        if args.metrics:
+            path = metrics.write(metrics_path(args.metrics, scraper.data_root, scraper.cards_dir.name, run_name))
+            logger.info(f"📊 Metrics: {path}")
+    if profiler is not None:
+        finish_profiling(profiler, profile_path(args.profile, scraper.data_root, scraper.cards_dir.name, run_name))
     
     # Stats
-    by_expansion = Counter(c.get('expansionCode', 'unknown') for c in cards)
-    by_rarity = Counter(c.get('rarity', 'unknown') for c in cards)
-    by_supertype = Counter(c.get('supertype', 'unknown') for c in cards)
-    
     logger.info(f"\n📦 By Expansion: {dict(by_expansion)}")
     logger.info(f"✨ By Rarity: {dict(by_rarity)}")
     logger.info(f"🎴 By Type: {dict(by_supertype)}")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Listing Page Harvester for PTCG_2026 scrapers
+Collects the card IDs of whole expansions from the sites' card search
+listings, so discovery costs one request per page of cards instead of one
+per probed ID
+
+Features:
+- HK / EN (asia.pokemon-card.com): paginates card-search/list/?expansionCodes=
+  and reads the card detail links on each page
+- JP (www.pokemon-card.com): pages through the card search result API
+  (resultAPI.php, JSON) for a product group (`pg`) code
+- Keeps the summary fields the listing shows (name, thumbnail) and saves them
+  to data/listings/{region}/{expansion}.json
+- Requests share the scraper's per-host rate limiter and retry policy
+- Harvested IDs go straight into the scraper's scrape_batch
+
+Sample usage:
+    python scrapers/scrape_expansion.py --region hongkong --expansion M3 --cache-html
+    python scrapers/src/hk_card_scraper.py --expansion M3,M2a --cache-html
+"""
+
+import json
+import re
+import threading
+import urllib.parse
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import logging
+
+import requests
+
+from card_sink import safe_expansion_name
+from parser_backend import DEFAULT_PARSER_BACKEND, parse_html
+from retry_policy import request_with_retry
+
+logger = logging.getLogger(__name__)
+
+LISTINGS_DIR = 'listings'
+
+# Safety stop for listings whose pagination cannot be read
+MAX_PAGES = 200
+
+# Card detail links on the asia.pokemon-card.com listing (both URL styles)
+ASIA_CARD_LINK = re.compile(r'/(?:detail|details\.php/card)/(\d+)')
+ASIA_PAGE_LINK = re.compile(r'[?&]pageNo=(\d+)')
+
+ListingEntry = Dict[str, Any]
+
+
+def parse_asia_listing(html_text: str, base_url: str,
+                       parser_backend: str = DEFAULT_PARSER_BACKEND) -> Tuple[List[ListingEntry], Optional[int]]:
+    """
+    Card entries on one HK/EN listing page
+
+    Returns:
+        (entries, last page number from the pagination links or None)
+    """
+    soup = parse_html(html_text, parser_backend)
+    entries = []
+    seen = set()
+    for link in soup.select('a[href]'):
+        href = link.get('href')
+        match = ASIA_CARD_LINK.search(href)
+        if not match or int(match.group(1)) in seen:
+            continue
+        card_id = int(match.group(1))
+        seen.add(card_id)
+
+        entry = {'cardId': card_id, 'url': urllib.parse.urljoin(base_url, href)}
+        image = link.find('img')
+        name = (image.get('alt') if image else None) or link.get_text(strip=True)
+        if name:
+            entry['name'] = name.strip()
+        image_src = (image.get('data-src') or image.get('src')) if image else None
+        if image_src:
+            entry['imageUrl'] = urllib.parse.urljoin(base_url, image_src)
+        entries.append(entry)
+
+    pages = [int(page) for page in ASIA_PAGE_LINK.findall(html_text)]
+    return entries, max(pages) if pages else None
+
+
+def parse_japan_listing(json_text: str, base_url: str,
+                        parser_backend: str = DEFAULT_PARSER_BACKEND) -> Tuple[List[ListingEntry], Optional[int]]:
+    """
+    Card entries in one page of the JP card search result API
+
+    Returns:
+        (entries, last page number or None)
+    """
+    data = json.loads(json_text)
+    entries = []
+    for card in data.get('cardList') or []:
+        card_id = str(card.get('cardID', '')).strip()
+        if not card_id.isdigit():
+            continue
+        entry = {'cardId': int(card_id)}
+        name = card.get('cardNameViewText') or card.get('cardNameAltText')
+        if name:
+            entry['name'] = name
+        if card.get('cardThumbFile'):
+            entry['imageUrl'] = urllib.parse.urljoin(base_url, card['cardThumbFile'])
+        entries.append(entry)
+
+    max_page = data.get('maxPage')
+    return entries, int(max_page) if str(max_page or '').isdigit() else None
+
+
+class ListingSource(NamedTuple):
+    url: str                    # Listing URL with {expansion} and {page} placeholders
+    parse: Callable[..., Tuple[List[ListingEntry], Optional[int]]]
+
+
+# Keyed by region directory name (scraper.cards_dir.name)
+LISTING_SOURCES: Dict[str, ListingSource] = {
+    'japan': ListingSource(
+        'https://www.pokemon-card.com/card-search/resultAPI.php'
+        '?keyword=&se_ta=&regulation_sidebar_form=all&pg={expansion}&illust=&sm_and_keyword=true&page={page}',
+        parse_japan_listing
+    ),
+    'hongkong': ListingSource(
+        'https://asia.pokemon-card.com/hk/card-search/list/?expansionCodes={expansion}&pageNo={page}',
+        parse_asia_listing
+    ),
+    'english': ListingSource(
+        'https://asia.pokemon-card.com/hk-en/card-search/list/?expansionCodes={expansion}&pageNo={page}',
+        parse_asia_listing
+    ),
+}
+
+_thread_local = threading.local()
+
+
+def _get_session(user_agent: str) -> requests.Session:
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = user_agent
+        _thread_local.session = session
+    return session
+
+
+def harvest_expansion(scraper: Any, expansion: str, max_pages: int = MAX_PAGES) -> List[ListingEntry]:
+    """
+    Walk an expansion's listing pages and collect its cards
+
+    Args:
+        scraper: JapaneseCardScraper, HkCardScraper or EnglishCardScraper
+        expansion: Expansion code (HK/EN) or product group code (JP)
+        max_pages: Stop after this many pages
+
+    Returns:
+        Listing entries in listing order (cardId plus summary fields)
+    """
+    source = LISTING_SOURCES[scraper.cards_dir.name]
+    session = _get_session(scraper.user_agent)
+    entries: Dict[int, ListingEntry] = {}
+    page, last_page = 1, max_pages
+
+    while page <= last_page:
+        url = source.url.format(expansion=urllib.parse.quote(expansion), page=page)
+        response = request_with_retry(
+            lambda: session.get(url, timeout=15), url, scraper.rate_limiter, scraper.retry_policy
+        )
+        page_entries, page_count = source.parse(response.text, url, scraper.parser_backend)
+
+        # Past the last page the sites repeat it or return nothing
+        new_entries = [entry for entry in page_entries if entry['cardId'] not in entries]
+        if not new_entries:
+            break
+        for entry in new_entries:
+            entry['expansionCode'] = expansion
+            entries[entry['cardId']] = entry
+        if page_count:
+            last_page = min(page_count, max_pages)
+        if not scraper.quiet:
+            logger.info(f"Listing {expansion} page {page}/{last_page}: {len(new_entries)} cards")
+        page += 1
+
+    logger.info(f"Harvested {len(entries)} cards for {expansion} from {page - 1} listing pages")
+    return list(entries.values())
+
+
+def save_listing(data_root: Path, region: str, expansion: str, entries: List[ListingEntry]) -> Path:
+    """Save an expansion's listing entries (data/listings/{region}/{expansion}.json)"""
+    path = Path(data_root) / LISTINGS_DIR / region / f"{safe_expansion_name(expansion)}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'region': region,
+            'expansion': expansion,
+            'harvestedAt': datetime.now().isoformat(),
+            'cards': entries
+        }, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def harvest_card_ids(scraper: Any, expansions: Sequence[str], max_pages: int = MAX_PAGES) -> List[int]:
+    """
+    Harvest the card IDs of several expansions, saving each listing
+
+    Args:
+        scraper: Scraper instance for the region
+        expansions: Expansion codes (HK/EN) or product group codes (JP)
+        max_pages: Page limit per expansion
+
+    Returns:
+        Sorted unique card IDs, ready for scrape_batch
+    """
+    card_ids = set()
+    for expansion in expansions:
+        try:
+            entries = harvest_expansion(scraper, expansion, max_pages)
+        except Exception as e:
+            logger.error(f"✗ Error harvesting listing for {expansion}: {e}")
+            continue
+        if entries:
+            save_listing(scraper.data_root, scraper.cards_dir.name, expansion, entries)
+        card_ids.update(entry['cardId'] for entry in entries)
+    return sorted(card_ids)
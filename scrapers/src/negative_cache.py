@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Negative Result Cache for PTCG_2026 scrapers
+Remembers card IDs whose page held no card (empty page, no name heading), so
+full ID sweeps stop spending requests on them
+
+Features:
+- Exact backing set in SQLite (data/html/.negative/{region}.sqlite) with the
+  time each ID was last probed
+- In-memory bloom filter in front of it: IDs never seen empty (most of a
+  sweep's real cards) are cleared without touching SQLite
+- Entries expire after a TTL, after which the ID is probed again (new cards
+  are published under IDs that used to be empty)
+- An ID that turns out to hold a card is removed from the set
+- Entries carry the scraper's EXTRACTOR_VERSION; entries from other versions
+  are dropped on open, so an extractor fix re-probes the pages it misread
+- Callers skip the filter for cache-only runs and explicitly requested IDs
+  (see pending_ids)
+- Thread-safe; parse worker processes never open it (the parent records empty
+  pages around the process pool, as with record_cache.py)
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Collection, Dict, Iterable, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+NEGATIVE_DIR = '.negative'
+
+# Days before an empty ID is probed again
+DEFAULT_TTL_DAYS = 7.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS empty_ids (
+    card_id INTEGER PRIMARY KEY,
+    checked_at REAL NOT NULL,
+    version TEXT NOT NULL DEFAULT ''
+);
+"""
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over integer keys (no deletes; false positives only)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Size the filter
+
+        Args:
+            capacity: Keys expected; more keys raise the false positive rate
+            error_rate: Target false positive rate at capacity
+        """
+        # Standard sizing: m = -n ln p / (ln 2)^2, k = m/n ln 2
+        self.size = max(1024, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / max(capacity, 1) * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: int) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def _positions(self, key: int) -> Iterator[int]:
+        # Double hashing (Kirsch-Mitzenmacher) from one 128-bit digest
+        digest = hashlib.blake2b(str(key).encode('ascii'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+
+class NegativeCache:
+    """Card IDs of one region known to hold no card"""
+
+    def __init__(self, path: Path, version: str, ttl_days: float = DEFAULT_TTL_DAYS):
+        """
+        Open (or create) a negative cache
+
+        Args:
+            path: SQLite file
+            version: Scraper EXTRACTOR_VERSION; entries from other versions are dropped
+            ttl_days: Days an empty ID is skipped before it is probed again
+        """
+        self.path = Path(path)
+        self.version = str(version)
+        self.ttl = ttl_days * 86400
+        self.skipped = 0
+        self.added = 0
+        self.cleared = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(empty_ids)')}
+        with self._conn:
+            if 'version' not in columns:
+                self._conn.execute("ALTER TABLE empty_ids ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+            dropped = self._conn.execute('DELETE FROM empty_ids WHERE version != ?', (self.version,)).rowcount
+        if dropped:
+            logger.info(f"Negative cache {self.path.name}: dropped {dropped} empty IDs from older extractor versions")
+
+        count = self._conn.execute('SELECT COUNT(*) FROM empty_ids').fetchone()[0]
+        # Room to grow during the run before the false positive rate climbs
+        self._bloom = BloomFilter(max(count * 2, 100000))
+        for (card_id,) in self._conn.execute('SELECT card_id FROM empty_ids'):
+            self._bloom.add(card_id)
+        if count:
+            logger.info(f"Negative cache {self.path.name}: {count} empty card IDs")
+
+    def is_empty(self, card_id: int, now: Optional[float] = None) -> bool:
+        """Whether an ID was probed empty within the TTL"""
+        if card_id not in self._bloom:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT checked_at FROM empty_ids WHERE card_id = ? AND version = ?', (card_id, self.version)
+            ).fetchone()
+        return row is not None and (now or time.time()) - row[0] < self.ttl
+
+    def pending_ids(self, card_ids: Iterable[int], requested: Collection[int] = ()) -> List[int]:
+        """
+        Card IDs not known to be empty (expired entries are probed again)
+
+        Args:
+            card_ids: Card IDs of the run
+            requested: IDs asked for explicitly (--ids), never skipped
+        """
+        now = time.time()
+        pending = []
+        skipped = 0
+        for card_id in card_ids:
+            if card_id not in requested and self.is_empty(card_id, now):
+                skipped += 1
+                continue
+            pending.append(card_id)
+        self.skipped += skipped
+        if skipped:
+            logger.info(f"Negative cache {self.path.name}: skipping {skipped} IDs whose page held no card "
+                        f"(--no-negative-cache or --refresh-cache to probe them)")
+        return pending
+
+    def add(self, card_id: int) -> None:
+        """Record that an ID's page holds no card"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO empty_ids (card_id, checked_at, version) VALUES (?, ?, ?)',
+                (card_id, time.time(), self.version)
+            )
+            self._bloom.add(card_id)
+            self.added += 1
+
+    def discard(self, card_id: int) -> None:
+        """Forget an ID that now holds a card"""
+        if card_id not in self._bloom:
+            return
+        with self._lock, self._conn:
+            if self._conn.execute('DELETE FROM empty_ids WHERE card_id = ?', (card_id,)).rowcount:
+                self.cleared += 1
+
+    def update(self, card_id: Optional[str], has_card: bool) -> None:
+        """Record the result of parsing an ID's page"""
+        if not card_id:
+            return
+        if has_card:
+            self.discard(int(card_id))
+        else:
+            self.add(int(card_id))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM empty_ids').fetchone()[0]
+        return {'empty_ids': count, 'skipped': self.skipped, 'added': self.added, 'cleared': self.cleared}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_negative_cache(data_root: Path, region: str, version: str, ttl_days: float = DEFAULT_TTL_DAYS) -> NegativeCache:
+    """Negative cache for a region (data/html/.negative/{region}.sqlite)"""
+    return NegativeCache(Path(data_root) / 'html' / NEGATIVE_DIR / f"{region}.sqlite", version, ttl_days)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Parse Pipeline for PTCG_2026 scrapers
+Two-stage batch scraping: I/O threads get card HTML, a process pool parses it
+
+Features:
+- Stage 1: threads read the HTML cache or fetch pages (rate limited, retried)
+- Stage 2: a ProcessPoolExecutor runs the HTML parser + the `_extract_*` methods
+  on every core, so --cache-only reprocessing is no longer GIL-bound
+- Bounded hand-off queue: I/O threads block while `max_pending` pages wait
+  for a parser, so memory stays flat however fast the cache is read
+- Works with any scraper exposing `fetch_card_html` and `parse_card_html`;
+  the async engine (fetch_engine.py) reuses the same worker pool
+- Pages whose record is in the scraper's record cache (record_cache.py) are
+  answered in the parent without a trip to the pool; workers' results update
+  the record and negative caches (negative_cache.py) in the parent
+- Each page's outcome goes to the run journal (run_journal.py) when given
+
+Sample usage:
+    python scrapers/src/japanese_card_scraper.py --id-range 1 60000 --cache-only --threads 4 --parse-workers 8
+"""
+
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack, nullcontext
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+from record_cache import content_hash
+from run_journal import EMPTY, HTTP_ERROR, OK, PARSE_ERROR
+from sampling_profiler import start_worker_profiler, worker_profile_settings
+
+logger = logging.getLogger(__name__)
+
+# Scraper instance owned by each parse worker process
+_worker_scraper = None
+
+
+def _init_parse_worker(
+    scraper_cls: type,
+    data_root: str,
+    quiet: bool,
+    parser_backend: str,
+    partial_parse: bool,
+    profile: Optional[Tuple[str, float]] = None
+) -> None:
+    global _worker_scraper
+    if profile is not None:
+        start_worker_profiler(*profile)
+    _worker_scraper = scraper_cls(data_root)
+    _worker_scraper.quiet = quiet
+    _worker_scraper.parser_backend = parser_backend
+    _worker_scraper.partial_parse = partial_parse
+
+
+def parse_in_worker(html_text: str, card_url: str) -> Optional[Dict[str, Any]]:
+    """Parse one page in a worker process (None if it holds no valid card; extractor errors propagate)"""
+    return _worker_scraper.parse_card_html(html_text, card_url)
+
+
+def bounded_as_completed(executor: Executor, func: Callable, items: Iterable[Any], max_pending: int) -> Iterator[Any]:
+    """
+    Like submitting every item and iterating as_completed, but with at most
+    `max_pending` tasks queued, so results never pile up in finished futures
+    """
+    pending = set()
+    for item in items:
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(func, item))
+    for future in wait(pending).done:
+        yield future.result()
+
+
+def lookup_record(scraper: Any, html_text: str, card_url: str) -> Tuple[Optional[bytes], Optional[Dict[str, Any]]]:
+    """
+    Check the scraper's record cache before sending a page to a worker
+
+    Returns:
+        (content hash, cached record); the hash is None when the scraper has no record cache
+    """
+    if scraper.record_cache is None:
+        return None, None
+    digest = content_hash(html_text)
+    return digest, scraper.record_cache.get(card_url, digest)
+
+
+def store_record(scraper: Any, card_url: str, digest: Optional[bytes], data: Optional[Dict[str, Any]]) -> None:
+    """Save a worker's result in the scraper's record cache (and empty pages in its negative cache)"""
+    if digest is not None and data:
+        scraper.record_cache.put(card_url, digest, data)
+    if scraper.negative_cache is not None:
+        scraper.negative_cache.update(scraper._extract_card_id_from_url(card_url), bool(data))
+
+
+def create_parse_pool(scraper: Any, workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Start parse worker processes, each with its own instance of the scraper's class
+
+    Args:
+        scraper: Scraper whose class, data root, quiet flag and parser settings the workers copy
+        workers: Number of processes (defaults to the CPU count)
+
+    Workers sample themselves when the pool is created during a --profile run
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        initializer=_init_parse_worker,
+        initargs=(type(scraper), str(scraper.data_root), scraper.quiet, scraper.parser_backend, scraper.partial_parse,
+                  worker_profile_settings())
+    )
+
+
+def scrape_batch_pipelined(
+    urls: Iterable[str],
+    scraper: Any,
+    cache_html: bool = True,
+    refresh_cache: bool = False,
+    cache_only: bool = False,
+    io_threads: int = 1,
+    parse_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    sink: Optional[Any] = None,
+    journal: Optional[Any] = None,
+    parse_pool: Optional[Executor] = None,
+    io_pool: Optional[Executor] = None
+) -> List[Dict[str, Any]]:
+    """
+    Scrape card URLs with fetching and parsing in separate stages
+
+    Args:
+        urls: Card detail URLs
+        scraper: JapaneseCardScraper, HkCardScraper or EnglishCardScraper
+        cache_html: Save HTML to cache
+        refresh_cache: Force re-fetch
+        cache_only: Only use cache
+        io_threads: Threads reading the cache / fetching pages
+        parse_workers: Parser processes (defaults to the CPU count)
+        max_pending: Pages allowed to wait for a parser (defaults to 4 per worker)
+        sink: JsonlCardSink that receives each card as it completes (nothing is returned)
+        journal: RunJournal that records each page's outcome
+        parse_pool: Pool from create_parse_pool to reuse (left running; its pages are waited for)
+        io_pool: Thread pool to read / fetch in instead of starting one (left running)
+
+    Returns:
+        List of scraped card data (empty when streaming to a sink)
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    max_pending = max_pending or parse_workers * 4
+    slots = threading.BoundedSemaphore(max_pending)
+    results = []
+    results_lock = threading.Lock()
+
+    def emit(url: str, data: Optional[Dict[str, Any]]) -> None:
+        if data:
+            if sink is not None:
+                sink.add(data)
+            else:
+                with results_lock:
+                    results.append(data)
+        if journal is not None:
+            journal.record(url, OK if data else EMPTY)
+
+    def on_parsed(url: str, digest: Optional[bytes], future: Future) -> None:
+        try:
+            data = future.result()
+        except Exception as e:
+            if not scraper.quiet:
+                logger.error(f"✗ Error parsing {url}: {e}")
+            if journal is not None:
+                journal.record(url, PARSE_ERROR, str(e))
+        else:
+            store_record(scraper, url, digest, data)
+            emit(url, data)
+        finally:
+            slots.release()
+
+    with ExitStack() as stack:
+        pool = parse_pool or stack.enter_context(create_parse_pool(scraper, parse_workers))
+        def fetch_one(url: str) -> None:
+            try:
+                html_text = scraper.fetch_card_html(url, cache_html, refresh_cache, cache_only)
+            except Exception as e:
+                if not scraper.quiet:
+                    logger.error(f"✗ Error scraping {url}: {e}")
+                if journal is not None:
+                    journal.record(url, HTTP_ERROR, str(e))
+                return
+            if html_text is None:
+                return
+            digest, data = lookup_record(scraper, html_text, url)
+            if data is not None:
+                emit(url, data)
+                return
+            # Backpressure: wait for a free slot before queueing more work
+            slots.acquire()
+            pool.submit(parse_in_worker, html_text, url).add_done_callback(partial(on_parsed, url, digest))
+
+        with nullcontext(io_pool) if io_pool is not None else ThreadPoolExecutor(max_workers=max(1, io_threads)) as io:
+            for _ in bounded_as_completed(io, fetch_one, urls, max(1, io_threads) * 4):
+                pass
+
+        # Every slot back means every page queued to the pool was handled
+        for _ in range(max_pending):
+            slots.acquire()
+
+    return results
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Backends for PTCG_2026 scrapers
+Builds the document tree that the scrapers' `_extract_*` methods query
+
+Backends:
+- bs4: BeautifulSoup on lxml (or html.parser) - the reference implementation
+- lxml: native lxml tree wrapped in a small BeautifulSoup-compatible API
+  (find / find_all / select / get_text / strings / ...), several times faster to build
+  and query. It follows BeautifulSoup's rules for strings (script/style/rt
+  text, whitespace-only strings, multi-valued class attributes), so the
+  extractors return identical card dicts on either backend.
+
+Only the subset of the BeautifulSoup API used by the scrapers is provided;
+`select` supports type, class, id and attribute selectors with descendant
+and child combinators.
+
+Partial parsing (--partial-parse): with `parse_only`, the bs4 backend builds
+only the subtrees of tags matching a scraper's PARSE_ONLY selectors; the rest
+of the page is tokenized but never turned into a tree. The lxml backend
+always builds the whole (already cheap) tree.
+"""
+
+import importlib.util
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+import logging
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Check for lxml
+_HAS_LXML = importlib.util.find_spec('lxml') is not None
+if _HAS_LXML:
+    from lxml import etree
+
+_BS4_PARSER = 'lxml' if _HAS_LXML else 'html.parser'
+
+# bs4 >= 4.13 filters tags during the parse through ElementFilter subclasses;
+# older versions call a SoupStrainer name function with (name, attrs)
+_HAS_ELEMENT_FILTER = importlib.util.find_spec('bs4.filter') is not None
+if _HAS_ELEMENT_FILTER:
+    from bs4.filter import ElementFilter
+else:
+    from bs4 import SoupStrainer
+
+# tag, tag.class, tag[attr="v"], tag[attr^="v"], tag[attr*="v"] (PARSE_ONLY selectors)
+_PARSE_ONLY_SELECTOR = re.compile(r'^(\w+)?(?:\.([\w-]+))?(?:\[([\w-]+)([\^*]?=)"([^"]*)"\])?$')
+
+PARSER_BACKENDS = ['bs4', 'lxml']
+DEFAULT_PARSER_BACKEND = 'bs4'
+
+# BeautifulSoup's HTML rules (bs4.builder.HTMLTreeBuilder)
+_STRING_CONTAINERS = frozenset(['rt', 'rp', 'style', 'script', 'template'])
+_PRESERVE_WHITESPACE = frozenset(['pre', 'textarea'])
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+_LIST_ATTRIBUTES = {
+    '*': {'class', 'accesskey', 'dropzone'},
+    'a': {'rel', 'rev'},
+    'link': {'rel', 'rev'},
+    'td': {'headers'},
+    'th': {'headers'},
+    'form': {'accept-charset'},
+    'object': {'archive'},
+    'area': {'rel'},
+    'icon': {'sizes'},
+    'iframe': {'sandbox'},
+    'output': {'for'},
+}
+
+if _HAS_LXML:
+    _MAIN_TEXT = etree.XPath(
+        'descendant-or-self::text()[not(%s)]' % ' or '.join(f'ancestor::{tag}' for tag in sorted(_STRING_CONTAINERS)),
+        smart_strings=False
+    )
+
+# Tag name given to decomposed elements: they stay in the tree as a boundary
+# between the strings around them, exactly like BeautifulSoup's decompose()
+_DECOMPOSED = '_decomposed'
+
+_warned_fallback = False
+
+
+def parse_html(html_text: str, backend: str = DEFAULT_PARSER_BACKEND,
+               parse_only: Optional[Tuple[str, ...]] = None) -> Any:
+    """
+    Parse a page with the given backend
+
+    Args:
+        html_text: Page HTML
+        backend: 'bs4' or 'lxml' (falls back to bs4 when lxml is not installed)
+        parse_only: Simple selectors of the subtrees to build (bs4 backend only);
+            matching subtrees become siblings at the top of the document
+
+    Returns:
+        BeautifulSoup or LxmlDocument (same query API)
+    """
+    global _warned_fallback
+
+    if backend == 'lxml':
+        if _HAS_LXML:
+            return LxmlDocument(html_text)
+        if not _warned_fallback:
+            logger.warning("lxml not installed, using the bs4 parser backend")
+            _warned_fallback = True
+    if parse_only:
+        return BeautifulSoup(html_text, _BS4_PARSER, parse_only=_strainer(tuple(parse_only)))
+    return BeautifulSoup(html_text, _BS4_PARSER)
+
+
+def _parse_only_rule(selector: str) -> Callable[[str, Dict[str, Any]], bool]:
+    match = _PARSE_ONLY_SELECTOR.match(selector)
+    if not match:
+        raise ValueError(f"Unsupported PARSE_ONLY selector: {selector}")
+    tag, cls, attr, op, value = match.groups()
+
+    def rule(name: str, attrs: Dict[str, Any]) -> bool:
+        if tag and name != tag:
+            return False
+        if cls:
+            classes = attrs.get('class') or ''
+            if cls not in (classes.split() if isinstance(classes, str) else classes):
+                return False
+        if attr:
+            actual = attrs.get(attr)
+            if actual is None:
+                return False
+            return (actual == value if op == '=' else
+                    actual.startswith(value) if op == '^=' else value in actual)
+        return True
+    return rule
+
+
+@lru_cache(maxsize=None)
+def _strainer(selectors: Tuple[str, ...]) -> Any:
+    """parse_only filter keeping the subtrees of tags that match any selector"""
+    rules = [_parse_only_rule(selector) for selector in selectors]
+
+    def wanted(name: str, attrs: Optional[Dict[str, Any]]) -> bool:
+        attrs = attrs or {}
+        return any(rule(name, attrs) for rule in rules)
+
+    if _HAS_ELEMENT_FILTER:
+        class PartialParseFilter(ElementFilter):
+            # Only consulted outside kept subtrees: inside one, everything is built
+            def allow_tag_creation(self, nsprefix, name, attrs):
+                return wanted(name, attrs)
+
+            def allow_string_creation(self, string):
+                return False
+
+        return PartialParseFilter()
+    return SoupStrainer(wanted)
+
+
+# ============================================================================
+# MATCHING (BeautifulSoup find* semantics)
+# ============================================================================
+
+def _is_tag(node) -> bool:
+    return isinstance(node.tag, str) and node.tag != _DECOMPOSED
+
+
+def _is_list_attribute(tag: str, attr: str) -> bool:
+    return attr in _LIST_ATTRIBUTES['*'] or attr in _LIST_ATTRIBUTES.get(tag, ())
+
+
+def _attr_value(node, attr: str) -> Union[None, str, List[str]]:
+    value = node.get(attr)
+    if value is not None and _is_list_attribute(node.tag, attr):
+        return value.split()
+    return value
+
+
+def _match_value(rule, value: Optional[str]) -> bool:
+    """One string/regex/callable/bool rule against one value"""
+    if rule is True:
+        return value is not None
+    if rule is False:
+        return value is None
+    if isinstance(rule, str):
+        return rule == value
+    if hasattr(rule, 'search'):
+        return value is not None and rule.search(value) is not None
+    if callable(rule):
+        return bool(rule(value))
+    if isinstance(rule, (list, tuple, set)):
+        return any(_match_value(r, value) for r in rule)
+    return False
+
+
+def _match_attribute(rule, value: Union[None, str, List[str]]) -> bool:
+    values = value if isinstance(value, list) else [value]
+    if any(_match_value(rule, v) for v in values):
+        return True
+    # Multi-valued attributes also match as one space-joined string
+    if isinstance(value, list) and len(value) != 1:
+        return _match_value(rule, ' '.join(value))
+    return False
+
+
+def _match_name(rule, node) -> bool:
+    if rule is None or rule is True:
+        return True
+    if isinstance(rule, str):
+        return node.tag == rule
+    if isinstance(rule, (list, tuple, set)):
+        return node.tag in rule
+    if hasattr(rule, 'search'):
+        return rule.search(node.tag) is not None
+    if callable(rule):
+        return bool(rule(LxmlTag(node)))
+    return False
+
+
+class _Matcher:
+    """Compiled find* arguments"""
+
+    def __init__(self, name=None, attrs=None, string=None, **kwargs):
+        self.name = name
+        self.string = string
+        self.attrs = dict(attrs or {})
+        for key, value in kwargs.items():
+            self.attrs['class' if key == 'class_' else key] = value
+
+        # Plain tag names are filtered by lxml's iterators instead of in Python
+        if isinstance(name, str):
+            self.tags: Tuple[Any, ...] = (name,)
+        elif isinstance(name, (list, tuple, set)) and all(isinstance(n, str) for n in name):
+            self.tags = tuple(name)
+        else:
+            self.tags = (etree.Element,)
+
+    def __call__(self, node) -> bool:
+        if not _is_tag(node) or (self.tags[0] is etree.Element and not _match_name(self.name, node)):
+            return False
+        for attr, rule in self.attrs.items():
+            if not _match_attribute(rule, _attr_value(node, attr)):
+                return False
+        if self.string is not None:
+            text = _string(node)
+            if text is None or not _match_value(self.string, text):
+                return False
+        return True
+
+
+# ============================================================================
+# STRINGS (BeautifulSoup NavigableString semantics)
+# ============================================================================
+
+def _collapse(text: str, preserve: bool) -> str:
+    """BeautifulSoup turns whitespace-only strings into a single space or newline"""
+    if preserve or text.strip(_ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
+
+
+def _context(node) -> Tuple[Optional[str], bool]:
+    """Innermost string container and whitespace preservation above a node"""
+    container = None
+    preserve = False
+    for ancestor in node.iterancestors():
+        if container is None and ancestor.tag in _STRING_CONTAINERS:
+            container = ancestor.tag
+        if ancestor.tag in _PRESERVE_WHITESPACE:
+            preserve = True
+    return container, preserve
+
+
+def _collect_strings(node, container: Optional[str], preserve: bool, out: List[Tuple[str, Optional[str]]]) -> None:
+    """Append (string, container) for every text node under `node` in document order"""
+    tag = node.tag
+    if tag in _STRING_CONTAINERS:
+        container = tag
+    if tag in _PRESERVE_WHITESPACE:
+        preserve = True
+    if node.text and tag != _DECOMPOSED:
+        out.append((_collapse(node.text, preserve), container))
+    for child in node:
+        if _is_tag(child):
+            _collect_strings(child, container, preserve, out)
+        if child.tail:
+            out.append((_collapse(child.tail, preserve), container))
+
+
+def _strings(node) -> List[str]:
+    """Strings get_text() considers for a node (main content or its own container type)"""
+    container, preserve = _context(node)
+    if (container is None and not preserve and node.tag not in _STRING_CONTAINERS
+            and next(node.iter(*_PRESERVE_WHITESPACE), None) is None):
+        # Common case: libxml2 collects the text nodes outside script/style/rt/...
+        return [_collapse(text, False) for text in _MAIN_TEXT(node)]
+    collected: List[Tuple[str, Optional[str]]] = []
+    _collect_strings(node, container, preserve, collected)
+    wanted = node.tag if node.tag in _STRING_CONTAINERS else None
+    return [text for text, kind in collected if kind == wanted]
+
+
+def _contents(node) -> List[Any]:
+    """Child nodes as BeautifulSoup sees them: strings and elements (incl. comments)"""
+    contents: List[Any] = []
+    if node.text:
+        contents.append(node.text)
+    for child in node:
+        if child.tag != _DECOMPOSED:
+            contents.append(child)
+        if child.tail:
+            contents.append(child.tail)
+    return contents
+
+
+def _string(node) -> Optional[str]:
+    """BeautifulSoup's Tag.string: the only string inside a chain of single children"""
+    preserve = _context(node)[1] or node.tag in _PRESERVE_WHITESPACE
+    while True:
+        contents = _contents(node)
+        if len(contents) != 1:
+            return None
+        child = contents[0]
+        if isinstance(child, str):
+            return _collapse(child, preserve)
+        if not isinstance(child.tag, str):
+            return child.text  # Comment / processing instruction
+        node = child
+        if node.tag in _PRESERVE_WHITESPACE:
+            preserve = True
+
+
+# ============================================================================
+# CSS SELECTORS → XPATH
+# ============================================================================
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s*(?P<comb>[>,])\s*|\s+)
+  | (?P<type>[a-zA-Z][\w-]*|\*)
+  | \.(?P<cls>[\w-]+)
+  | \#(?P<id>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+))\s*)?\]
+""", re.VERBOSE)
+
+
+def _xpath_literal(value: str) -> str:
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return 'concat(' + ", \"'\", ".join(f"'{part}'" for part in parts) + ')'
+
+
+def _attribute_xpath(attr: str, op: Optional[str], value: Optional[str]) -> str:
+    # Multi-valued attributes are matched as their space-joined values
+    ref = f'normalize-space(@{attr})' if attr in _LIST_ATTRIBUTES['*'] else f'@{attr}'
+    if op is None:
+        return f'@{attr}'
+    literal = _xpath_literal(value)
+    if op == '=':
+        return f'@{attr} and {ref} = {literal}'
+    if not value and op in ('^=', '$=', '*=', '~='):
+        return 'false()'
+    if op == '^=':
+        return f'starts-with({ref}, {literal})'
+    if op == '$=':
+        return f'substring({ref}, string-length({ref}) - {len(value) - 1}) = {literal}'
+    if op == '*=':
+        return f'contains({ref}, {literal})'
+    if op == '~=':
+        return f"contains(concat(' ', normalize-space(@{attr}), ' '), {_xpath_literal(' ' + value + ' ')})"
+    # |=
+    return f"(@{attr} = {literal} or starts-with(@{attr}, {_xpath_literal(value + '-')}))"
+
+
+def _compound_xpath(type_name: str, predicates: List[str]) -> str:
+    return type_name + ''.join(f'[{pred}]' for pred in predicates)
+
+
+@lru_cache(maxsize=256)
+def _compile_selector(selector: str, include_self: bool):
+    """Translate a CSS selector group into an XPath evaluated from the scope element"""
+    groups: List[List[Tuple[str, str]]] = []  # [(combinator before, compound xpath)]
+    compounds: List[Tuple[str, str]] = []
+    state = {'type': None, 'predicates': [], 'combinator': ' '}
+
+    def flush() -> None:
+        if state['type'] is None and not state['predicates']:
+            return
+        compounds.append((state['combinator'], _compound_xpath(state['type'] or '*', state['predicates'])))
+        state.update(type=None, predicates=[], combinator=' ')
+
+    selector = selector.strip()
+    pos = 0
+    while pos < len(selector):
+        match = _TOKEN_RE.match(selector, pos)
+        if not match:
+            raise ValueError(f"Unsupported CSS selector: {selector!r}")
+        pos = match.end()
+        if match.group('ws') is not None:
+            flush()
+            comb = match.group('comb')
+            if comb == ',':
+                groups.append(compounds)
+                compounds = []
+            elif comb == '>':
+                state['combinator'] = '>'
+        elif match.group('type'):
+            state['type'] = match.group('type').lower()
+        elif match.group('cls'):
+            state['predicates'].append(
+                f"contains(concat(' ', normalize-space(@class), ' '), {_xpath_literal(' ' + match.group('cls') + ' ')})"
+            )
+        elif match.group('id'):
+            state['predicates'].append(f"@id = {_xpath_literal(match.group('id'))}")
+        else:
+            value = next((v for v in (match.group('dq'), match.group('sq'), match.group('bare')) if v is not None), None)
+            state['predicates'].append(_attribute_xpath(match.group('attr').lower(), match.group('op'), value))
+    flush()
+    groups.append(compounds)
+
+    axis = 'descendant-or-self::' if include_self else 'descendant::'
+    paths = []
+    for compounds in groups:
+        if not compounds:
+            raise ValueError(f"Unsupported CSS selector: {selector!r}")
+        # Each compound constrains the next one through an ancestor/parent test
+        xpath = None
+        for combinator, compound in compounds:
+            if xpath is None:
+                xpath = compound
+            else:
+                relation = 'parent::' if combinator == '>' else 'ancestor::'
+                xpath = f'{compound}[{relation}{xpath}]'
+        paths.append(axis + xpath)
+    return etree.XPath(' | '.join(paths))
+
+
+# ============================================================================
+# TREE API
+# ============================================================================
+
+class _LxmlNode:
+    """Query methods shared by the document and its tags"""
+
+    _node = None
+
+    def _scope(self, tags: Tuple[Any, ...] = ()) -> Iterator[Any]:
+        raise NotImplementedError
+
+    def _include_self(self) -> bool:
+        return False
+
+    def find(self, name=None, attrs=None, string=None, **kwargs) -> Optional['LxmlTag']:
+        matcher = _Matcher(name, attrs, string, **kwargs)
+        for node in self._scope(matcher.tags):
+            if matcher(node):
+                return LxmlTag(node)
+        return None
+
+    def find_all(self, name=None, attrs=None, string=None, limit=None, **kwargs) -> List['LxmlTag']:
+        matcher = _Matcher(name, attrs, string, **kwargs)
+        results = []
+        for node in self._scope(matcher.tags):
+            if matcher(node):
+                results.append(LxmlTag(node))
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+    def select(self, selector: str) -> List['LxmlTag']:
+        if self._node is None:
+            return []
+        xpath = _compile_selector(selector, self._include_self())
+        return [LxmlTag(node) for node in xpath(self._node) if _is_tag(node)]
+
+    def select_one(self, selector: str) -> Optional['LxmlTag']:
+        results = self.select(selector)
+        return results[0] if results else None
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        if self._node is None:
+            return ''
+        strings = _strings(self._node)
+        if strip:
+            strings = [text.strip() for text in strings]
+            strings = [text for text in strings if text]
+        return separator.join(strings)
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    @property
+    def strings(self) -> Iterator[str]:
+        return iter(_strings(self._node) if self._node is not None else ())
+
+
+class LxmlDocument(_LxmlNode):
+    """Parsed page (counterpart of the BeautifulSoup object)"""
+
+    name = '[document]'
+
+    def __init__(self, html_text: str):
+        if html_text.startswith('\ufeff'):
+            html_text = html_text[1:]
+        try:
+            root = etree.fromstring(html_text, etree.HTMLParser())
+        except ValueError:
+            # Unicode input with an encoding declaration
+            root = etree.fromstring(html_text.encode('utf-8'), etree.HTMLParser(encoding='utf-8'))
+        self._node = root
+
+    def _scope(self, tags: Tuple[Any, ...] = ()) -> Iterator[Any]:
+        if self._node is None:
+            return iter(())
+        return self._node.iter(*(tags or (etree.Element,)))
+
+    def _include_self(self) -> bool:
+        return True
+
+    @property
+    def parent(self) -> None:
+        return None
+
+
+class LxmlTag(_LxmlNode):
+    """One element (counterpart of bs4.element.Tag)"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    def __repr__(self) -> str:
+        return f"<LxmlTag {self._node.tag}>"
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, LxmlTag) and other._node is self._node
+
+    def __hash__(self) -> int:
+        return hash(self._node)
+
+    def _scope(self, tags: Tuple[Any, ...] = ()) -> Iterator[Any]:
+        return self._node.iterdescendants(*(tags or (etree.Element,)))
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    @property
+    def string(self) -> Optional[str]:
+        return _string(self._node)
+
+    @property
+    def parent(self) -> Union['LxmlTag', None]:
+        parent = self._node.getparent()
+        return LxmlTag(parent) if parent is not None else None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = _attr_value(self._node, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = _attr_value(self._node, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def has_attr(self, key: str) -> bool:
+        return self._node.get(key) is not None
+
+    def find_parent(self, name=None, attrs=None, **kwargs) -> Optional['LxmlTag']:
+        matcher = _Matcher(name, attrs, **kwargs)
+        for node in self._node.iterancestors(*matcher.tags):
+            if matcher(node):
+                return LxmlTag(node)
+        return None
+
+    def find_next_sibling(self, name=None, attrs=None, string=None, **kwargs) -> Optional['LxmlTag']:
+        matcher = _Matcher(name, attrs, string, **kwargs)
+        for node in self._node.itersiblings(*matcher.tags):
+            if matcher(node):
+                return LxmlTag(node)
+        return None
+
+    def find_next(self, name=None, attrs=None, string=None, **kwargs) -> Optional['LxmlTag']:
+        matcher = _Matcher(name, attrs, string, **kwargs)
+        for node in self._following(matcher.tags):
+            if matcher(node):
+                return LxmlTag(node)
+        return None
+
+    def decompose(self) -> None:
+        """Remove the element but keep the strings around it separate"""
+        node = self._node
+        for child in list(node):
+            node.remove(child)
+        node.attrib.clear()
+        node.text = None
+        node.tag = _DECOMPOSED
+
+    def _following(self, tags: Tuple[Any, ...]) -> Iterator[Any]:
+        """Elements after this one's start tag, in document order"""
+        yield from self._node.iterdescendants(*tags)
+        node = self._node
+        while node is not None:
+            for sibling in node.itersiblings(etree.Element):
+                yield from sibling.iter(*tags)
+            node = node.getparent()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Per-host Rate Limiter for PTCG_2026 scrapers
+Process-wide token buckets shared by every scraper, thread and event loop
+
+Features:
+- One token bucket per host (www.pokemon-card.com, asia.pokemon-card.com)
+- Configurable sustained rate and burst size
+- Works from worker threads (blocking) and asyncio tasks (non-blocking)
+- AIMD controller per host: backs off when errors rise, recovers when healthy
+- pause(): holds a host's bucket for a server's Retry-After, so every thread
+  and task waits it out instead of only the request that was throttled
+
+The request budget belongs to the host, not to a thread: raising --threads or
+--concurrency never raises the real request rate above the configured value.
+"""
+
+import asyncio
+import threading
+import time
+import urllib.parse
+from collections import deque
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default budget for hosts that were never configured (one request per 0.8s)
+DEFAULT_RATE = 1.25
+DEFAULT_BURST = 1
+
+
+class TokenBucket:
+    """Thread-safe token bucket using reservations (tokens may go negative)"""
+
+    def __init__(self, rate: Optional[float], burst: int = DEFAULT_BURST):
+        """
+        Initialize bucket
+
+        Args:
+            rate: Sustained requests per second (None or <= 0 disables limiting)
+            burst: Maximum tokens accumulated while idle
+        """
+        self._lock = threading.Lock()
+        self.rate = rate if rate and rate > 0 else None
+        self.max_rate = self.rate  # Configured ceiling; `rate` may be lowered by AIMD
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()  # Lies in the future while the bucket is paused
+
+    def _refill(self, now: float) -> None:
+        # No tokens accrue while paused
+        if now > self._updated:
+            if self.rate is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds the caller must wait"""
+        with self._lock:
+            now = time.monotonic()
+            paused = max(0.0, self._updated - now)
+            if self.rate is None:
+                return paused
+            self._refill(now)
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return paused
+            return paused + -self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no token for `seconds`; reservations made meanwhile queue behind it at the normal rate"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._updated = max(self._updated, now + seconds)
+
+    def configure(self, rate: Optional[float], burst: int) -> None:
+        """Set a new configured rate ceiling and burst"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = self.max_rate = rate if rate and rate > 0 else None
+            self.burst = max(1, int(burst))
+            self._tokens = min(self._tokens, self.burst)
+
+    def set_rate(self, rate: float) -> None:
+        """Change the effective rate (kept within the configured ceiling)"""
+        with self._lock:
+            if self.max_rate is None:
+                return
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, rate)
+
+    def acquire(self) -> float:
+        """Block the calling thread until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Wait on the event loop until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class AimdController:
+    """Additive-increase / multiplicative-decrease control of a bucket's rate"""
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        increase_fraction: float = 0.02,
+        decrease_factor: float = 0.5,
+        min_fraction: float = 0.05,
+        window: int = 20,
+        error_threshold: float = 0.2,
+        cooldown: float = 5.0
+    ):
+        """
+        Initialize controller
+
+        Args:
+            bucket: Token bucket whose effective rate is adjusted
+            increase_fraction: Share of the ceiling added back per healthy response
+            decrease_factor: Multiplier applied to the rate when errors rise
+            min_fraction: Lowest rate allowed, as a share of the ceiling
+            window: Number of recent responses used for the error rate
+            error_threshold: Error rate in the window that triggers a decrease
+            cooldown: Minimum seconds between two decreases
+        """
+        self.bucket = bucket
+        self.increase_fraction = increase_fraction
+        self.decrease_factor = decrease_factor
+        self.min_fraction = min_fraction
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._last_decrease = 0.0
+
+    def record(self, ok: bool) -> None:
+        """Record one response outcome (ok=False for 429/5xx/connection errors)"""
+        ceiling = self.bucket.max_rate
+        if ceiling is None:
+            return
+
+        with self._lock:
+            self._outcomes.append(ok)
+            current = self.bucket.rate
+            if not ok:
+                error_rate = self._outcomes.count(False) / len(self._outcomes)
+                now = time.monotonic()
+                if error_rate >= self.error_threshold and now - self._last_decrease >= self.cooldown:
+                    new_rate = max(ceiling * self.min_fraction, current * self.decrease_factor)
+                    self.bucket.set_rate(new_rate)
+                    self._last_decrease = now
+                    self._outcomes.clear()
+                    logger.warning(f"Throttling down: {current:.2f} → {new_rate:.2f} req/s "
+                                   f"(error rate {error_rate:.0%})")
+            elif current < ceiling:
+                self.bucket.set_rate(current + ceiling * self.increase_fraction)
+
+
+class HostRateLimiter:
+    """Registry of token buckets keyed by host"""
+
+    def __init__(self, default_rate: Optional[float] = DEFAULT_RATE, default_burst: int = DEFAULT_BURST):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._controllers: Dict[str, AimdController] = {}
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        """Normalize a URL or bare host name to a bucket key"""
+        if '://' in url_or_host:
+            return urllib.parse.urlsplit(url_or_host).netloc.lower()
+        return url_or_host.lower()
+
+    def configure(self, url_or_host: str, rate: Optional[float], burst: int = DEFAULT_BURST) -> TokenBucket:
+        """Set the sustained rate and burst for a host"""
+        host = self.host_of(url_or_host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            else:
+                bucket.configure(rate, burst)
+        logger.debug(f"Rate limit for {host}: {rate} req/s, burst {burst}")
+        return bucket
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        """Get the bucket for a host, creating it with defaults if needed"""
+        host = self.host_of(url_or_host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.default_rate, self.default_burst)
+            return bucket
+
+    def acquire(self, url: str) -> float:
+        """Block until the URL's host has budget for one request"""
+        return self.bucket(url).acquire()
+
+    async def acquire_async(self, url: str) -> float:
+        """Async variant of `acquire`"""
+        return await self.bucket(url).acquire_async()
+
+    def pause(self, url: str, seconds: float) -> None:
+        """Stop all requests to the URL's host for `seconds` (a server's Retry-After)"""
+        self.bucket(url).pause(seconds)
+        logger.warning(f"Pausing requests to {self.host_of(url)} for {seconds:.1f}s (Retry-After)")
+
+    def record(self, url: str, ok: bool) -> None:
+        """Feed a response outcome to the host's AIMD controller"""
+        bucket = self.bucket(url)
+        host = self.host_of(url)
+        with self._lock:
+            controller = self._controllers.get(host)
+            if controller is None:
+                controller = self._controllers[host] = AimdController(bucket)
+        controller.record(ok)
+
+
+_shared_limiter = HostRateLimiter()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Return the process-wide limiter shared by all scrapers"""
+    return _shared_limiter
+
+
+def rate_from_interval(min_request_interval: float) -> Optional[float]:
+    """Convert a --min-request-interval value to requests per second"""
+    return 1.0 / min_request_interval if min_request_interval > 0 else None
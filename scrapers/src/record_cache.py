@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Parsed Record Cache for PTCG_2026 scrapers
+Stores each extracted card dict keyed by card URL, HTML content hash and the
+scraper's EXTRACTOR_VERSION
+
+Features:
+- Unchanged pages (same HTML, same extractor version) skip parsing entirely
+- One SQLite file per region (data/html/.records/{region}.sqlite), so bumping
+  a scraper's EXTRACTOR_VERSION only invalidates that region
+- Records encoded with msgpack when installed, JSON otherwise
+- Thread-safe; parse worker processes never open it (the parent looks up and
+  stores records around the process pool)
+"""
+
+import hashlib
+import importlib.util
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Check for msgpack
+_HAS_MSGPACK = importlib.util.find_spec('msgpack') is not None
+if _HAS_MSGPACK:
+    import msgpack
+
+RECORDS_DIR = '.records'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    url TEXT PRIMARY KEY,
+    digest BLOB NOT NULL,
+    version TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    record BLOB NOT NULL
+);
+"""
+
+
+def content_hash(html_text: str) -> bytes:
+    """SHA-256 of a page's HTML"""
+    return hashlib.sha256(html_text.encode('utf-8')).digest()
+
+
+class RecordCache:
+    """Extracted card records for one region, valid for one extractor version"""
+
+    def __init__(self, path: Path, version: str):
+        """
+        Open (or create) a record cache
+
+        Args:
+            path: SQLite file
+            version: Scraper EXTRACTOR_VERSION; records from other versions are dropped
+        """
+        self.path = Path(path)
+        self.version = str(version)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        with self._conn:
+            dropped = self._conn.execute('DELETE FROM records WHERE version != ?', (self.version,)).rowcount
+        if dropped:
+            logger.info(f"Record cache {self.path.name}: dropped {dropped} records from older extractor versions")
+
+    def get(self, card_url: str, digest: bytes) -> Optional[Dict[str, Any]]:
+        """Cached record for a page, or None if the HTML or extractor changed"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT codec, record FROM records WHERE url = ? AND digest = ? AND version = ?',
+                (card_url, digest, self.version)
+            ).fetchone()
+
+        # Only a record that decodes counts as a hit (msgpack rows need msgpack installed)
+        record = self._decode(*row) if row is not None else None
+        with self._lock:
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return record
+
+    @staticmethod
+    def _decode(codec: str, blob: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            if codec == 'msgpack':
+                return msgpack.unpackb(blob, raw=False) if _HAS_MSGPACK else None
+            return json.loads(blob)
+        except ValueError as e:
+            logger.warning(f"Undecodable {codec} record in the record cache: {e}")
+            return None
+
+    def put(self, card_url: str, digest: bytes, record: Dict[str, Any]) -> None:
+        """Store the record extracted from a page"""
+        if _HAS_MSGPACK:
+            codec, blob = 'msgpack', msgpack.packb(record, use_bin_type=True)
+        else:
+            codec, blob = 'json', json.dumps(record, ensure_ascii=False).encode('utf-8')
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO records (url, digest, version, codec, record) VALUES (?, ?, ?, ?, ?)',
+                (card_url, digest, self.version, codec, blob)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+        return {'records': count, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_record_cache(data_root: Path, region: str, version: str) -> RecordCache:
+    """Record cache for a region (data/html/.records/{region}.sqlite)"""
+    return RecordCache(Path(data_root) / 'html' / RECORDS_DIR / f"{region}.sqlite", version)
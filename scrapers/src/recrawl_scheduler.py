@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Freshness-Priority Recrawl Scheduler for PTCG_2026 scrapers
+Decides which card IDs a budgeted re-crawl fetches, so requests go where the
+data actually changes
+
+Features:
+- Per-card stats in SQLite (data/html/.freshness/{region}.sqlite): first
+  seen, last fetched, last changed, fetch and change counts, and a
+  recency-weighted change rate (changes per day, older history decaying with
+  a half-life)
+- Each run's queue, within a fixed request budget: IDs never fetched first
+  (newest ID first, where new expansions appear), then cards by the chance
+  they changed since their last fetch, 1 - exp(-rate * age). Recently
+  changed cards come next; long-stable cards only once enough time has passed
+- Outcomes are read back from the HTML cache (checkedAt and body hash in each
+  page's meta), so any engine, thread count or parse pool can do the fetching
+- Cards already in the HTML cache are seeded from their meta on first sight
+  instead of counting as new
+- IDs whose page held no card are tracked too, but queued only after every
+  card, so probing past the newest card does not fill the budget with empty
+  IDs; highest_card_id() gives the newest ID that held a card
+
+Sample usage:
+    python scrapers/recrawl.py --region japan --budget 2000 --probe-ahead 300
+    python scrapers/recrawl.py --region hongkong --budget 500 --dry-run
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+import logging
+
+from id_discovery import has_card_name
+
+logger = logging.getLogger(__name__)
+
+FRESHNESS_DIR = '.freshness'
+
+DAY = 86400.0
+
+# Days for a card's change history to lose half its weight
+DEFAULT_HALF_LIFE_DAYS = 60.0
+
+# Prior belief for cards with little history: one change per PRIOR_SPAN_DAYS
+PRIOR_CHANGES = 1.0
+PRIOR_SPAN_DAYS = 30.0
+
+# Cards changed within this many days count as recently changed in plans
+RECENT_DAYS = 14.0
+
+NEW, RECENT, STABLE, EMPTY = 'new', 'recently changed', 'stable', 'empty'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    card_id INTEGER PRIMARY KEY,
+    first_seen REAL NOT NULL,
+    last_fetched REAL NOT NULL,
+    last_changed REAL,
+    fetches INTEGER NOT NULL DEFAULT 1,
+    changes INTEGER NOT NULL DEFAULT 0,
+    change_weight REAL NOT NULL DEFAULT 0,
+    span_weight REAL NOT NULL DEFAULT 0,
+    sha256 TEXT,
+    has_card INTEGER NOT NULL DEFAULT 1
+);
+"""
+
+
+class CardFreshness(NamedTuple):
+    card_id: int
+    first_seen: float
+    last_fetched: float
+    last_changed: Optional[float]
+    fetches: int
+    changes: int
+    change_weight: float
+    span_weight: float
+    sha256: Optional[str]
+    has_card: int
+
+
+class PlannedCard(NamedTuple):
+    card_id: int
+    tier: str
+    score: float
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+class RecrawlScheduler:
+    """Change statistics and recrawl queues for one region"""
+
+    def __init__(self, path: Path, half_life_days: float = DEFAULT_HALF_LIFE_DAYS):
+        """
+        Open (or create) a region's freshness store
+
+        Args:
+            path: SQLite file
+            half_life_days: Days for change history to lose half its weight
+        """
+        self.path = Path(path)
+        self.half_life = half_life_days * DAY
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, card_id: int) -> Optional[CardFreshness]:
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM cards WHERE card_id = ?', (card_id,)).fetchone()
+        return CardFreshness(*row) if row else None
+
+    def known_ids(self) -> List[int]:
+        with self._lock:
+            return [card_id for (card_id,) in self._conn.execute('SELECT card_id FROM cards ORDER BY card_id')]
+
+    def highest_card_id(self) -> Optional[int]:
+        """Highest tracked ID whose page held a card when last fetched"""
+        with self._lock:
+            return self._conn.execute('SELECT MAX(card_id) FROM cards WHERE has_card').fetchone()[0]
+
+    def change_rate(self, card: CardFreshness) -> float:
+        """Expected changes per second (decayed history plus the prior)"""
+        return (card.change_weight + PRIOR_CHANGES) / (card.span_weight + PRIOR_SPAN_DAYS * DAY)
+
+    def change_probability(self, card: CardFreshness, now: Optional[float] = None) -> float:
+        """Chance the card changed since it was last fetched (Poisson)"""
+        age = max(0.0, (now or time.time()) - card.last_fetched)
+        return 1.0 - math.exp(-self.change_rate(card) * age)
+
+    def seed(self, html_cache: Any, card_ids: Iterable[int]) -> int:
+        """
+        Record cached pages not yet tracked, from their cache meta
+
+        Returns:
+            Cards seeded
+        """
+        rows = []
+        for card_id in card_ids:
+            if self.get(card_id) is not None or not html_cache.contains(str(card_id)):
+                continue
+            meta = html_cache.read_meta(str(card_id))
+            fetched = _timestamp(meta.get('fetchedAt')) or _timestamp(meta.get('checkedAt'))
+            if fetched is None:
+                # Pages cached before fetch times were kept
+                path = html_cache.locate(str(card_id))
+                if path is None:
+                    continue
+                fetched = path.stat().st_mtime
+            checked = _timestamp(meta.get('checkedAt')) or fetched
+            has_card = has_card_name(html_cache.read(str(card_id)) or '')
+            rows.append((card_id, fetched, checked, fetched, 1, 0, 0.0, 0.0, html_cache.source_hash(meta), int(has_card)))
+        if rows:
+            with self._lock, self._conn:
+                self._conn.executemany('INSERT OR IGNORE INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def plan(self, card_ids: Iterable[int], budget: int, now: Optional[float] = None) -> List[PlannedCard]:
+        """
+        Queue for one run: at most `budget` IDs, highest priority first
+
+        IDs never fetched come first (highest ID first), then tracked cards by
+        change probability, then IDs whose page held no card
+        """
+        now = now or time.time()
+        new, tracked, empty = [], [], []
+        for card_id in set(card_ids):
+            card = self.get(card_id)
+            if card is None:
+                new.append(PlannedCard(card_id, NEW, 1.0))
+                continue
+            if not card.has_card:
+                empty.append(PlannedCard(card_id, EMPTY, self.change_probability(card, now)))
+                continue
+            recent = card.last_changed is not None and card.changes and now - card.last_changed < RECENT_DAYS * DAY
+            tracked.append(PlannedCard(card_id, RECENT if recent else STABLE, self.change_probability(card, now)))
+        new.sort(key=lambda x: -x.card_id)
+        tracked.sort(key=lambda x: (-x.score, x.card_id))
+        empty.sort(key=lambda x: (-x.score, x.card_id))
+        return (new + tracked + empty)[:max(budget, 0)]
+
+    def record(self, card_id: int, sha256: Optional[str], fetched_at: Optional[float] = None,
+               has_card: bool = True) -> bool:
+        """
+        Record one fetch of a card
+
+        Args:
+            card_id: Card ID
+            sha256: Hash of the page as served
+            fetched_at: Fetch time (defaults to now)
+            has_card: Whether the page held a card
+
+        Returns:
+            True if the page changed since the previous fetch
+        """
+        fetched_at = fetched_at or time.time()
+        card = self.get(card_id)
+        with self._lock, self._conn:
+            if card is None:
+                self._conn.execute(
+                    'INSERT INTO cards (card_id, first_seen, last_fetched, last_changed, sha256, has_card) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (card_id, fetched_at, fetched_at, fetched_at, sha256, int(has_card))
+                )
+                return True
+            changed = sha256 != card.sha256
+            elapsed = max(0.0, fetched_at - card.last_fetched)
+            decay = 0.5 ** (elapsed / self.half_life)
+            self._conn.execute(
+                'UPDATE cards SET last_fetched = ?, last_changed = ?, fetches = fetches + 1, changes = changes + ?, '
+                'change_weight = ?, span_weight = ?, sha256 = ?, has_card = ? WHERE card_id = ?',
+                (fetched_at, fetched_at if changed else card.last_changed, int(changed),
+                 card.change_weight * decay + int(changed), card.span_weight * decay + elapsed, sha256,
+                 int(has_card), card_id)
+            )
+            return changed
+
+    def observe(self, html_cache: Any, card_ids: Iterable[int], since: float) -> Dict[str, int]:
+        """
+        Record the outcome of a crawl from the HTML cache
+
+        Cards whose page was checked (200 or 304) after `since` count as fetched;
+        cards that errored or were not cached are left as they were
+
+        Returns:
+            Counts of fetched, new, changed and unreached cards
+        """
+        counts = {'fetched': 0, 'new': 0, 'changed': 0, 'unreached': 0}
+        for card_id in card_ids:
+            meta = html_cache.read_meta(str(card_id))
+            checked = _timestamp(meta.get('checkedAt'))
+            if checked is None or checked < since:
+                counts['unreached'] += 1
+                continue
+            counts['fetched'] += 1
+            is_new = self.get(card_id) is None
+            has_card = has_card_name(html_cache.read(str(card_id)) or '')
+            if self.record(card_id, html_cache.source_hash(meta), checked, has_card) and not is_new:
+                counts['changed'] += 1
+            counts['new'] += is_new
+        return counts
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = now or time.time()
+        with self._lock:
+            total, changes, recent, empty = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(changes), 0), COALESCE(SUM(changes > 0 AND last_changed > ?), 0), '
+                'COALESCE(SUM(NOT has_card), 0) FROM cards',
+                (now - RECENT_DAYS * DAY,)
+            ).fetchone()
+        return {'cards': total - empty, 'empty': empty, 'changes': changes, 'recentlyChanged': recent}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def summarize_plan(plan: List[PlannedCard]) -> Dict[str, int]:
+    """Planned IDs per tier"""
+    counts = {NEW: 0, RECENT: 0, STABLE: 0, EMPTY: 0}
+    for planned in plan:
+        counts[planned.tier] += 1
+    return counts
+
+
+def open_recrawl_scheduler(data_root: Path, region: str,
+                           half_life_days: float = DEFAULT_HALF_LIFE_DAYS) -> RecrawlScheduler:
+    """Freshness store for a region (data/html/.freshness/{region}.sqlite)"""
+    return RecrawlScheduler(Path(data_root) / 'html' / FRESHNESS_DIR / f"{region}.sqlite", half_life_days)
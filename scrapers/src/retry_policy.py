@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Retry Policy for PTCG_2026 scrapers
+Exponential backoff with jitter for transient HTTP failures
+
+Features:
+- Retries 429 and 5xx responses plus connection errors and timeouts
+- Full-jitter exponential backoff for the failed request
+- Retry-After (seconds or HTTP date) is honored in full, up to
+  max_retry_after (clamping is logged), by pausing the host's bucket in
+  rate_limiter.py, so every thread stops hitting the host, not just one
+- Feeds every outcome to the per-host AIMD controller in rate_limiter.py
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+import logging
+
+import requests
+
+from rate_limiter import HostRateLimiter
+from scrape_metrics import NETWORK, RATE_LIMIT_WAIT, get_stage_metrics
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying (throttled or temporary server failure)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header into seconds (None if missing or invalid)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 60.0,
+                 max_retry_after: float = 900.0):
+        """
+        Initialize policy
+
+        Args:
+            max_retries: Retries after the first attempt (0 = never retry)
+            base_delay: Backoff for the first retry in seconds
+            max_delay: Upper bound for a single backoff in seconds
+            max_retry_after: Upper bound for a server's Retry-After in seconds
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in RETRYABLE_STATUSES
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt + 1`"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def server_delay(self, url: str, retry_after: Optional[str]) -> Optional[float]:
+        """Seconds the server asked the host to be left alone (None without a valid Retry-After)"""
+        delay = parse_retry_after(retry_after)
+        if delay is not None and delay > self.max_retry_after:
+            logger.warning(f"Retry-After of {delay:.0f}s for {url} exceeds {self.max_retry_after:.0f}s, "
+                           f"waiting {self.max_retry_after:.0f}s")
+            delay = self.max_retry_after
+        return delay
+
+
+def request_with_retry(
+    send: Callable[[], requests.Response],
+    url: str,
+    rate_limiter: HostRateLimiter,
+    policy: RetryPolicy
+) -> requests.Response:
+    """
+    Send a request through the host rate limiter, retrying transient failures
+
+    Args:
+        send: Callable performing one HTTP request
+        url: Request URL (used for the host budget and logging)
+        rate_limiter: Shared per-host limiter (also receives AIMD feedback)
+        policy: Retry policy
+
+    Returns:
+        Successful response (raises requests.HTTPError for non-retryable
+        statuses or once retries are exhausted)
+    """
+    metrics = get_stage_metrics()
+    attempt = 0
+    while True:
+        metrics.observe(RATE_LIMIT_WAIT, rate_limiter.acquire(url))
+        try:
+            with metrics.timer(NETWORK):
+                response = send()
+        except (requests.ConnectionError, requests.Timeout) as e:
+            rate_limiter.record(url, False)
+            if attempt >= policy.max_retries:
+                logger.error(f"Giving up on {url} after {attempt + 1} attempts: {e}")
+                raise
+            delay = policy.backoff(attempt)
+            reason = type(e).__name__
+        else:
+            status = response.status_code
+            if not policy.is_retryable_status(status):
+                rate_limiter.record(url, True)
+                response.raise_for_status()
+                return response
+
+            rate_limiter.record(url, False)
+            if attempt >= policy.max_retries:
+                logger.error(f"Giving up on {url} after {attempt + 1} attempts: HTTP {status}")
+                response.raise_for_status()
+            delay = retry_delay(url, response.headers.get('Retry-After'), attempt, rate_limiter, policy)
+            reason = f"HTTP {status}"
+
+        logger.warning(f"{reason} for {url}, retry {attempt + 1}/{policy.max_retries} in {delay:.1f}s")
+        time.sleep(delay)
+        attempt += 1
+
+
+def retry_delay(url: str, retry_after: Optional[str], attempt: int, rate_limiter: HostRateLimiter,
+                policy: RetryPolicy) -> float:
+    """
+    Seconds to sleep before retrying a throttled or failed response
+
+    A Retry-After pauses the whole host in the rate limiter instead; the retry
+    then only sleeps its jitter and waits for the host's next token
+    """
+    server_delay = policy.server_delay(url, retry_after)
+    if server_delay is None:
+        return policy.backoff(attempt)
+    rate_limiter.pause(url, server_delay)
+    return random.uniform(0, policy.base_delay)
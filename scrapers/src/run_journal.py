@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Run Journal for PTCG_2026 scrapers
+Append-only log of each card URL's outcome in a batch run, used to resume
+long --id-range crawls after a crash, restart or deploy
+
+Features:
+- One JSONL file per run (data/runs/{region}/{run}.jsonl), one line per card:
+  ok / empty (no card on the page) / http-error / parse-error
+- Line buffered and fsynced every FSYNC_EVERY records; a torn last line from
+  a crash is ignored on resume
+- Outcomes are recorded after the card reached the JSONL sink, and the
+  `before_sync` hook (the sink's sync) runs before each fsync, so a card
+  marked ok is on disk even after an OS crash or power loss
+- --resume <run> skips URLs already ok or empty; errors and cache-only
+  misses are tried again
+- OutcomeCounter: in-memory stand-in taking the same records, for callers
+  that only need the counts (e.g. distributed workers checking a chunk)
+
+Sample usage:
+    python scrapers/src/japanese_card_scraper.py --id-range 40000 20000 --jsonl
+    python scrapers/src/japanese_card_scraper.py --id-range 40000 20000 --jsonl --resume 20260101-120000
+"""
+
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+import logging
+
+from card_sink import iter_jsonl
+
+logger = logging.getLogger(__name__)
+
+RUNS_DIR = 'runs'
+
+# Card outcomes
+OK = 'ok'
+EMPTY = 'empty'
+HTTP_ERROR = 'http-error'
+PARSE_ERROR = 'parse-error'
+
+# Outcomes a resumed run does not scrape again
+COMPLETED = (OK, EMPTY)
+
+# Records written between fsyncs
+FSYNC_EVERY = 256
+
+
+def new_run_name() -> str:
+    """Timestamped name for a fresh run"""
+    return datetime.now().strftime('%Y%m%d-%H%M%S')
+
+
+def scrape_with_status(
+    scraper: Any,
+    card_url: str,
+    cache_html: bool,
+    refresh_cache: bool,
+    cache_only: bool
+) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[str]]:
+    """
+    `scraper.scrape_card_details` that also reports the outcome
+
+    Returns:
+        (outcome, card data, error message); the outcome is None on a cache-only miss
+    """
+    try:
+        html_text = scraper.fetch_card_html(card_url, cache_html, refresh_cache, cache_only)
+    except Exception as e:
+        if not scraper.quiet:
+            logger.error(f"✗ Error scraping {card_url}: {e}")
+        return HTTP_ERROR, None, str(e)
+    if html_text is None:
+        return None, None, None
+
+    try:
+        data = scraper.parse_card_html(html_text, card_url)
+    except Exception as e:
+        if not scraper.quiet:
+            logger.error(f"✗ Error parsing {card_url}: {e}")
+        return PARSE_ERROR, None, str(e)
+    return (OK if data else EMPTY), data, None
+
+
+class RunJournal:
+    """Per-URL outcomes of one batch run"""
+
+    def __init__(self, path: Path, resume: bool = False):
+        """
+        Open a run journal
+
+        Args:
+            path: Journal file
+            resume: Load the outcomes already in the file and append to it
+        """
+        self.path = Path(path)
+        self.name = self.path.stem
+        self.counts: Counter = Counter()
+        self.resumed = 0
+        self._completed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        # Makes the outputs the journal vouches for durable first (JsonlCardSink.sync)
+        self.before_sync: Optional[Callable[[], None]] = None
+
+        if resume:
+            if not self.path.exists():
+                raise FileNotFoundError(f"No run journal at {self.path}")
+            for entry in iter_jsonl(self.path):
+                url = entry.get('url')
+                if url and entry.get('status') in COMPLETED:
+                    self._completed.add(url)
+            logger.info(f"Resuming run {self.name}: {len(self._completed)} cards already done")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8', buffering=1)
+        # Terminate a line torn by a crash so the next record starts clean
+        if resume and self._file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+        self._write({'run': self.name, 'started': datetime.now().isoformat(), 'argv': sys.argv[1:]})
+
+    def is_completed(self, card_url: str) -> bool:
+        return card_url in self._completed
+
+    def pending_ids(self, card_ids: Iterable[int], build_card_url: Callable[[int], str]) -> Iterator[int]:
+        """Card IDs this run still has to scrape"""
+        for card_id in card_ids:
+            if build_card_url(card_id) in self._completed:
+                self.resumed += 1
+                continue
+            yield card_id
+
+    def record(self, card_url: str, status: str, error: Optional[str] = None) -> None:
+        """Append a card's outcome"""
+        entry = {'url': card_url, 'status': status}
+        if error:
+            entry['error'] = error
+        with self._lock:
+            self.counts[status] += 1
+            if status in COMPLETED:
+                self._completed.add(card_url)
+            self._write(entry)
+            self._unsynced += 1
+            if self._unsynced >= FSYNC_EVERY:
+                self._sync()
+
+    def summary(self) -> str:
+        parts = [f"{status}={count}" for status, count in sorted(self.counts.items())]
+        if self.resumed:
+            parts.append(f"skipped={self.resumed}")
+        return ', '.join(parts) or 'nothing recorded'
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+
+    def __enter__(self) -> 'RunJournal':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def _sync(self) -> None:
+        if self.before_sync is not None:
+            self.before_sync()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+
+class OutcomeCounter:
+    """Counts card outcomes like a RunJournal, without a file or resume"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.first_errors: Dict[str, Tuple[str, str]] = {}  # Outcome → (URL, error) of its first record
+        self._lock = threading.Lock()
+
+    def pending_ids(self, card_ids: Iterable[int], build_card_url: Callable[[int], str]) -> Iterable[int]:
+        return card_ids
+
+    def record(self, card_url: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.counts[status] += 1
+            if error:
+                self.first_errors.setdefault(status, (card_url, error))
+
+    def summary(self) -> str:
+        return ', '.join(f"{status}={count}" for status, count in sorted(self.counts.items())) or 'nothing recorded'
+
+
+def open_run_journal(data_root: Path, region: str, resume: Optional[str] = None) -> RunJournal:
+    """
+    Journal for a new run, or the journal of the run being resumed
+
+    Args:
+        data_root: Scraper data root
+        region: Region directory name (japan, hongkong, english)
+        resume: Run name or journal path to resume
+    """
+    runs_dir = Path(data_root) / RUNS_DIR / region
+    if resume is None:
+        name = new_run_name()
+        path = runs_dir / f"{name}.jsonl"
+        suffix = 1
+        while path.exists():
+            suffix += 1
+            path = runs_dir / f"{name}-{suffix}.jsonl"
+        return RunJournal(path)
+
+    path = Path(resume)
+    if path.suffix != '.jsonl':
+        path = runs_dir / f"{resume}.jsonl"
+    return RunJournal(path, resume=True)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Sampling Profiler for PTCG_2026 scrapers
+Wall-clock stack sampling of every thread and parse worker process, for the
+--profile flag of the scraper CLIs
+
+Features:
+- A daemon thread snapshots all thread stacks (sys._current_frames) every
+  --profile-interval seconds; no tracing hooks, so extraction runs at close
+  to full speed and idle or blocked threads show up where they wait
+- Parse worker processes (--parse-workers) sample themselves and hand their
+  stacks to the parent when the pool shuts down
+- Writes folded stacks ({path}.folded: "process;thread;frame;... count"),
+  readable by flamegraph.pl, speedscope and inferno
+- Ranked table ({path}.txt, also logged): top `_extract_*` methods, HTML
+  parser internals (bs4, soupsieve, lxml, html.parser) and time spent waiting
+  on the network, disk, the rate limiter or idle in pools and queues
+
+Sample usage:
+    python scrapers/src/japanese_card_scraper.py --id-range 1 5000 --cache-only --parse-workers 4 --profile
+    flamegraph.pl data/runs/japan/20260301-120000.profile.folded > profile.svg
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from multiprocessing import util as mp_util
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_INTERVAL = 0.01
+
+# Leaf-frame module prefixes by kind of wait
+WAIT_CATEGORIES = {
+    'network / event loop': ('socket', 'ssl', 'selectors', 'http.client', 'urllib3', 'requests', 'aiohttp', 'asyncio'),
+    'disk': ('pathlib', 'io', '_pyio', 'codecs', 'shutil', 'sqlite3', 'zstandard', 'html_cache', 'html_shards',
+             'html_index', 'record_cache', 'negative_cache', 'card_sink', 'run_journal'),
+    'rate limiter': ('rate_limiter', 'retry_policy'),
+    'idle (pools, queues, locks)': ('threading', 'queue', 'concurrent.futures', 'multiprocessing'),
+}
+
+# Waits whose kind depends on the caller (select() serves sockets and pipes alike)
+GENERIC_WAIT_MODULES = ('selectors', 'socket')
+
+PARSER_MODULES = ('bs4', 'soupsieve', 'lxml', 'html.parser', '_markupbase', 'html5lib')
+
+_active = None
+_active_workers_dir = None
+
+
+@lru_cache(maxsize=None)
+def _module_name(filename: str) -> str:
+    parts = Path(filename).with_suffix('').parts
+    for anchor in ('site-packages', 'dist-packages'):
+        if anchor in parts:
+            return '.'.join(parts[parts.index(anchor) + 1:]).removesuffix('.__init__')
+    for i, part in enumerate(parts):
+        if re.fullmatch(r'python3\.\d+', part):
+            return '.'.join(parts[i + 1:]).removesuffix('.__init__')
+    return parts[-1] if parts else filename
+
+
+@lru_cache(maxsize=None)
+def _frame_label(code) -> str:
+    return f"{_module_name(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _thread_label(name: str) -> str:
+    # ThreadPoolExecutor-0_3 / Thread-5 → one flamegraph tower per pool
+    return re.sub(r'[_-]\d+$', '', name).replace(';', ':')
+
+
+class SamplingProfiler:
+    """Samples every thread's stack of this process at a fixed interval"""
+
+    def __init__(self, interval: float = DEFAULT_PROFILE_INTERVAL, label: str = 'main'):
+        self.interval = interval
+        self.label = label
+        self.stacks: Counter = Counter()
+        self.ticks = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = 0.0
+
+    def start(self) -> 'SamplingProfiler':
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        next_tick = time.perf_counter()
+        while not self._stop.wait(max(0.0, next_tick - time.perf_counter())):
+            next_tick = max(next_tick + self.interval, time.perf_counter())
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                frames.append(_thread_label(names.get(ident, 'thread')))
+                frames.append(self.label)
+                self.stacks[';'.join(reversed(frames))] += 1
+            self.ticks += 1
+
+    def save(self, path: Path) -> None:
+        """Write the samples for the parent process to merge"""
+        self.stop()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'ticks': self.ticks, 'elapsed': self.elapsed, 'stacks': self.stacks}, f)
+
+
+def start_profiling(interval: float = DEFAULT_PROFILE_INTERVAL) -> SamplingProfiler:
+    """Start sampling this process; parse pools created from now on sample their workers too"""
+    global _active, _active_workers_dir
+    _active_workers_dir = tempfile.mkdtemp(prefix='ptcg-profile-')
+    _active = SamplingProfiler(interval).start()
+    logger.info(f"Profiling every {interval * 1000:g}ms")
+    return _active
+
+
+def worker_profile_settings() -> Optional[Tuple[str, float]]:
+    """(samples directory, interval) for parse workers while profiling, else None"""
+    if _active is None:
+        return None
+    return _active_workers_dir, _active.interval
+
+
+def start_worker_profiler(workers_dir: str, interval: float) -> None:
+    """Sample a parse worker process; its samples are saved when the process exits"""
+    profiler = SamplingProfiler(interval, 'parse-worker').start()
+    # Pool workers leave through multiprocessing's exit path, which skips atexit
+    mp_util.Finalize(None, profiler.save, args=(Path(workers_dir) / f'{os.getpid()}.json',), exitpriority=10)
+
+
+def _merge_worker_samples(profiler: SamplingProfiler, workers_dir: str) -> Tuple[int, float]:
+    """Add the parse workers' stacks to the parent's; returns (worker ticks, worker seconds)"""
+    ticks, elapsed = 0, 0.0
+    for path in Path(workers_dir).glob('*.json'):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                samples = json.load(f)
+        except (OSError, ValueError):
+            continue
+        profiler.stacks.update(samples['stacks'])
+        ticks += samples['ticks']
+        elapsed += samples['elapsed']
+    shutil.rmtree(workers_dir, ignore_errors=True)
+    return ticks, elapsed
+
+
+def _wait_category(module: str) -> Optional[str]:
+    for category, prefixes in WAIT_CATEGORIES.items():
+        if any(module == prefix or module.startswith(prefix + '.') for prefix in prefixes):
+            return category
+    return None
+
+
+def _leaf_wait(frames: List[str]) -> Tuple[Optional[str], str]:
+    """(wait category, leaf frame) of a stack, judging generic waits by their caller"""
+    leaf = frames[-1]
+    for label in reversed(frames):
+        module = label.split(':')[0]
+        if module not in GENERIC_WAIT_MODULES:
+            return _wait_category(module) or _wait_category(leaf.split(':')[0]), leaf
+    return _wait_category(leaf.split(':')[0]), leaf
+
+
+def _is_parser_module(module: str) -> bool:
+    return any(module == prefix or module.startswith(prefix + '.') for prefix in PARSER_MODULES)
+
+
+def rank_profile(stacks: Dict[str, int], seconds_per_sample: float, top: int = 15) -> List[str]:
+    """
+    Ranked table of a folded-stack profile
+
+    `_extract_*` methods are ranked inclusively (time with the method anywhere
+    on the stack), parser internals by the deepest parser frame, and waits by
+    the module of the leaf frame
+    """
+    total = sum(stacks.values()) or 1
+    extract, parser, waits, wait_leaves = Counter(), Counter(), Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')[2:]
+        for label in set(frames):
+            if label.split(':', 1)[-1].rsplit('.', 1)[-1].startswith('_extract_'):
+                extract[label] += count
+        parser_frame = next((label for label in reversed(frames) if _is_parser_module(label.split(':')[0])), None)
+        if parser_frame is not None:
+            parser[parser_frame] += count
+        if frames:
+            category, leaf = _leaf_wait(frames)
+            if category is not None:
+                waits[category] += count
+                wait_leaves[(category, leaf)] += count
+
+    def rows(counter: Counter) -> List[str]:
+        return [f"  {count / total * 100:5.1f}%  {count * seconds_per_sample:8.2f}s  {label}"
+                for label, count in counter.most_common(top)]
+
+    lines = [f"{total} samples, ~{seconds_per_sample * 1000:.1f}ms each (wall clock, all threads and processes)", '',
+             'Top _extract_* methods (inclusive):', *(rows(extract) or ['  none sampled']), '',
+             'HTML parser internals (deepest parser frame):', *(rows(parser) or ['  none sampled']), '',
+             'Waits (leaf frame):']
+    for category, count in waits.most_common():
+        lines.append(f"  {count / total * 100:5.1f}%  {count * seconds_per_sample:8.2f}s  {category}")
+        leaves = Counter({leaf: n for (leaf_category, leaf), n in wait_leaves.items() if leaf_category == category})
+        lines.extend(f"         {n / total * 100:5.1f}%  {leaf}" for leaf, n in leaves.most_common(3))
+    if not waits:
+        lines.append('  none sampled')
+    return lines
+
+
+def finish_profiling(profiler: SamplingProfiler, path: Path, top: int = 15) -> Tuple[Path, Path]:
+    """
+    Stop sampling, merge the parse workers' samples and write the profile
+
+    Args:
+        profiler: Profiler from start_profiling
+        path: Folded-stacks file; the ranked table goes next to it as .txt
+
+    Returns:
+        (folded stacks path, table path)
+    """
+    global _active, _active_workers_dir
+    profiler.stop()
+    worker_ticks, worker_elapsed = 0, 0.0
+    if _active is profiler:
+        worker_ticks, worker_elapsed = _merge_worker_samples(profiler, _active_workers_dir)
+        _active = _active_workers_dir = None
+    ticks = profiler.ticks + worker_ticks
+    seconds_per_sample = (profiler.elapsed + worker_elapsed) / ticks if ticks else profiler.interval
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in profiler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    table = rank_profile(profiler.stacks, seconds_per_sample, top)
+    table_path = path.with_suffix('.txt')
+    table_path.write_text('\n'.join(table) + '\n', encoding='utf-8')
+    for line in table:
+        logger.info(line)
+    logger.info(f"Profile: {path} (flamegraph-ready), {table_path}")
+    return path, table_path
+
+
+def profile_path(option: str, data_root: Path, name: str, run_name: str) -> Path:
+    """--profile value → folded-stacks path ('auto': data/runs/{name}/{run}.profile.folded)"""
+    if option == 'auto':
+        return Path(data_root) / 'runs' / name / f"{run_name}.profile.folded"
+    return Path(option)
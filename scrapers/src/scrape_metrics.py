@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Per-Stage Scrape Metrics for PTCG_2026 scrapers
+Histograms of where a run's time goes, to tell whether a slow run is
+network-, rate-limiter- or CPU-bound
+
+Features:
+- Process-wide registry shared by every scraper, thread and event loop;
+  off unless a CLI enables it (--metrics / --metrics-port), so unmetered
+  runs pay one attribute check per stage
+- Stages: rate limiter wait, network time, response bytes (threads and async
+  engines), cache read, parse (tree + extraction), extraction, and each
+  `_extract_*` method on its own
+- Prometheus-style cumulative buckets plus count / sum / min / max and
+  bucket-estimated p50 / p90 / p99
+- Written per run as JSON or Prometheus text (by file suffix), and served
+  live at /metrics (Prometheus) and /metrics.json on --metrics-port
+- With --parse-workers, parse and extraction run in worker processes and are
+  not collected; run without parse workers to profile extraction
+
+Sample usage:
+    python scrapers/src/japanese_card_scraper.py --id-range 40000 500 --cache-html --metrics
+    python scrapers/src/hk_card_scraper.py --id-range 1 2000 --metrics run.prom --metrics-port 9108
+"""
+
+import functools
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'ptcg_scrape_'
+
+# Upper bounds in seconds / bytes
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 131072, 262144, 524288, 1048576, 4194304)
+
+# Stage names
+RATE_LIMIT_WAIT = 'ratelimit_wait_seconds'
+NETWORK = 'network_seconds'
+RESPONSE_BYTES = 'response_bytes'
+CACHE_READ = 'cache_read_seconds'
+PARSE = 'parse_seconds'
+EXTRACT = 'extract_seconds'
+EXTRACT_METHOD = 'extract_method_seconds'
+
+STAGE_HELP = {
+    RATE_LIMIT_WAIT: 'Seconds waiting for the per-host request budget',
+    NETWORK: 'Seconds per HTTP request (one attempt, body included)',
+    RESPONSE_BYTES: 'Bytes of fetched card pages',
+    CACHE_READ: 'Seconds reading a page from the HTML cache',
+    PARSE: 'Seconds per parse_card_html call (record cache, tree, extraction)',
+    EXTRACT: 'Seconds per _extract_card_info call',
+    EXTRACT_METHOD: 'Seconds per _extract_* method call',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram (thread-safe)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        slot = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                slot = i
+                break
+        with self._lock:
+            self.counts[slot] += 1
+            self.count += 1
+            self.sum += value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max for the +Inf bucket)"""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative, total = {}, 0
+            for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+                total += count
+                cumulative[str(bound)] = total
+            return {
+                'count': self.count,
+                'sum': self.sum,
+                'min': self.min if self.count else 0.0,
+                'max': self.max,
+                'mean': self.sum / self.count if self.count else 0.0,
+                'p50': self.quantile(0.5),
+                'p90': self.quantile(0.9),
+                'p99': self.quantile(0.99),
+                'buckets': cumulative,
+            }
+
+
+class StageMetrics:
+    """Named, labelled histograms for the scrape stages"""
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.time()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        if not self.enabled:
+            self.enabled = True
+            self.started = time.time()
+
+    def observe(self, stage: str, value: float, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (stage, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    key, Histogram(BYTES_BUCKETS if stage.endswith('_bytes') else DURATION_BUCKETS)
+                )
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str, **labels: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def histogram(self, stage: str, **labels: str) -> Optional[Histogram]:
+        return self._histograms.get((stage, tuple(sorted(labels.items()))))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All histograms as JSON-ready data"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+        stages: Dict[str, Any] = {}
+        for (stage, labels), histogram in items:
+            entry = histogram.snapshot()
+            if labels:
+                entry['labels'] = dict(labels)
+                stages.setdefault(stage, []).append(entry)
+            else:
+                stages[stage] = entry
+        return {
+            'started': datetime.fromtimestamp(self.started).isoformat(),
+            'elapsedSeconds': time.time() - self.started,
+            'stages': stages,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+        lines, described = [], set()
+        for (stage, labels), histogram in items:
+            name = METRIC_PREFIX + stage
+            if stage not in described:
+                lines.append(f"# HELP {name} {STAGE_HELP.get(stage, stage)}")
+                lines.append(f"# TYPE {name} histogram")
+                described.add(stage)
+            data = histogram.snapshot()
+            label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+            for bound, count in data['buckets'].items():
+                bucket_labels = ','.join(filter(None, [label_text, f'le="{bound}"']))
+                lines.append(f"{name}_bucket{{{bucket_labels}}} {count}")
+            suffix = f"{{{label_text}}}" if label_text else ''
+            lines.append(f"{name}_sum{suffix} {data['sum']:.6f}")
+            lines.append(f"{name}_count{suffix} {data['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: Path) -> Path:
+        """Write the metrics (Prometheus text for .prom / .txt, JSON otherwise)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix in ('.prom', '.txt'):
+            path.write_text(self.to_prometheus(), encoding='utf-8')
+        else:
+            path.write_text(json.dumps(self.snapshot(), indent=2), encoding='utf-8')
+        return path
+
+    def log_summary(self) -> None:
+        """Log per-stage totals and which stage dominated"""
+        totals = {}
+        for stage in (RATE_LIMIT_WAIT, NETWORK, CACHE_READ, PARSE, EXTRACT):
+            histogram = self.histogram(stage)
+            if histogram is None or not histogram.count:
+                continue
+            data = histogram.snapshot()
+            totals[stage] = data['sum']
+            logger.info(f"📊 {stage:<24} n={data['count']:<7} total {data['sum']:9.2f}s  "
+                        f"mean {data['mean'] * 1000:8.1f}ms  p50 {data['p50'] * 1000:8.1f}ms  "
+                        f"p90 {data['p90'] * 1000:8.1f}ms  max {data['max'] * 1000:8.1f}ms")
+        size = self.histogram(RESPONSE_BYTES)
+        if size is not None and size.count:
+            logger.info(f"📊 {RESPONSE_BYTES:<24} n={size.count:<7} total {size.sum / 1048576:.1f} MB, "
+                        f"mean {size.sum / size.count / 1024:.1f} KB")
+
+        methods = sorted(
+            ((dict(labels).get('method', ''), histogram.sum) for (stage, labels), histogram in self._histograms.items()
+             if stage == EXTRACT_METHOD),
+            key=lambda item: -item[1]
+        )
+        if methods:
+            logger.info("📊 Slowest extractors: " + ', '.join(f"{name} {seconds:.2f}s" for name, seconds in methods[:5]))
+
+        bound = {RATE_LIMIT_WAIT: 'rate-limiter', NETWORK: 'network', CACHE_READ: 'disk', PARSE: 'CPU (parsing)'}
+        totals.pop(EXTRACT, None)  # Part of the parse stage
+        if totals:
+            stage = max(totals, key=totals.get)
+            logger.info(f"📊 Most time in {stage}: this run was mostly {bound[stage]}-bound")
+
+
+_shared_metrics = StageMetrics()
+
+
+def get_stage_metrics() -> StageMetrics:
+    """Return the process-wide metrics registry"""
+    return _shared_metrics
+
+
+def instrument_scraper(scraper: Any, metrics: Optional[StageMetrics] = None) -> None:
+    """
+    Time a scraper's cache reads, parsing and every `_extract_*` method
+
+    Wraps the bound methods on the instance, so the class and other instances
+    (parse worker processes) are untouched
+    """
+    metrics = metrics or get_stage_metrics()
+
+    def timed(bound, stage, **labels):
+        @functools.wraps(bound)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(stage, **labels):
+                return bound(*args, **kwargs)
+        return wrapper
+
+    handle_response = scraper._handle_response
+
+    @functools.wraps(handle_response)
+    def count_bytes(card_id, card_url, status, html_text, headers, cache_html):
+        if status != 304 and html_text is not None:
+            metrics.observe(RESPONSE_BYTES, len(html_text.encode('utf-8')))
+        return handle_response(card_id, card_url, status, html_text, headers, cache_html)
+
+    scraper._handle_response = count_bytes
+    scraper._read_cached_html = timed(scraper._read_cached_html, CACHE_READ)
+    scraper.parse_card_html = timed(scraper.parse_card_html, PARSE)
+    for name in dir(type(scraper)):
+        if not name.startswith('_extract_') or not callable(getattr(type(scraper), name)):
+            continue
+        if name == '_extract_card_info':
+            scraper._extract_card_info = timed(scraper._extract_card_info, EXTRACT)
+        else:
+            setattr(scraper, name, timed(getattr(scraper, name), EXTRACT_METHOD, method=name))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics: StageMetrics
+
+    def do_GET(self):
+        route = self.path.rstrip('/')
+        if route == '/metrics':
+            body, content_type = self.metrics.to_prometheus(), 'text/plain; version=0.0.4'
+        elif route == '/metrics.json':
+            body, content_type = json.dumps(self.metrics.snapshot(), indent=2), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve_metrics(port: int, host: str = '127.0.0.1', metrics: Optional[StageMetrics] = None) -> ThreadingHTTPServer:
+    """Serve live metrics from a daemon thread (/metrics and /metrics.json)"""
+    handler = type('MetricsHandler', (_MetricsHandler,), {'metrics': metrics or get_stage_metrics()})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Live metrics on http://{host}:{port}/metrics")
+    return server
+
+
+def enable_metrics(scraper: Any, port: Optional[int] = None) -> StageMetrics:
+    """Turn on the registry for a CLI run, instrument its scraper and optionally serve it live"""
+    metrics = get_stage_metrics()
+    metrics.enable()
+    instrument_scraper(scraper, metrics)
+    if port:
+        serve_metrics(port, metrics=metrics)
+    return metrics
+
+
+def metrics_path(option: str, data_root: Path, region: str, run_name: str) -> Path:
+    """--metrics value → file path ('auto': data/runs/{region}/{run}.metrics.json)"""
+    if option == 'auto':
+        return Path(data_root) / 'runs' / region / f"{run_name}.metrics.json"
+    return Path(option)
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Leased ID-Range Work Queue for PTCG_2026 scrapers
+Spreads one crawl across several worker processes or machines without
+hand-splitting --id-range
+
+Features:
+- Coordinator keeps ID-range chunks in SQLite (data/queue/{name}.sqlite):
+  pending → leased → done, surviving coordinator restarts
+- Workers lease one chunk at a time and heartbeat while scraping; a lease
+  that is not renewed within its TTL expires and the chunk is leased again
+  (dead or stalled workers lose their ranges)
+- A chunk that fails MAX_ATTEMPTS times is parked as failed instead of
+  looping forever
+- Workers push each finished chunk's cards back to the coordinator, the only
+  writer of the per-expansion JSONL output (card_sink.py); completions from
+  a worker whose lease was taken over are rejected
+- Workers retry completions and failures with backoff while the coordinator
+  is unreachable, until their lease would expire (the chunk is then leased
+  again), instead of crashing
+- Plain JSON over HTTP (http.server / requests), no extra dependencies;
+  HTML and record caches stay per worker (shared when the data directory is)
+
+Sample usage:
+    python scrapers/distributed_scrape.py coordinator --add japan 40000 20000 --port 8790
+    python scrapers/distributed_scrape.py worker --coordinator http://127.0.0.1:8790 --cache-html
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+import requests
+
+from card_sink import JsonlCardSink
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DIR = 'queue'
+
+# IDs per leased chunk
+DEFAULT_CHUNK_SIZE = 500
+
+# Seconds a lease lives without a heartbeat
+DEFAULT_LEASE_TTL = 120.0
+
+# Longest wait between retries of a completion or failure report
+MAX_REPORT_BACKOFF = 30.0
+
+# Leases of one chunk before it is parked as failed
+MAX_ATTEMPTS = 5
+
+# Chunk states
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    region TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cards INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (region, start)
+);
+CREATE INDEX IF NOT EXISTS chunks_state ON chunks (state, region, start);
+"""
+
+Lease = Dict[str, Any]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseQueue:
+    """SQLite table of ID-range chunks and their leases (used by the coordinator)"""
+
+    def __init__(self, path: Path, lease_ttl: float = DEFAULT_LEASE_TTL):
+        """
+        Open (or create) a queue
+
+        Args:
+            path: SQLite file
+            lease_ttl: Seconds a lease lives without a heartbeat
+        """
+        self.path = Path(path)
+        self.lease_ttl = lease_ttl
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+
+    def add_range(self, region: str, start: int, count: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """Split an ID range into chunks; chunks already queued are kept as they are"""
+        rows = [
+            (region, chunk_start, min(chunk_size, start + count - chunk_start))
+            for chunk_start in range(start, start + count, chunk_size)
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany('INSERT OR IGNORE INTO chunks (region, start, count) VALUES (?, ?, ?)', rows)
+            return self._conn.total_changes - before
+
+    def lease(self, worker: str, regions: Optional[List[str]] = None) -> Optional[Lease]:
+        """
+        Lease the next pending (or expired) chunk
+
+        Args:
+            worker: Worker ID taking the lease
+            regions: Only lease chunks of these regions
+
+        Returns:
+            {id, region, start, count, expires, ttl} or None when nothing is leasable
+        """
+        now = time.time()
+        query = ('SELECT * FROM chunks WHERE (state = ? OR (state = ? AND lease_expires < ?))'
+                 + (f" AND region IN ({','.join('?' * len(regions))})" if regions else '')
+                 + ' ORDER BY attempts, region, start LIMIT 1')
+        with self._lock, self._conn:
+            row = self._conn.execute(query, (PENDING, LEASED, now, *(regions or []))).fetchone()
+            if row is None:
+                return None
+            if row['state'] == LEASED:
+                logger.warning(f"Lease on {row['region']} {row['start']}+{row['count']} "
+                               f"held by {row['worker']} expired; leasing it again")
+            expires = now + self.lease_ttl
+            self._conn.execute(
+                'UPDATE chunks SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?',
+                (LEASED, worker, expires, row['id'])
+            )
+        return {'id': row['id'], 'region': row['region'], 'start': row['start'], 'count': row['count'],
+                'expires': expires, 'ttl': self.lease_ttl}
+
+    def heartbeat(self, lease_id: int, worker: str) -> bool:
+        """Extend a lease; False when the worker no longer holds it"""
+        with self._lock, self._conn:
+            return bool(self._conn.execute(
+                'UPDATE chunks SET lease_expires = ? WHERE id = ? AND worker = ? AND state = ?',
+                (time.time() + self.lease_ttl, lease_id, worker, LEASED)
+            ).rowcount)
+
+    def complete(self, lease_id: int, worker: str, cards: int = 0) -> bool:
+        """Mark a leased chunk done; False when the worker no longer holds it"""
+        with self._lock, self._conn:
+            return bool(self._conn.execute(
+                'UPDATE chunks SET state = ?, cards = ?, lease_expires = NULL, error = NULL '
+                'WHERE id = ? AND worker = ? AND state = ?',
+                (DONE, cards, lease_id, worker, LEASED)
+            ).rowcount)
+
+    def fail(self, lease_id: int, worker: str, error: str) -> bool:
+        """Give a chunk back after an error (parked as failed after MAX_ATTEMPTS)"""
+        with self._lock, self._conn:
+            return bool(self._conn.execute(
+                'UPDATE chunks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, '
+                'worker = NULL, lease_expires = NULL, error = ? WHERE id = ? AND worker = ? AND state = ?',
+                (MAX_ATTEMPTS, FAILED, PENDING, error, lease_id, worker, LEASED)
+            ).rowcount)
+
+    def retry_failed(self) -> int:
+        """Put failed chunks back in the queue"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                'UPDATE chunks SET state = ?, attempts = 0 WHERE state = ?', (PENDING, FAILED)
+            ).rowcount
+
+    def status(self) -> Dict[str, Any]:
+        """Chunk counts per state, cards scraped and the current leases"""
+        with self._lock:
+            states = dict(self._conn.execute('SELECT state, COUNT(*) FROM chunks GROUP BY state').fetchall())
+            cards = self._conn.execute('SELECT COALESCE(SUM(cards), 0) FROM chunks').fetchone()[0]
+            leases = [dict(row) for row in self._conn.execute(
+                'SELECT id, region, start, count, worker, lease_expires FROM chunks WHERE state = ?', (LEASED,)
+            )]
+        return {'chunks': {state: states.get(state, 0) for state in (PENDING, LEASED, DONE, FAILED)},
+                'cards': cards, 'leases': leases}
+
+    def finished(self) -> bool:
+        """Whether no chunk is pending or leased"""
+        chunks = self.status()['chunks']
+        return not chunks[PENDING] and not chunks[LEASED]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Coordinator:
+    """Lease queue plus the per-region JSONL output the workers push cards into"""
+
+    def __init__(self, queue: LeaseQueue, output_paths: Dict[str, Path]):
+        """
+        Args:
+            queue: Lease queue
+            output_paths: Output JSON path per region; cards go to its per-expansion JSONL files
+        """
+        self.queue = queue
+        self.output_paths = output_paths
+        self.sinks: Dict[str, JsonlCardSink] = {}
+        self._sink_lock = threading.Lock()
+
+    def _sink(self, region: str) -> JsonlCardSink:
+        if region not in self.sinks:
+            # Append: a restarted coordinator keeps the cards of chunks already done
+            self.sinks[region] = JsonlCardSink(self.output_paths[region], append=True)
+        return self.sinks[region]
+
+    def complete(self, lease_id: int, worker: str, region: str, cards: List[Dict[str, Any]]) -> bool:
+        """Store a chunk's cards, unless its lease was taken over by another worker"""
+        # Hold the lease check and the writes together, so a chunk's cards are written once
+        with self._sink_lock:
+            if not self.queue.heartbeat(lease_id, worker):
+                logger.warning(f"Rejected results of lease {lease_id} from {worker}: lease lost")
+                return False
+            sink = self._sink(region)
+            for card in cards:
+                sink.add(card)
+            return self.queue.complete(lease_id, worker, len(cards))
+
+    def close(self) -> None:
+        with self._sink_lock:
+            for sink in self.sinks.values():
+                sink.close()
+
+
+class _CoordinatorHandler(BaseHTTPRequestHandler):
+    coordinator: Coordinator
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/status':
+            self._reply(200, self.coordinator.queue.status())
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._reply(400, {'error': 'invalid JSON'})
+            return
+        queue = self.coordinator.queue
+        route = self.path.rstrip('/')
+        if route == '/lease':
+            self._reply(200, {'lease': queue.lease(body['worker'], body.get('regions')),
+                              'finished': queue.finished()})
+        elif route == '/heartbeat':
+            self._reply(200, {'ok': queue.heartbeat(body['id'], body['worker'])})
+        elif route == '/complete':
+            self._reply(200, {'ok': self.coordinator.complete(body['id'], body['worker'], body['region'], body['cards'])})
+        elif route == '/fail':
+            self._reply(200, {'ok': queue.fail(body['id'], body['worker'], body.get('error', ''))})
+        else:
+            self._reply(404, {'error': 'not found'})
+
+    def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def create_coordinator_server(coordinator: Coordinator, host: str, port: int) -> ThreadingHTTPServer:
+    """HTTP server for a coordinator (call serve_forever on it)"""
+    handler = type('CoordinatorHandler', (_CoordinatorHandler,), {'coordinator': coordinator})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+class QueueClient:
+    """Worker side of the coordinator's HTTP API"""
+
+    def __init__(self, url: str, worker: Optional[str] = None, timeout: float = 60.0):
+        self.url = url.rstrip('/')
+        self.worker = worker or default_worker_id()
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def _post(self, route: str, **payload) -> Dict[str, Any]:
+        response = self._session.post(f"{self.url}/{route}", json={'worker': self.worker, **payload},
+                                      timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def lease(self, regions: Optional[List[str]] = None) -> Dict[str, Any]:
+        return self._post('lease', regions=regions)
+
+    def heartbeat(self, lease_id: int) -> bool:
+        return self._post('heartbeat', id=lease_id)['ok']
+
+    def complete(self, lease: Lease, cards: List[Dict[str, Any]]) -> bool:
+        return self._post('complete', id=lease['id'], region=lease['region'], cards=cards)['ok']
+
+    def fail(self, lease_id: int, error: str) -> bool:
+        return self._post('fail', id=lease_id, error=error)['ok']
+
+    def status(self) -> Dict[str, Any]:
+        response = self._session.get(f"{self.url}/status", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+class _Heartbeat(threading.Thread):
+    """Renews a lease every `interval` seconds until stopped"""
+
+    def __init__(self, client: QueueClient, lease_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.client = client
+        self.lease_id = lease_id
+        self.interval = interval
+        self.lost = False
+        self.renewed = time.monotonic()  # Last time the coordinator extended the lease
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                if not self.client.heartbeat(self.lease_id):
+                    logger.warning(f"Lease {self.lease_id} lost to another worker")
+                    self.lost = True
+                    return
+                self.renewed = time.monotonic()
+            except requests.RequestException as e:
+                # The lease survives short coordinator outages until its TTL
+                logger.warning(f"Heartbeat for lease {self.lease_id} failed: {e}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _report(call: Callable[[], bool], deadline: float, label: str) -> Optional[bool]:
+    """
+    Send a completion or failure to the coordinator, retrying with backoff
+
+    Args:
+        call: Client call to make
+        deadline: time.monotonic() at which the lease expires; retrying past it is pointless
+        label: Worker and chunk, for the log
+
+    Returns:
+        The coordinator's answer, or None if it could not be reached before the deadline
+    """
+    delay = 1.0
+    while True:
+        try:
+            return call()
+        except requests.RequestException as e:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"✗ {label}: coordinator unreachable until the lease expired ({e})")
+                return None
+            logger.warning(f"{label}: coordinator unreachable, retrying in {min(delay, remaining):.0f}s ({e})")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, MAX_REPORT_BACKOFF)
+
+
+def run_worker(
+    client: QueueClient,
+    scrape_range: Callable[[str, int, int], List[Dict[str, Any]]],
+    regions: Optional[List[str]] = None,
+    heartbeat_interval: float = DEFAULT_LEASE_TTL / 4,
+    poll_interval: float = 5.0,
+    max_chunks: Optional[int] = None
+) -> int:
+    """
+    Lease and scrape chunks until the queue is finished
+
+    Args:
+        client: Coordinator client
+        scrape_range: (region, start, count) → scraped cards
+        regions: Only lease chunks of these regions
+        heartbeat_interval: Seconds between lease renewals (well under the lease TTL)
+        poll_interval: Seconds to wait when every remaining chunk is leased by others
+        max_chunks: Stop after this many chunks
+
+    Returns:
+        Number of chunks completed by this worker
+    """
+    completed = 0
+    while max_chunks is None or completed < max_chunks:
+        try:
+            reply = client.lease(regions)
+        except requests.ConnectionError as e:
+            # A coordinator run with --exit-when-done is gone once the last chunk is in
+            logger.warning(f"{client.worker}: coordinator unreachable, stopping ({e})")
+            break
+        lease = reply['lease']
+        if lease is None:
+            if reply['finished']:
+                break
+            # Other workers' leases may still expire and come back
+            time.sleep(poll_interval)
+            continue
+
+        label = f"{lease['region']} {lease['start']}+{lease['count']}"
+        logger.info(f"{client.worker}: leased {label}")
+        heartbeat = _Heartbeat(client, lease['id'], heartbeat_interval)
+        heartbeat.start()
+        try:
+            cards = scrape_range(lease['region'], lease['start'], lease['count'])
+        except Exception as e:
+            heartbeat.stop()
+            logger.error(f"✗ {client.worker}: {label} failed: {e}")
+            deadline = heartbeat.renewed + lease.get('ttl', DEFAULT_LEASE_TTL)
+            # Unreported, the chunk is leased again once the lease expires
+            _report(lambda: client.fail(lease['id'], str(e)), deadline, f"{client.worker}: {label}")
+            continue
+        heartbeat.stop()
+
+        if heartbeat.lost:
+            logger.warning(f"{client.worker}: results for {label} discarded (lease lost)")
+            continue
+        deadline = heartbeat.renewed + lease.get('ttl', DEFAULT_LEASE_TTL)
+        accepted = _report(lambda: client.complete(lease, cards), deadline, f"{client.worker}: {label}")
+        if accepted is None:
+            logger.warning(f"{client.worker}: results for {label} not delivered; the chunk will be leased again")
+            continue
+        if not accepted:
+            logger.warning(f"{client.worker}: results for {label} discarded (lease expired)")
+            continue
+        completed += 1
+        logger.info(f"{client.worker}: finished {label} ({len(cards)} cards)")
+    return completed
+
+
+def open_lease_queue(data_root: Path, name: str, lease_ttl: float = DEFAULT_LEASE_TTL) -> LeaseQueue:
+    """Lease queue for a crawl (data/queue/{name}.sqlite)"""
+    return LeaseQueue(Path(data_root) / QUEUE_DIR / f"{name}.sqlite", lease_ttl)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the leased ID-range work queue (src/work_queue.py)
+
+Features:
+- LeaseQueue: lease expiry and re-lease, completions from a worker whose
+  lease was taken over, chunks parked after MAX_ATTEMPTS
+- End to end on one box: a coordinator on 127.0.0.1, three worker processes
+  with a stub scrape_range, one of them killed mid-lease; every chunk must
+  end done exactly once and every card be written once
+
+Sample usage:
+    python -m pytest scrapers/tests -q
+"""
+
+import json
+import multiprocessing
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from work_queue import (DONE, FAILED, LEASED, MAX_ATTEMPTS, PENDING, Coordinator, LeaseQueue, QueueClient,
+                        create_coordinator_server, run_worker)
+
+REGION = 'japan'
+
+
+def stub_cards(region: str, start: int, count: int) -> List[Dict[str, Any]]:
+    return [{'name': f'card {card_id}', 'expansionCode': 'TEST', 'sourceUrl': f'{region}/{card_id}'}
+            for card_id in range(start, start + count)]
+
+
+def _worker_process(url: str, worker: str, hang: bool) -> None:
+    """Worker process; a hanging one holds its first lease until it is killed"""
+
+    def scrape_range(region: str, start: int, count: int) -> List[Dict[str, Any]]:
+        if hang:
+            time.sleep(3600)
+        time.sleep(0.1)
+        return stub_cards(region, start, count)
+
+    run_worker(QueueClient(url, worker, timeout=10), scrape_range, heartbeat_interval=0.2, poll_interval=0.1)
+
+
+def _wait_for(condition, timeout: float, interval: float = 0.05) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = LeaseQueue(tmp_path / 'queue.sqlite', lease_ttl=0.2)
+    yield queue
+    queue.close()
+
+
+def test_expired_lease_is_leased_again(queue):
+    queue.add_range(REGION, 1, 10, chunk_size=10)
+    first = queue.lease('a')
+    assert queue.lease('b') is None
+
+    time.sleep(0.3)
+    second = queue.lease('b')
+    assert second['id'] == first['id']
+    # The first worker lost the chunk: its heartbeat and results are refused
+    assert not queue.heartbeat(first['id'], 'a')
+    assert not queue.complete(first['id'], 'a', 10)
+    assert queue.complete(second['id'], 'b', 10)
+    assert queue.status()['chunks'][DONE] == 1
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    queue.add_range(REGION, 1, 10, chunk_size=10)
+    lease = queue.lease('a')
+    for _ in range(4):
+        time.sleep(0.1)
+        assert queue.heartbeat(lease['id'], 'a')
+    assert queue.lease('b') is None
+
+
+def test_chunk_is_parked_after_max_attempts(queue):
+    queue.add_range(REGION, 1, 10, chunk_size=10)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        lease = queue.lease('a')
+        assert lease is not None
+        assert queue.fail(lease['id'], 'a', 'boom')
+        expected = FAILED if attempt == MAX_ATTEMPTS else PENDING
+        assert queue.status()['chunks'][expected] == 1
+    assert queue.lease('a') is None
+    assert queue.finished()
+
+    assert queue.retry_failed() == 1
+    assert queue.lease('a') is not None
+
+
+def test_workers_finish_every_chunk_once(tmp_path):
+    chunks, chunk_size = 6, 10
+    queue = LeaseQueue(tmp_path / 'queue.sqlite', lease_ttl=1.5)
+    queue.add_range(REGION, 1, chunks * chunk_size, chunk_size)
+    coordinator = Coordinator(queue, {REGION: tmp_path / 'cards.json'})
+    server = create_coordinator_server(coordinator, '127.0.0.1', 0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    context = multiprocessing.get_context('spawn')
+    victim = context.Process(target=_worker_process, args=(url, 'victim', True))
+    workers = [context.Process(target=_worker_process, args=(url, f'worker-{n}', False)) for n in range(2)]
+    try:
+        victim.start()
+        assert _wait_for(lambda: any(lease['worker'] == 'victim' for lease in queue.status()['leases']), 30)
+        for worker in workers:
+            worker.start()
+        # Killed mid-lease: its chunk comes back once the lease expires
+        victim.kill()
+        victim.join()
+        for worker in workers:
+            worker.join(60)
+            assert worker.exitcode == 0
+    finally:
+        for process in [victim, *workers]:
+            if process.is_alive():
+                process.kill()
+        server.shutdown()
+        server.server_close()
+        coordinator.close()
+
+    status = queue.status()
+    assert status['chunks'] == {PENDING: 0, LEASED: 0, DONE: chunks, FAILED: 0}
+    assert status['cards'] == chunks * chunk_size
+    queue.close()
+    with sqlite3.connect(str(queue.path)) as conn:
+        # The killed worker's chunk was leased a second time
+        assert conn.execute('SELECT MAX(attempts) FROM chunks').fetchone()[0] == 2
+
+    urls = [json.loads(line)['sourceUrl'] for line in (tmp_path / 'cards_TEST.jsonl').read_text().splitlines()]
+    assert sorted(urls) == sorted(card['sourceUrl'] for card in stub_cards(REGION, 1, chunks * chunk_size))
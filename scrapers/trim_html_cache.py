@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+HTML Cache Trimmer
+Upgrades existing HTML caches to card-fragment pages (html_trim.py): site
+chrome is dropped and only the card detail markup is kept
+
+Features:
+- Flat files, expansion folders (HK index) and shard caches
+- Each page is only trimmed if its fragment is smaller and extracts to the
+  same card record (--no-verify skips the record check)
+- Shard caches are compacted afterwards, so the full pages' space is freed
+- --dry-run reports the savings without rewriting anything
+- Pages already trimmed are skipped, so the upgrade can be re-run
+
+Sample usage:
+    python scrapers/trim_html_cache.py --region japan --dry-run
+    python scrapers/trim_html_cache.py --region all
+"""
+
+import argparse
+import sys
+from pathlib import Path
+import logging
+
+# Add src to path to reuse scraper classes
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from html_cache import CACHE_BACKENDS
+from html_trim import upgrade_cache
+from parser_backend import DEFAULT_PARSER_BACKEND, PARSER_BACKENDS
+from scrape_regions import REGIONS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trim cached card pages down to their card detail fragment')
+    parser.add_argument('--region', choices=[*REGIONS, 'all'], default='all')
+    parser.add_argument('--data-root', help='Data directory (default: ../data)')
+    parser.add_argument('--cache-backend', choices=CACHE_BACKENDS, default='auto')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default=DEFAULT_PARSER_BACKEND,
+                        help='Parser used to check that fragments extract like the full pages')
+    parser.add_argument('--no-verify', action='store_true',
+                        help='Trim without comparing the extracted records')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only report how much would be trimmed')
+    args = parser.parse_args()
+
+    regions = list(REGIONS) if args.region == 'all' else [args.region]
+    for region in regions:
+        config = REGIONS[region]
+        scraper = config.scraper_cls(args.data_root, cache_backend=args.cache_backend, parser_backend=args.parser)
+        scraper.quiet = True
+        stats = upgrade_cache(scraper, config.module.build_card_url, verify=not args.no_verify, dry_run=args.dry_run)
+        saved = stats['bytesBefore'] - stats['bytesAfter']
+        ratio = saved / stats['bytesBefore'] if stats['bytesBefore'] else 0.0
+        logger.info(f"{region}: {'would trim' if args.dry_run else 'trimmed'} {stats['trimmed']} pages "
+                    f"({saved / 1048576:.1f} MB, {ratio:.0%} smaller), kept {stats['kept']} whole, "
+                    f"{stats['skipped']} already trimmed")
+        if 'orphans' in stats:
+            logger.info(f"{region}: compacted shards, {stats['bytesFreed'] / 1048576:.1f} MB of full pages reclaimed")
+
+
+if __name__ == '__main__':
+    main()
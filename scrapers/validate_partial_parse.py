@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Partial Parse Validator
+Checks --partial-parse against the full parse on the cached HTML corpus
+
+Features:
+- Extracts every cached page (or --limit of them) from the full tree and
+  from the scraper's PARSE_ONLY subtrees, and compares the records; pages are
+  enumerated like cache_reprocessor.py does (flat files, expansion folders
+  through the cache index, and shards)
+- Reports pages that differ, the fields they differ in, and pages where the
+  partial tree found no card: those with an h1 fall back to a full parse at
+  scrape time, those without one are treated as empty and counted as missed
+- Times both parses, so the speedup on the real corpus is visible
+
+Sample usage:
+    python scrapers/validate_partial_parse.py --region japan --limit 2000
+    python scrapers/validate_partial_parse.py --region all --show 5
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+import logging
+
+# Add src to path to reuse scraper classes
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+from cache_reprocessor import scan_pages
+from parser_backend import parse_html
+from scrape_regions import REGIONS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Set per extraction, so never equal between two parses
+VOLATILE_FIELDS = ('scrapedAt',)
+
+
+def extract(scraper: Any, html_text: str, card_url: str,
+            parse_only: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """Valid card record of a page without its volatile fields, or None"""
+    try:
+        data = scraper._extract_card_info(parse_html(html_text, 'bs4', parse_only), card_url)
+    except Exception:
+        return None
+    if not (data and scraper._is_valid_card_data(data)):
+        return None
+    for field in VOLATILE_FIELDS:
+        data.pop(field, None)
+    return data
+
+
+def validate_region(region: str, data_root: Optional[str] = None, limit: Optional[int] = None,
+                    show: int = 0) -> Counter:
+    """Compare the full and partial parse on a region's cached pages; returns the outcome counts"""
+    config = REGIONS[region]
+    scraper = config.scraper_cls(data_root)
+    scraper.quiet = True
+    logging.getLogger(config.module.__name__).setLevel(logging.CRITICAL)
+
+    card_ids = sorted((page.card_id for page in scan_pages(scraper)), key=int)[:limit]
+    stats = Counter()
+    fields = Counter()
+    full_time = partial_time = 0.0
+    for card_id in card_ids:
+        html_text = scraper.html_cache.read(card_id)
+        if html_text is None:
+            continue
+        card_url = scraper.html_cache.read_meta(card_id).get('url') or config.module.build_card_url(int(card_id))
+
+        start = time.perf_counter()
+        full = extract(scraper, html_text, card_url)
+        full_time += time.perf_counter() - start
+        start = time.perf_counter()
+        partial = extract(scraper, html_text, card_url, scraper.PARSE_ONLY)
+        partial_time += time.perf_counter() - start
+
+        stats['pages'] += 1
+        if full is None and partial is None:
+            stats['empty'] += 1
+        elif partial is None:
+            # Scraping only re-parses pages whose partial tree has the card heading
+            if parse_html(html_text, 'bs4', scraper.PARSE_ONLY).find('h1') is not None:
+                stats['fallback'] += 1
+            else:
+                stats['missed'] += 1
+                logger.warning(f"{region} {card_id}: card lost by the partial parse (no h1 in the partial tree)")
+        elif full == partial:
+            stats['identical'] += 1
+        else:
+            stats['different'] += 1
+            diff = sorted(key for key in set(full or {}) | set(partial) if (full or {}).get(key) != partial.get(key))
+            fields.update(diff)
+            if stats['different'] <= show:
+                logger.info(f"{region} {card_id} differs in: {', '.join(diff)}")
+
+    speedup = full_time / partial_time if partial_time else 0.0
+    logger.info(f"{region}: {stats['pages']} pages, {stats['identical']} identical, {stats['different']} different, "
+                f"{stats['fallback']} full-parse fallbacks, {stats['missed']} missed, {stats['empty']} empty; "
+                f"full {full_time:.1f}s vs partial {partial_time:.1f}s ({speedup:.2f}x)")
+    if fields:
+        logger.info(f"{region}: differing fields: " + ', '.join(f"{field} ({count})" for field, count in fields.most_common()))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate --partial-parse against the full parse on cached pages')
+    parser.add_argument('--region', choices=[*REGIONS, 'all'], default='all')
+    parser.add_argument('--data-root', help='Data directory (default: ../data)')
+    parser.add_argument('--limit', type=int, help='Check at most this many pages per region')
+    parser.add_argument('--show', type=int, default=0, help='Log the first N differing pages')
+    args = parser.parse_args()
+
+    regions = list(REGIONS) if args.region == 'all' else [args.region]
+    failures = 0
+    for region in regions:
+        stats = validate_region(region, args.data_root, args.limit, args.show)
+        failures += stats['different'] + stats['missed']
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()